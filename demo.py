@@ -34,7 +34,7 @@ try:
         vm_manager = VMManager()
         
         # Create and show main window
-        window = MainWindow()
+        window = MainWindow(vm_manager)
         window.show()
         
         print("✅ Multiverse is running!")
@@ -0,0 +1,95 @@
+"""
+Declarative Templates
+OS templates defined by YAML or JSON files instead of Python classes
+"""
+
+import json
+from pathlib import Path
+
+from os_templates.schema import ValidationError, check_template_definition, deep_merge
+
+# File types the template registry treats as declarative definitions
+DEFINITION_SUFFIXES = (".yaml", ".yml", ".json")
+
+
+def read_definition(path: Path) -> dict:
+    """Read a template definition file and check it against the template schema"""
+    path = Path(path)
+    with open(path, encoding="utf-8") as f:
+        if path.suffix == ".json":
+            definition = json.load(f)
+        else:
+            import yaml
+            try:
+                definition = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValidationError([f"{path.name}: invalid YAML: {e}"])
+
+    errors = check_template_definition(definition, path.name)
+    if errors:
+        raise ValidationError(errors)
+    return definition
+
+
+class DeclarativeTemplate:
+    """Template built from a validated definition
+
+    Offers the same interface as the Python templates, e.g.
+
+        name: Alpine
+        version: "3.20"
+        default_config:
+          memory: 512
+          storage: 4
+          cpu_cores: 1
+        build_layers:
+          - name: base-packages
+            script: apk add xfce4
+    """
+
+    def __init__(self, definition: dict):
+        self.name = definition["name"]
+        self.version = definition.get("version", "1.0.0")
+        self.description = definition.get("description", "")
+        self.design_features = definition.get("design_features", {})
+        self.color_palette = definition.get("color_palette", {})
+        self.essential_apps = definition.get("essential_apps", [])
+        self.default_config = definition["default_config"]
+        self.build_layers = definition.get("build_layers", [])
+
+    @classmethod
+    def from_file(cls, path: Path) -> "DeclarativeTemplate":
+        """Load a template from a YAML or JSON definition"""
+        return cls(read_definition(path))
+
+    def get_template_info(self):
+        """Get template information"""
+        return {
+            "name": self.name,
+            "version": self.version,
+            "description": self.description,
+            "features": self.design_features,
+            "essential_apps": self.essential_apps,
+            "default_config": self.default_config
+        }
+
+    def create_vm_config(self, vm_name: str, custom_config: dict = None):
+        """Create a VM configuration from this template"""
+        return {
+            "name": vm_name,
+            "os_template": self.name,
+            "config": deep_merge(self.default_config, custom_config or {}),
+            "design": {
+                "colors": dict(self.color_palette),
+                "features": dict(self.design_features)
+            },
+            "apps": [dict(app) for app in self.essential_apps]
+        }
+
+    def get_build_layers(self):
+        """Get the image build layers"""
+        return [
+            {"name": layer["name"], "script": layer.get("script", ""),
+             "files": layer.get("files", {})}
+            for layer in self.build_layers
+        ]
@@ -0,0 +1,166 @@
+"""
+Image Builder
+Builds template images as cached, content-hashed layers
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+from pathlib import Path
+from typing import Callable, List, Optional
+
+
+def layer_key(parent_key: Optional[str], layer: dict) -> str:
+    """Hash a layer's inputs together with the key of the layer below it"""
+    digest = hashlib.sha256()
+    digest.update((parent_key or "").encode("utf-8"))
+    digest.update(json.dumps(layer, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _inside(directory: Path, relative: str) -> Path:
+    """Join a layer-supplied path onto directory, refusing anything that leaves it"""
+    target = (directory / relative).resolve()
+    try:
+        target.relative_to(directory.resolve())
+    except ValueError:
+        raise ValueError(f"Layer path escapes {directory.name}: {relative!r}")
+    if target == directory.resolve():
+        raise ValueError(f"Layer path is not a file: {relative!r}")
+    return target
+
+
+def apply_layer_files(layer: dict, rootfs: Path):
+    """Stand-in layer runner: write the layer's files and keep its script
+
+    Files land under rootfs/home, and the script is stored in
+    rootfs/.build so the layer's full input is inspectable. A real runner
+    (for example one driving virt-customize on a qcow2 overlay) takes the
+    same arguments.
+    """
+    home = rootfs / "home"
+    for path, content in layer.get("files", {}).items():
+        target = _inside(home, path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+
+    build_dir = rootfs / ".build"
+    build_dir.mkdir(parents=True, exist_ok=True)
+    _inside(build_dir, f"{layer['name']}.sh").write_text(layer.get("script", ""))
+
+
+class DirectoryImageStore:
+    """Image store that keeps each built layer as a directory tree
+
+    Layout: <root>/<key>/layer.json describes the layer and its parent,
+    <root>/<key>/rootfs holds what the layer added. A layer directory only
+    appears under its key once it is completely built.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        """Get the directory of a built layer"""
+        return self.root / key
+
+    def has(self, key: str) -> bool:
+        """Check if a layer has been built"""
+        return (self.path(key) / "layer.json").exists()
+
+    def commit(self, key: str, layer: dict, parent_key: Optional[str],
+               build: Callable[[Path], None]) -> Path:
+        """Build a layer into a scratch directory and publish it under its key
+
+        Each call builds in its own scratch directory, so concurrent builds
+        of the same layer can't disturb each other; the first to finish
+        publishes it.
+        """
+        final_path = self.path(key)
+        tmp_path = Path(tempfile.mkdtemp(prefix=f".{key}.", suffix=".tmp", dir=self.root))
+
+        rootfs = tmp_path / "rootfs"
+        try:
+            rootfs.mkdir()
+            build(rootfs)
+            with open(tmp_path / "layer.json", 'w') as f:
+                json.dump({"name": layer["name"], "parent": parent_key}, f, indent=2)
+            os.replace(tmp_path, final_path)
+        except OSError:
+            # Another builder published the same layer first
+            if not self.has(key):
+                raise
+        finally:
+            if tmp_path.exists():
+                shutil.rmtree(tmp_path)
+        return final_path
+
+    def chain(self, key: str) -> List[str]:
+        """Get the keys of a layer and everything below it, bottom first"""
+        keys = []
+        while key:
+            keys.append(key)
+            with open(self.path(key) / "layer.json") as f:
+                key = json.load(f).get("parent")
+        return list(reversed(keys))
+
+    def export(self, key: str, target: Path) -> Path:
+        """Write a layer and everything below it as one tar archive
+
+        Upper layers win where they touch the same path. The archive is
+        reproducible - sorted entries with fixed owners, modes and times -
+        so the same build always exports the same bytes.
+        """
+        entries = {}
+        for layer_key in self.chain(key):
+            rootfs = self.path(layer_key) / "rootfs"
+            for path in rootfs.rglob("*"):
+                entries[path.relative_to(rootfs).as_posix()] = path
+
+        target = Path(target)
+        tmp_path = target.with_name(target.name + ".tmp")
+        with tarfile.open(tmp_path, "w", format=tarfile.GNU_FORMAT) as archive:
+            for name in sorted(entries):
+                path = entries[name]
+                info = tarfile.TarInfo(name)
+                info.mtime = 0
+                if path.is_dir():
+                    info.type = tarfile.DIRTYPE
+                    info.mode = 0o755
+                    archive.addfile(info)
+                else:
+                    info.mode = 0o644
+                    info.size = path.stat().st_size
+                    with open(path, 'rb') as f:
+                        archive.addfile(info, f)
+        os.replace(tmp_path, target)
+        return target
+
+
+class ImageBuilder:
+    """Builds a template's layers, reusing every layer whose inputs are unchanged
+
+    A layer's key covers its own inputs and its parent's key, so changing
+    one layer rebuilds it and the layers above it while everything below
+    comes straight from the store.
+    """
+
+    def __init__(self, store: DirectoryImageStore, runner: Callable[[dict, Path], None] = None):
+        self.store = store
+        self.runner = runner or apply_layer_files
+
+    def build(self, template) -> str:
+        """Build a template's image, returning the key of its top layer"""
+        parent_key = None
+        for layer in template.get_build_layers():
+            key = layer_key(parent_key, layer)
+            if not self.store.has(key):
+                self.store.commit(key, layer, parent_key,
+                                  lambda rootfs, layer=layer: self.runner(layer, rootfs))
+                print(f"🔨 Built {template.name} layer '{layer['name']}' ({key[:12]})")
+            parent_key = key
+        return parent_key
@@ -5,8 +5,100 @@ Fusion of macOS Tahoe, Windows Vista, and OneUI 7 aesthetics
 
 import os
 import json
+import shlex
 from pathlib import Path
 
+from os_templates.schema import deep_merge
+
+
+BASE_PACKAGES_SCRIPT = """# Update system
+sudo apt update && sudo apt upgrade -y
+
+# Install essential packages
+sudo apt install -y \\
+    xfce4 \\
+    xfce4-goodies \\
+    compton \\
+    nitrogen \\
+    rofi \\
+    polybar \\
+    alacritty \\
+    thunar \\
+    gedit \\
+    gnome-calculator
+"""
+
+XFCE_DESKTOP_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<channel name="xfce4-desktop" version="1.0">
+  <property name="desktop-icons" type="empty">
+    <property name="style" type="int" value="0"/>
+  </property>
+  <property name="desktop-menu" type="empty">
+    <property name="show" type="bool" value="false"/>
+  </property>
+</channel>
+"""
+
+# Compositor settings for frosted glass effects
+COMPTON_CONF = """backend = "glx"
+glx-no-stencil = true;
+glx-no-rebind-pixmap = true;
+vsync = "opengl-swc";
+
+# Opacity
+inactive-opacity = 0.8;
+active-opacity = 1.0;
+frame-opacity = 0.7;
+inactive-opacity-override = false;
+
+# Blur
+blur-background = true;
+blur-background-frame = true;
+blur-kern = "3x3box";
+
+# Fading
+fading = true;
+fade-delta = 4;
+fade-in-step = 0.03;
+fade-out-step = 0.03;
+fade-exclude = [];
+
+# Other
+mark-wmwin-focused = true;
+mark-ovredir-focused = true;
+use-ewmh-active-win = true;
+detect-rounded-corners = true;
+"""
+
+SETTINGS_SHORTCUT = """[Desktop Entry]
+Version=1.0
+Type=Application
+Name=Settings
+Comment=System Settings
+Exec=xfce4-settings-manager
+Icon=preferences-system
+Terminal=false
+"""
+
+FILE_MANAGER_SHORTCUT = """[Desktop Entry]
+Version=1.0
+Type=Application
+Name=File Manager
+Comment=Browse Files
+Exec=thunar
+Icon=system-file-manager
+Terminal=false
+"""
+
+INSTALL_SUMMARY = """echo "✅ NectarOS installation complete!"
+echo "🎨 Features enabled:"
+echo "   - Frosted glass effects"
+echo "   - Smooth animations"
+echo "   - Rounded corners"
+echo "   - Gradient backgrounds"
+echo "   - Essential applications"
+"""
+
 
 class NectarOSTemplate:
     """NectarOS virtual environment template"""
@@ -99,11 +191,8 @@ class NectarOSTemplate:
         
     def create_vm_config(self, vm_name: str, custom_config: dict = None):
         """Create VM configuration for NectarOS"""
-        config = self.default_config.copy()
+        config = deep_merge(self.default_config, custom_config or {})
         
-        if custom_config:
-            config.update(custom_config)
-            
         vm_config = {
             "name": vm_name,
             "os_template": self.name,
@@ -118,113 +207,54 @@ class NectarOSTemplate:
         
         return vm_config
         
+    def get_build_layers(self):
+        """Get the image build layers, ordered from least to most often changed
+        
+        Each layer is a dict with a name, a shell script and a mapping of
+        files (relative to the home directory) to their contents. Keeping
+        rarely changing package installs at the bottom means a theme or
+        shortcut tweak only rebuilds the layers above it.
+        """
+        return [
+            {
+                "name": "base-packages",
+                "script": BASE_PACKAGES_SCRIPT,
+                "files": {}
+            },
+            {
+                "name": "theme",
+                "script": "mkdir -p ~/.themes/nectaros\nmkdir -p ~/.icons/nectaros\n",
+                "files": {
+                    ".config/xfce4/xfconf/xfce-perchannel-xml/xfce4-desktop.xml": XFCE_DESKTOP_XML,
+                    ".config/compton.conf": COMPTON_CONF
+                }
+            },
+            {
+                "name": "desktop-shortcuts",
+                "script": "chmod +x ~/Desktop/*.desktop\n",
+                "files": {
+                    "Desktop/Settings.desktop": SETTINGS_SHORTCUT,
+                    "Desktop/File Manager.desktop": FILE_MANAGER_SHORTCUT
+                }
+            }
+        ]
+        
     def get_installation_script(self):
         """Get the installation script for NectarOS"""
-        return r"""
-#!/bin/bash
-# NectarOS Installation Script
-
-echo "🌺 Installing NectarOS..."
-
-# Update system
-sudo apt update && sudo apt upgrade -y
-
-# Install essential packages
-sudo apt install -y \
-    xfce4 \
-    xfce4-goodies \
-    compton \
-    nitrogen \
-    rofi \
-    polybar \
-    alacritty \
-    thunar \
-    gedit \
-    gnome-calculator
-
-# Install custom theme and icons
-mkdir -p ~/.themes/nectaros
-mkdir -p ~/.icons/nectaros
-
-# Configure desktop environment
-cat > ~/.config/xfce4/xfconf/xfce-perchannel-xml/xfce4-desktop.xml << 'EOF'
-<?xml version="1.0" encoding="UTF-8"?>
-<channel name="xfce4-desktop" version="1.0">
-  <property name="desktop-icons" type="empty">
-    <property name="style" type="int" value="0"/>
-  </property>
-  <property name="desktop-menu" type="empty">
-    <property name="show" type="bool" value="false"/>
-  </property>
-</channel>
-EOF
-
-# Configure compositor for frosted glass effects
-cat > ~/.config/compton.conf << 'EOF'
-backend = "glx"
-glx-no-stencil = true;
-glx-no-rebind-pixmap = true;
-vsync = "opengl-swc";
-
-# Opacity
-inactive-opacity = 0.8;
-active-opacity = 1.0;
-frame-opacity = 0.7;
-inactive-opacity-override = false;
-
-# Blur
-blur-background = true;
-blur-background-frame = true;
-blur-kern = "3x3box";
-
-# Fading
-fading = true;
-fade-delta = 4;
-fade-in-step = 0.03;
-fade-out-step = 0.03;
-fade-exclude = [];
-
-# Other
-mark-wmwin-focused = true;
-mark-ovredir-focused = true;
-use-ewmh-active-win = true;
-detect-rounded-corners = true;
-EOF
-
-# Create desktop shortcuts
-mkdir -p ~/Desktop
-cat > ~/Desktop/Settings.desktop << 'EOF'
-[Desktop Entry]
-Version=1.0
-Type=Application
-Name=Settings
-Comment=System Settings
-Exec=xfce4-settings-manager
-Icon=preferences-system
-Terminal=false
-EOF
-
-cat > ~/Desktop/File\ Manager.desktop << 'EOF'
-[Desktop Entry]
-Version=1.0
-Type=Application
-Name=File Manager
-Comment=Browse Files
-Exec=thunar
-Icon=system-file-manager
-Terminal=false
-EOF
-
-chmod +x ~/Desktop/*.desktop
-
-echo "✅ NectarOS installation complete!"
-echo "🎨 Features enabled:"
-echo "   - Frosted glass effects"
-echo "   - Smooth animations"
-echo "   - Rounded corners"
-echo "   - Gradient backgrounds"
-echo "   - Essential applications"
-        """
+        parts = ["#!/bin/bash", "# NectarOS Installation Script", "",
+                 'echo "🌺 Installing NectarOS..."', ""]
+        
+        for layer in self.get_build_layers():
+            parts.append(f"# Layer: {layer['name']}")
+            for path, content in layer["files"].items():
+                target = "~/" + shlex.quote(path)
+                parent = "~/" + shlex.quote(os.path.dirname(path))
+                parts.append(f"mkdir -p {parent}")
+                parts.append(f"cat > {target} << 'EOF'\n{content}EOF")
+            parts.append(layer["script"])
+            
+        parts.append(INSTALL_SUMMARY)
+        return "\n".join(parts)
         
     def get_welcome_message(self):
         """Get welcome message for NectarOS"""
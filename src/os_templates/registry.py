@@ -0,0 +1,219 @@
+"""
+Template Registry
+Discovers OS templates lazily from entry points and template directories
+"""
+
+import ast
+import importlib
+import importlib.util
+import threading
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from os_templates.declarative import DEFINITION_SUFFIXES, DeclarativeTemplate, read_definition
+from utils.atomic_file import atomic_write_json, read_json
+
+ENTRY_POINT_GROUP = "multiverse.templates"
+
+# Modules in the templates package that are not templates themselves
+SKIP_MODULES = {"__init__", "registry", "image_builder", "schema", "declarative"}
+
+MANIFEST_VERSION = 1
+
+
+def scan_template_module(path: Path) -> List[dict]:
+    """Read template metadata from a module's source without importing it
+
+    A template is any class named *Template whose __init__ assigns a
+    string literal to self.name; literal self.version and
+    self.description assignments are picked up as well.
+    """
+    tree = ast.parse(Path(path).read_text(encoding="utf-8"), filename=str(path))
+    templates = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef) or not node.name.endswith("Template"):
+            continue
+        fields = {}
+        for item in node.body:
+            if not (isinstance(item, ast.FunctionDef) and item.name == "__init__"):
+                continue
+            for statement in ast.walk(item):
+                if not isinstance(statement, ast.Assign) or len(statement.targets) != 1:
+                    continue
+                target = statement.targets[0]
+                if (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                        and target.value.id == "self"
+                        and target.attr in ("name", "version", "description")
+                        and isinstance(statement.value, ast.Constant)
+                        and isinstance(statement.value.value, str)):
+                    fields[target.attr] = statement.value.value
+        if "name" in fields:
+            templates.append({
+                "key": fields["name"].lower(),
+                "name": fields["name"],
+                "version": fields.get("version", ""),
+                "description": fields.get("description", ""),
+                "class": node.name
+            })
+    return templates
+
+
+def scan_template_definition(path: Path) -> List[dict]:
+    """Read template metadata from a validated YAML or JSON definition"""
+    definition = read_definition(path)
+    return [{
+        "key": definition["name"].lower(),
+        "name": definition["name"],
+        "version": definition.get("version", ""),
+        "description": definition.get("description", ""),
+        "declarative": True
+    }]
+
+
+def _entry_points(group: str):
+    """List the entry points in a group (without loading them)"""
+    try:
+        return list(metadata.entry_points(group=group))
+    except TypeError:
+        # Python < 3.10
+        return list(metadata.entry_points().get(group, []))
+
+
+class TemplateRegistry:
+    """Index of available templates that imports each one only on first use
+
+    Discovery looks at the built-in templates package, any extra template
+    directories (Python modules or YAML/JSON definitions) and the
+    "multiverse.templates" entry point group. Metadata comes from an AST
+    scan or the validated definition, cached in a manifest keyed by file
+    size and modification time, so startup touches no template code at
+    all. get() imports and instantiates a template the first time it is
+    asked for and keeps the instance.
+    """
+
+    def __init__(self, template_dirs: Iterable[Path] = (), manifest_file: Path = None,
+                 entry_point_group: str = ENTRY_POINT_GROUP):
+        self.builtin_dir = Path(__file__).parent
+        self.template_dirs = [Path(d) for d in template_dirs]
+        self.manifest_file = Path(manifest_file) if manifest_file else None
+        self.entry_point_group = entry_point_group
+        self._index = None
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def _discover(self) -> Dict[str, dict]:
+        """Build the template index from the manifest, directories and entry points"""
+        manifest = {}
+        if self.manifest_file is not None:
+            cached = read_json(self.manifest_file, default={})
+            if cached.get("version") == MANIFEST_VERSION:
+                manifest = cached.get("files", {})
+
+        index = {}
+        files = {}
+        for directory, package in [(self.builtin_dir, __package__)] + \
+                [(d, None) for d in self.template_dirs]:
+            if not directory.is_dir():
+                continue
+            for path in sorted(directory.iterdir()):
+                if path.suffix == ".py" and path.stem not in SKIP_MODULES:
+                    scan = scan_template_module
+                elif path.suffix in DEFINITION_SUFFIXES:
+                    scan = scan_template_definition
+                else:
+                    continue
+                stat = path.stat()
+                entry = manifest.get(str(path))
+                if (entry is None or entry["mtime_ns"] != stat.st_mtime_ns
+                        or entry["size"] != stat.st_size):
+                    try:
+                        templates = scan(path)
+                    except (OSError, SyntaxError, ValueError) as e:
+                        print(f"Error scanning template {path.name}: {e}")
+                        continue
+                    entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                             "templates": templates}
+                files[str(path)] = entry
+
+                for info in entry["templates"]:
+                    source = {"path": str(path)}
+                    if package and scan is scan_template_module:
+                        source["module"] = f"{package}.{path.stem}"
+                    index.setdefault(info["key"], dict(info, **source))
+
+        if self.manifest_file is not None and files != manifest:
+            try:
+                atomic_write_json(self.manifest_file,
+                                  {"version": MANIFEST_VERSION, "files": files})
+            except OSError as e:
+                print(f"Error saving template manifest: {e}")
+
+        # Installed plugins; a local template of the same key wins
+        for entry_point in _entry_points(self.entry_point_group):
+            index.setdefault(entry_point.name.lower(), {
+                "key": entry_point.name.lower(),
+                "name": entry_point.name,
+                "entry_point": entry_point
+            })
+        return index
+
+    def _get_index(self) -> Dict[str, dict]:
+        """Get the template index, discovering templates on first use"""
+        with self._lock:
+            if self._index is None:
+                self._index = self._discover()
+            return self._index
+
+    def refresh(self):
+        """Forget the index so the next lookup rediscovers templates"""
+        with self._lock:
+            self._index = None
+
+    def keys(self) -> List[str]:
+        """Get the keys of every available template"""
+        return list(self._get_index().keys())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._get_index()
+
+    def info(self, key: str) -> Optional[dict]:
+        """Get a template's indexed metadata without loading it"""
+        info = self._get_index().get(key)
+        if info is None:
+            return None
+        return {k: v for k, v in info.items() if k != "entry_point"}
+
+    def get(self, key: str):
+        """Get a template instance, importing it on first use"""
+        with self._lock:
+            if key in self._instances:
+                return self._instances[key]
+            try:
+                info = self._get_index().get(key)
+                if info is None:
+                    return None
+                template = self._load(info)
+            except Exception as e:
+                print(f"Error loading template '{key}': {e}")
+                return None
+            self._instances[key] = template
+            return template
+
+    def _load(self, info: dict):
+        """Import and instantiate an indexed template"""
+        if "entry_point" in info:
+            return info["entry_point"].load()()
+
+        if info.get("declarative"):
+            return DeclarativeTemplate.from_file(info["path"])
+
+        if "module" in info:
+            module = importlib.import_module(info["module"])
+        else:
+            spec = importlib.util.spec_from_file_location(
+                f"multiverse_templates.{Path(info['path']).stem}", info["path"]
+            )
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        return getattr(module, info["class"])()
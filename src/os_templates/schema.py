@@ -0,0 +1,240 @@
+"""
+Template Schema
+Compiled validators and deep merging for VM and template configurations
+"""
+
+import re
+from typing import Callable, List
+
+# Python types accepted for each schema type name
+TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool
+}
+
+
+class ValidationError(ValueError):
+    """Raised when a configuration does not match its schema"""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+def compile_schema(schema: dict) -> Callable[[object, str], List[str]]:
+    """Compile a schema into a checker returning a list of error messages
+
+    Supports a JSON Schema subset: type, properties, required,
+    additionalProperties (bool or schema), propertyNames, items, enum,
+    minimum, maximum, minLength and pattern. All lookups and regexes are resolved once here, so
+    checking a config only runs the resulting closures.
+    """
+    checks = []
+
+    if "type" in schema:
+        type_name = schema["type"]
+        python_type = TYPES[type_name]
+
+        def check_type(value, path):
+            # bool is an int subclass, but never a valid number here
+            if isinstance(value, bool) and type_name != "boolean":
+                return [f"{path}: expected {type_name}, got boolean"]
+            if not isinstance(value, python_type):
+                return [f"{path}: expected {type_name}, got {type(value).__name__}"]
+            return []
+
+        checks.append((True, check_type))
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+        checks.append((False, lambda value, path: [] if value in allowed
+                       else [f"{path}: must be one of {allowed}"]))
+
+    if "minimum" in schema:
+        minimum = schema["minimum"]
+        checks.append((False, lambda value, path: [] if value >= minimum
+                       else [f"{path}: must be at least {minimum}"]))
+
+    if "maximum" in schema:
+        maximum = schema["maximum"]
+        checks.append((False, lambda value, path: [] if value <= maximum
+                       else [f"{path}: must be at most {maximum}"]))
+
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+        checks.append((False, lambda value, path: [] if len(value) >= min_length
+                       else [f"{path}: must be at least {min_length} characters"]))
+
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+        checks.append((False, lambda value, path: [] if pattern.search(value)
+                       else [f"{path}: {value!r} is not allowed"]))
+
+    if any(key in schema for key in ("properties", "required", "additionalProperties",
+                                     "propertyNames")):
+        properties = {key: compile_schema(sub) for key, sub in schema.get("properties", {}).items()}
+        required = list(schema.get("required", []))
+        allow_extra = schema.get("additionalProperties", True)
+        check_extra = compile_schema(allow_extra) if isinstance(allow_extra, dict) else None
+        check_name = compile_schema(schema["propertyNames"]) if "propertyNames" in schema else None
+
+        def check_object(value, path):
+            errors = [f"{path}.{key}: is required" for key in required if key not in value]
+            for key, item in value.items():
+                if check_name is not None:
+                    errors.extend(check_name(key, f"{path}.{key}"))
+                check = properties.get(key, check_extra)
+                if check is not None:
+                    errors.extend(check(item, f"{path}.{key}"))
+                elif not allow_extra:
+                    errors.append(f"{path}.{key}: unknown setting")
+            return errors
+
+        checks.append((False, check_object))
+
+    if "items" in schema:
+        check_item = compile_schema(schema["items"])
+
+        def check_items(value, path):
+            errors = []
+            for i, item in enumerate(value):
+                errors.extend(check_item(item, f"{path}[{i}]"))
+            return errors
+
+        checks.append((False, check_items))
+
+    def validate(value, path: str = "config") -> List[str]:
+        errors = []
+        for is_type_check, check in checks:
+            errors.extend(check(value, path))
+            # Further checks assume the type is right
+            if is_type_check and errors:
+                break
+        return errors
+
+    return validate
+
+
+def deep_merge(base: dict, overrides: dict) -> dict:
+    """Merge overrides into base, returning a new dict
+
+    Nested dicts are merged key by key rather than replaced, and every
+    dict and list in the result is a fresh copy, so the result can be
+    changed freely without touching either input.
+    """
+    merged = {}
+    for key, value in base.items():
+        override = overrides.get(key, value)
+        if key not in overrides:
+            merged[key] = _copy_value(value)
+        elif isinstance(value, dict) and isinstance(override, dict):
+            merged[key] = deep_merge(value, override)
+        else:
+            merged[key] = _copy_value(override)
+    for key, value in overrides.items():
+        if key not in base:
+            merged[key] = _copy_value(value)
+    return merged
+
+
+def _copy_value(value):
+    """Copy dicts and lists all the way down, leaving scalars shared"""
+    if isinstance(value, dict):
+        return {key: _copy_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_value(item) for item in value]
+    return value
+
+
+# Template-layout hardware settings (memory in MB)
+HARDWARE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "memory": {"type": "integer", "minimum": 128, "maximum": 1048576},
+        "storage": {"type": "integer", "minimum": 1, "maximum": 65536},
+        "cpu_cores": {"type": "integer", "minimum": 1, "maximum": 256},
+        "display": {
+            "type": "object",
+            "properties": {
+                "width": {"type": "integer", "minimum": 320, "maximum": 7680},
+                "height": {"type": "integer", "minimum": 200, "maximum": 4320},
+                "refresh_rate": {"type": "integer", "minimum": 1, "maximum": 360}
+            }
+        },
+        "network": {
+            "type": "object",
+            "properties": {
+                "type": {"type": "string", "enum": ["nat", "bridge"]},
+                "enabled": {"type": "boolean"},
+                "bridge": {"type": "string", "minLength": 1},
+                "network": {"type": "string", "minLength": 1}
+            }
+        }
+    }
+}
+
+# VM configs as passed to VMManager.create_vm (memory in GB at the top level)
+VM_CONFIG_SCHEMA = {
+    "type": "object",
+    "required": ["name"],
+    "properties": {
+        "name": {"type": "string", "pattern": r"^(?!\.)[^/\\\x00]{1,128}$"},
+        "os_template": {"type": "string"},
+        "memory": {"type": "integer", "minimum": 1, "maximum": 1024},
+        "storage": {"type": "integer", "minimum": 1, "maximum": 65536},
+        "cpu_cores": {"type": "integer", "minimum": 1, "maximum": 256},
+        "description": {"type": "string"},
+        "features": {"type": "object"},
+        "mac_address": {"type": "string", "pattern": r"^([0-9a-fA-F]{2}:){5}[0-9a-fA-F]{2}$"},
+        "pooled": {"type": "boolean"},
+        "config": HARDWARE_SCHEMA
+    }
+}
+
+# Layer names and file paths end up in paths on the host while building
+LAYER_NAME_PATTERN = r"^(?!\.)[^/\\\x00]{1,128}$"
+LAYER_FILE_PATTERN = r"^(?!/)(?!(.*/)?\.\.(/|$))[^\\\x00]+$"
+
+# Declarative template definitions (YAML or JSON files)
+TEMPLATE_SCHEMA = {
+    "type": "object",
+    "required": ["name", "default_config"],
+    "additionalProperties": False,
+    "properties": {
+        "name": {"type": "string", "minLength": 1},
+        "version": {"type": "string"},
+        "description": {"type": "string"},
+        "default_config": dict(HARDWARE_SCHEMA, required=["memory", "storage", "cpu_cores"]),
+        "design_features": {"type": "object"},
+        "color_palette": {"type": "object"},
+        "essential_apps": {
+            "type": "array",
+            "items": {"type": "object", "required": ["name"]}
+        },
+        "build_layers": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["name"],
+                "additionalProperties": False,
+                "properties": {
+                    "name": {"type": "string", "pattern": LAYER_NAME_PATTERN},
+                    "script": {"type": "string"},
+                    "files": {
+                        "type": "object",
+                        "propertyNames": {"type": "string", "pattern": LAYER_FILE_PATTERN},
+                        "additionalProperties": {"type": "string"}
+                    }
+                }
+            }
+        }
+    }
+}
+
+check_vm_config = compile_schema(VM_CONFIG_SCHEMA)
+check_template_definition = compile_schema(TEMPLATE_SCHEMA)
+
@@ -8,19 +8,30 @@ from PyQt6.QtWidgets import (
     QPushButton, QLabel, QScrollArea, QFrame, QGridLayout,
     QStackedWidget, QSizePolicy
 )
-from PyQt6.QtCore import Qt, QSize, pyqtSignal, QTimer
+from PyQt6.QtCore import Qt, QSize, pyqtSignal, QTimer, QSettings
 from PyQt6.QtGui import QFont, QPalette, QColor, QPixmap
 
 from ui.vm_card import VMCard
 from ui.create_vm_dialog import CreateVMDialog
 from ui.neumorphic_style import NeumorphicStyle
+from ui.system_monitor import SystemMonitor
+from ui.vm_list_view import VMListView
 from utils.animation_manager import AnimationManager
+from vm.metrics import MetricsCollector
+from vm.vm_manager import VMManager
+from vm.warm_pool import WarmPool
 
 
 class MainWindow(QMainWindow):
     """Main application window with dark neumorphic design"""
     
-    def __init__(self):
+    # Fleets larger than this are shown in the virtualized list instead of cards
+    list_view_threshold = 50
+    
+    # Registry diffs from VMManager, delivered on the GUI thread
+    vm_changes = pyqtSignal(dict)
+    
+    def __init__(self, vm_manager: VMManager = None):
         super().__init__()
         self.setWindowTitle("∞ Multiverse - Virtual OS Hub")
         self.setMinimumSize(1200, 800)
@@ -28,9 +39,40 @@ class MainWindow(QMainWindow):
         # Initialize animation manager
         self.animation_manager = AnimationManager()
         
+        # VM backend
+        self.vm_manager = vm_manager if vm_manager is not None else VMManager()
+        
+        # Warm pool of ready NectarOS instances for the quick launch action
+        # (opt-in: each instance is a real VM disk and registry entry)
+        settings = QSettings("Multiverse", "VMs")
+        self.warm_pool = WarmPool(
+            self.vm_manager, "nectaros",
+            size=int(settings.value("warm_pool_size", 0)),
+            preboot=settings.value("warm_pool_preboot", False, type=bool)
+        )
+        if self.warm_pool.size > 0:
+            self.warm_pool.refill_async()
+        
+        # Live VM metrics, sampled in the background
+        self.vm_cards = {}
+        self.vm_list = None
+        self.metrics = MetricsCollector(self.vm_manager, interval=1.0)
+        self.metrics.start()
+        self.system_monitor = None
+        
+        # Keep the VM grid in step with the registry, patching only what changed
+        self.vm_changes.connect(self.apply_vm_changes, Qt.ConnectionType.QueuedConnection)
+        self._unsubscribe_vms = self.vm_manager.subscribe(self.vm_changes.emit)
+        
         self.setup_ui()
         self.apply_neumorphic_style()
         
+        # Cards pick up new samples at most once per second
+        self._metrics_generation = -1
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.refresh_metrics)
+        self.metrics_timer.start(1000)
+        
         # Start entrance animations
         QTimer.singleShot(100, self.start_entrance_animations)
         
@@ -208,33 +250,79 @@ class MainWindow(QMainWindow):
         layout.addWidget(title)
         
         # VM cards grid
-        grid = QGridLayout()
-        grid.setSpacing(20)
-        
-        # Sample VM cards (will be populated dynamically)
-        sample_vms = [
-            {
-                "name": "NectarOS Demo",
-                "os": "NectarOS",
-                "status": "running",
-                "memory": "2GB",
-                "storage": "20GB"
-            },
-            {
-                "name": "Test Environment",
-                "os": "NectarOS",
-                "status": "stopped",
-                "memory": "1GB",
-                "storage": "10GB"
-            }
-        ]
+        self.vm_section_layout = layout
+        self.vm_grid = QGridLayout()
+        self.vm_grid.setSpacing(0)  # cards keep a shadow margin of their own
+        layout.addLayout(self.vm_grid)
+        
+        # Cards keep copies, so changes can be compared against what they show
+        vms = [dict(vm) for vm in self.vm_manager.get_all_vms()]
+        if len(vms) > self.list_view_threshold:
+            self.show_vm_list(vms)
+        else:
+            for vm_data in vms:
+                self.add_vm_card(vm_data)
+                
+        return vm_section
         
-        for i, vm_data in enumerate(sample_vms):
-            vm_card = VMCard(vm_data)
-            grid.addWidget(vm_card, i // 2, i % 2)
+    def add_vm_card(self, vm_data):
+        """Add a card for a VM in the next free grid slot"""
+        i = len(self.vm_cards)
+        vm_card = VMCard(vm_data)
+        self.vm_cards[vm_data["name"]] = vm_card
+        self.vm_grid.addWidget(vm_card, i // 2, i % 2)
+        
+    def remove_vm_view(self, vm_name):
+        """Remove a VM from the grid, moving up only the cards after it"""
+        if self.vm_list is not None:
+            self.vm_list.vm_model.remove_vm(vm_name)
+            return
+        if vm_name not in self.vm_cards:
+            return
             
-        layout.addLayout(grid)
-        return vm_section
+        names = list(self.vm_cards)
+        index = names.index(vm_name)
+        vm_card = self.vm_cards.pop(vm_name)
+        self.vm_grid.removeWidget(vm_card)
+        vm_card.deleteLater()
+        
+        for i, name in enumerate(names[index + 1:], start=index):
+            card = self.vm_cards[name]
+            self.vm_grid.removeWidget(card)
+            self.vm_grid.addWidget(card, i // 2, i % 2)
+            
+    def show_vm_list(self, vms):
+        """Show VMs in the virtualized list instead of cards"""
+        # Widgets per card don't scale to large fleets - paint visible rows only
+        for vm_card in self.vm_cards.values():
+            self.vm_grid.removeWidget(vm_card)
+            vm_card.deleteLater()
+        self.vm_cards = {}
+        
+        self.vm_list = VMListView()
+        self.vm_list.setMinimumHeight(560)
+        self.vm_list.vm_model.set_vms(vms)
+        self.vm_list.vm_model.set_metrics(self.metrics.latest())
+        self.vm_section_layout.addWidget(self.vm_list)
+        
+    def apply_vm_changes(self, diff):
+        """Patch the VM grid with a registry diff, touching only the affected VMs"""
+        for vm_name in diff["removed"]:
+            self.remove_vm_view(vm_name)
+            
+        for vm_data in list(diff["added"].values()) + list(diff["changed"].values()):
+            # Warm pool instances stay hidden until they are handed out
+            if vm_data.get("pooled"):
+                self.remove_vm_view(vm_data["name"])
+            elif self.vm_list is not None:
+                self.vm_list.vm_model.upsert_vm(vm_data)
+            elif vm_data["name"] in self.vm_cards:
+                self.vm_cards[vm_data["name"]].update_vm(vm_data)
+            else:
+                self.add_vm_card(vm_data)
+                
+        if self.vm_list is None and len(self.vm_cards) > self.list_view_threshold:
+            self.show_vm_list([card.vm_data for card in self.vm_cards.values()])
         
     def apply_neumorphic_style(self):
         """Apply neumorphic styling"""
@@ -269,29 +357,48 @@ class MainWindow(QMainWindow):
         
     def on_vm_created(self, vm_config):
         """Handle VM creation"""
-        print(f"🎉 NectarOS environment created: {vm_config['name']}")
-        
-        # Add the new VM to the list
-        new_vm = {
-            "name": vm_config["name"],
-            "os": "NectarOS",
-            "status": "stopped",
-            "memory": f"{vm_config['memory']}GB",
-            "storage": f"{vm_config['storage']}GB"
-        }
-        
-        # Update the VM grid
-        self.update_vm_grid()
-        
-        # Show success message
         from PyQt6.QtWidgets import QMessageBox
+        
+        # The new card arrives through the VM change feed
+        if not self.vm_manager.create_vm(vm_config):
+            QMessageBox.warning(self, "Error", f"NectarOS environment '{vm_config['name']}' could not be created.")
+            return
+            
+        print(f"🎉 NectarOS environment created: {vm_config['name']}")
         QMessageBox.information(self, "Success", f"NectarOS environment '{vm_config['name']}' has been created successfully!")
         
     def update_vm_grid(self):
-        """Update the VM grid with current VMs"""
-        # This would refresh the VM cards
-        # For now, just print a message
-        print("🔄 VM grid updated")
+        """Bring the whole VM grid in line with the registry
+        
+        The change feed keeps the grid current; this is a full resync that
+        still only touches cards whose data differs.
+        """
+        vms = {vm["name"]: dict(vm) for vm in self.vm_manager.get_all_vms()}
+        shown = self.vm_list.vm_model.names() if self.vm_list is not None else list(self.vm_cards)
+        self.apply_vm_changes({
+            "added": {},
+            "changed": vms,
+            "removed": [name for name in shown if name not in vms]
+        })
+        
+    def refresh_metrics(self):
+        """Push the newest metrics sample to the VM cards"""
+        if self.metrics.generation == self._metrics_generation:
+            return
+        self._metrics_generation = self.metrics.generation
+        
+        latest = self.metrics.latest()
+        if self.vm_list is not None:
+            self.vm_list.vm_model.set_metrics(latest)
+        for vm_name, card in self.vm_cards.items():
+            card.update_metrics(latest.get(vm_name))
+            
+    def closeEvent(self, event):
+        """Stop background sampling and VM updates when the window closes"""
+        self.metrics_timer.stop()
+        self.metrics.stop()
+        self._unsubscribe_vms()
+        super().closeEvent(event)
         
     def start_entrance_animations(self):
         """Start entrance animations for the UI"""
@@ -299,6 +406,26 @@ class MainWindow(QMainWindow):
         self.setWindowOpacity(0.0)
         QTimer.singleShot(100, lambda: self.setWindowOpacity(1.0))
             
+    def launch_nectaros(self):
+        """Launch a NectarOS environment, from the warm pool when possible"""
+        existing = self.vm_manager.vms
+        index = 1
+        while f"NectarOS {index}" in existing:
+            index += 1
+        vm_name = f"NectarOS {index}"
+        
+        vm = self.warm_pool.acquire(vm_name)
+        if vm is None:
+            # Pool is empty - provision from scratch
+            self.show_create_vm_dialog()
+            return
+            
+        if vm["status"] != "running":
+            self.vm_manager.start_vm(vm_name)
+            
+        from PyQt6.QtWidgets import QMessageBox
+        QMessageBox.information(self, "NectarOS Ready", f"NectarOS environment '{vm_name}' is ready!")
+        
     def handle_quick_action(self, action):
         """Handle quick action button clicks"""
         print(f"Quick action: {action}")
@@ -310,10 +437,18 @@ class MainWindow(QMainWindow):
             
         # Implement quick actions
         if action == "launch-nectaros":
-            self.show_create_vm_dialog()
+            self.launch_nectaros()
         elif action == "install-template":
             print("📦 Template installation dialog would open here")
         elif action == "vm-settings":
             print("⚙️ VM settings dialog would open here")
         elif action == "system-monitor":
-            print("📊 System monitor would open here") 
\ No newline at end of file
+            self.show_system_monitor()
+            
+    def show_system_monitor(self):
+        """Show the system monitor window (one instance, kept between openings)"""
+        if self.system_monitor is None:
+            self.system_monitor = SystemMonitor(self.metrics, self)
+        self.system_monitor.show()
+        self.system_monitor.raise_()
+        self.system_monitor.activateWindow()
@@ -3,6 +3,10 @@ Neumorphic styling for Multiverse application
 Dark theme with soft shadows and depth effects (PyQt6 compatible)
 """
 
+# Room a surface leaves around itself for its painted shadows (see ui.shadows)
+SHADOW_MARGIN = 20
+
+
 class NeumorphicStyle:
     """Neumorphic styling class for dark theme"""
     
@@ -191,12 +195,29 @@ class NeumorphicStyle:
             height: 0px;
         }}
         
+        #vm-list {{
+            background: transparent;
+            border: none;
+        }}
+        """ + self.get_vm_card_style()
+        
+    def get_vm_card_style(self):
+        """Get the stylesheet rules for every VMCard
+        
+        Cards never set a stylesheet of their own; these rules are part of
+        the window stylesheet, parsed once, and status colors follow the
+        status label's dynamic "status" property. Qt stylesheets have no
+        box-shadow, so the margin leaves room for VMCard to paint its
+        shadows (see ui.shadows).
+        """
+        return f"""
         /* VM Card Styling */
         #vm-card {{
-            background-color: {self.colors['bg_tertiary']};
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
+                stop:0 {self.colors['bg_secondary']}, stop:1 {self.colors['bg_tertiary']});
             border: 1px solid {self.colors['border']};
-            border-radius: 12px;
-            padding: 15px;
+            border-radius: 15px;
+            margin: {SHADOW_MARGIN}px;
         }}
         
         #vm-card:hover {{
@@ -219,22 +240,26 @@ class NeumorphicStyle:
             color: {self.colors['text_muted']};
         }}
         
-        #vm-status-running {{
-            color: {self.colors['success']};
+        #vm-status {{
+            color: {self.colors['text_secondary']};
             font-weight: bold;
             font-size: 12px;
         }}
         
-        #vm-status-stopped {{
+        #vm-status[status="running"] {{
+            color: {self.colors['success']};
+        }}
+        
+        #vm-status[status="stopped"] {{
             color: {self.colors['error']};
-            font-weight: bold;
-            font-size: 12px;
         }}
         
-        #vm-status-paused {{
+        #vm-status[status="paused"], #vm-status[status="suspended"] {{
             color: {self.colors['warning']};
-            font-weight: bold;
-            font-size: 12px;
+        }}
+        
+        #vm-status[status="queued"] {{
+            color: {self.colors['accent']};
         }}
         
         #vm-progress {{
@@ -246,14 +271,16 @@ class NeumorphicStyle:
         }}
         
         #vm-progress::chunk {{
-            background-color: {self.colors['accent']};
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                stop:0 {self.colors['accent']}, stop:1 {self.colors['accent_hover']});
             border-radius: 7px;
         }}
         
         #vm-start-button, #vm-stop-button, #vm-settings-button {{
-            background-color: {self.colors['bg_secondary']};
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                stop:0 {self.colors['bg_tertiary']}, stop:1 {self.colors['bg_secondary']});
             border: 1px solid {self.colors['border']};
-            border-radius: 6px;
+            border-radius: 8px;
             padding: 8px 12px;
             color: {self.colors['text_primary']};
             font-size: 12px;
@@ -261,19 +288,19 @@ class NeumorphicStyle:
         }}
         
         #vm-start-button:hover {{
-            background-color: {self.colors['success']};
+            background: {self.colors['success']};
             border-color: {self.colors['success']};
             color: white;
         }}
         
         #vm-stop-button:hover {{
-            background-color: {self.colors['error']};
+            background: {self.colors['error']};
             border-color: {self.colors['error']};
             color: white;
         }}
         
         #vm-settings-button:hover {{
-            background-color: {self.colors['accent']};
+            background: {self.colors['accent']};
             border-color: {self.colors['accent']};
             color: white;
         }}
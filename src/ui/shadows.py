@@ -0,0 +1,116 @@
+"""
+Neumorphic shadows for Multiverse
+Blurred shadows rendered once as nine-patches and blitted while painting
+"""
+
+import math
+
+from PyQt6.QtWidgets import QGraphicsScene, QGraphicsPixmapItem, QGraphicsBlurEffect
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QPainter, QPixmap, QPixmapCache, QColor, QImage
+
+from ui.neumorphic_style import NeumorphicStyle, SHADOW_MARGIN
+
+# Shadows per surface: (x/y offset, blur radius, palette color) at rest and on hover
+NEUMORPHIC_SHADOWS = {
+    False: ((3, 10, 'shadow_dark'), (-3, 10, 'shadow_light')),
+    True: ((5, 15, 'shadow_dark'), (-5, 15, 'shadow_light'))
+}
+
+# Size classes by a surface's shorter side: larger surfaces cast larger shadows
+SIZE_CLASSES = ((120, 0.6), (240, 1.0), (None, 1.3))
+
+# Palette used when a caller passes no colors
+PALETTE = NeumorphicStyle().colors
+
+
+def size_class(rect: QRectF) -> int:
+    """Get the size class of a surface"""
+    side = min(rect.width(), rect.height())
+    for i, (limit, _) in enumerate(SIZE_CLASSES):
+        if limit is None or side < limit:
+            return i
+    return len(SIZE_CLASSES) - 1
+
+
+def _blur(image: QImage, radius: float) -> QImage:
+    """Blur an image with Qt's blur effect"""
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(QPixmap.fromImage(image))
+    effect = QGraphicsBlurEffect()
+    effect.setBlurRadius(radius)
+    effect.setBlurHints(QGraphicsBlurEffect.BlurHint.QualityHint)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+
+    result = QImage(image.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    result.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(result)
+    scene.render(painter, QRectF(result.rect()), QRectF(image.rect()))
+    painter.end()
+    return result
+
+
+def shadow_patch(radius: int, blur: int, color: str) -> QPixmap:
+    """Get the nine-patch of a blurred rounded rectangle, rendering it only once
+
+    The patch is the shadow of a (2 * radius + 1) square surface plus the
+    blur's spread on every side; its middle row and column stretch to fit
+    any surface size. Patches live in QPixmapCache, an LRU keyed here by
+    radius, blur and color.
+    """
+    key = f"multiverse-shadow:{radius}:{blur}:{color}"
+    patch = QPixmapCache.find(key)
+    if patch is not None:
+        return patch
+
+    spread = math.ceil(blur)
+    size = 2 * (spread + radius) + 1
+    image = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QColor(color))
+    painter.drawRoundedRect(QRectF(spread, spread, 2 * radius + 1, 2 * radius + 1), radius, radius)
+    painter.end()
+
+    patch = QPixmap.fromImage(_blur(image, blur))
+    QPixmapCache.insert(key, patch)
+    return patch
+
+
+def draw_shadow(painter: QPainter, rect: QRectF, radius: int, blur: int, color: str):
+    """Blit the shadow of a rounded rectangle surface"""
+    patch = shadow_patch(radius, blur, color)
+    corner = (patch.width() - 1) / 2
+    spread = corner - radius
+    outer = QRectF(rect).adjusted(-spread, -spread, spread, spread)
+    middle_width = outer.width() - 2 * corner
+    middle_height = outer.height() - 2 * corner
+    if middle_width < 0 or middle_height < 0:
+        painter.drawPixmap(outer, patch, QRectF(patch.rect()))
+        return
+
+    # Corners at their own size, edges and center stretched from the middle row/column
+    columns = ((0, corner, outer.left(), corner),
+               (corner, 1, outer.left() + corner, middle_width),
+               (corner + 1, corner, outer.right() - corner, corner))
+    rows = ((0, corner, outer.top(), corner),
+            (corner, 1, outer.top() + corner, middle_height),
+            (corner + 1, corner, outer.bottom() - corner, corner))
+    for source_y, source_height, target_y, target_height in rows:
+        for source_x, source_width, target_x, target_width in columns:
+            painter.drawPixmap(QRectF(target_x, target_y, target_width, target_height), patch,
+                               QRectF(source_x, source_y, source_width, source_height))
+
+
+def draw_neumorphic_shadows(painter: QPainter, rect: QRectF, radius: int, hovered: bool = False,
+                            colors: dict = None):
+    """Draw the dark and light shadows that raise a surface off the background"""
+    colors = colors or PALETTE
+    scale = SIZE_CLASSES[size_class(rect)][1]
+    for offset, blur, color in NEUMORPHIC_SHADOWS[hovered]:
+        offset = round(offset * scale)
+        draw_shadow(painter, QRectF(rect).translated(offset, offset), radius,
+                    round(blur * scale), colors[color])
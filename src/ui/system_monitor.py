@@ -0,0 +1,332 @@
+"""
+System Monitor for Multiverse
+Rolling charts of host usage and per-VM metrics
+"""
+
+from typing import List, Sequence, Tuple
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QWidget, QSizePolicy
+)
+from PyQt6.QtCore import Qt, QTimer, QRectF, QPointF
+from PyQt6.QtGui import QPainter, QColor, QPen, QPolygonF, QFont
+
+from ui.neumorphic_style import NeumorphicStyle
+from vm.metrics import MetricsCollector
+
+# Time windows offered by the monitor, in seconds
+WINDOWS = [
+    ("Last 5 minutes", 300),
+    ("Last hour", 3600),
+    ("Last 24 hours", 86400)
+]
+
+# Per-VM metrics: (label, metric, unit)
+VM_METRICS = [
+    ("CPU", "cpu", "%"),
+    ("Memory", "memory", "MB"),
+    ("Disk read", "disk_read", "B/s"),
+    ("Disk write", "disk_write", "B/s"),
+    ("Network in", "net_rx", "B/s"),
+    ("Network out", "net_tx", "B/s")
+]
+
+# Line colors, reused in order when there are more series than colors
+SERIES_COLORS = [
+    "#4a9eff", "#4ade80", "#fbbf24", "#f87171", "#a78bfa",
+    "#22d3ee", "#fb923c", "#f472b6", "#a3e635", "#94a3b8"
+]
+
+# Series named in a chart's legend before the rest are summarised
+LEGEND_ENTRIES = 6
+
+
+def downsample(points: Sequence[float], buckets: int) -> List[float]:
+    """Reduce points to at most `buckets` values, keeping each bucket's peak"""
+    if len(points) <= buckets:
+        return list(points)
+    size = -(-len(points) // buckets)
+    # Buckets are aligned to the newest point so the right edge stays exact
+    first = len(points) % size or size
+    reduced = [max(points[:first])]
+    for start in range(first, len(points), size):
+        reduced.append(max(points[start:start + size]))
+    return reduced
+
+
+def format_value(value: float, unit: str) -> str:
+    """Format a chart value with its unit (byte rates get a binary prefix)"""
+    if unit == "B/s":
+        if value < 1024:
+            return f"{value:.0f} B/s"
+        for prefix in ("K", "M", "G", "T"):
+            value /= 1024
+            if value < 1024 or prefix == "T":
+                return f"{value:.1f} {prefix}B/s"
+    if unit == "%":
+        return f"{value:.0f}%"
+    return f"{value:.0f} {unit}"
+
+
+class TimeSeriesWidget(QWidget):
+    """Chart that paints any number of line series in a single pass
+
+    Each series is drawn as one polyline, downsampled to the plot's pixel
+    width, so a chart with hundreds of VMs costs one paint per refresh
+    rather than a widget per point.
+    """
+
+    def __init__(self, title: str, unit: str, maximum: float = None, parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.unit = unit
+        self.maximum = maximum
+        self.seconds = WINDOWS[0][1]
+        self.series = []
+        self.colors = NeumorphicStyle().colors
+        self.setMinimumHeight(160)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+    def set_series(self, seconds: float, series: List[Tuple[str, float, List[float]]]):
+        """Replace the charted series: (label, seconds per point, points) over `seconds`"""
+        self.seconds = seconds
+        self.series = series
+        self.update()
+
+    def _scale_maximum(self) -> float:
+        """Get the top of the value axis"""
+        if self.maximum is not None:
+            return self.maximum
+        peak = max((max(points) for _, _, points in self.series if points), default=0.0)
+        if peak <= 0:
+            return 1.0
+        # Round up to 1, 2 or 5 times a power of ten
+        magnitude = 1.0
+        while magnitude * 10 <= peak:
+            magnitude *= 10
+        for factor in (1, 2, 5, 10):
+            if peak <= factor * magnitude:
+                return factor * magnitude
+        return 10 * magnitude
+
+    def paintEvent(self, event):
+        """Paint the frame, grid, lines and legend"""
+        colors = self.colors
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, len(self.series) <= 20)
+
+        bounds = QRectF(self.rect()).adjusted(1, 1, -1, -1)
+        painter.setPen(QPen(QColor(colors['border']), 1))
+        painter.setBrush(QColor(colors['bg_secondary']))
+        painter.drawRoundedRect(bounds, 12, 12)
+
+        font = QFont(self.font())
+        font.setPointSize(9)
+        painter.setFont(font)
+        metrics = painter.fontMetrics()
+        line_height = metrics.height()
+
+        title_font = QFont(font)
+        title_font.setBold(True)
+        title_font.setPointSize(10)
+        painter.setFont(title_font)
+        painter.setPen(QColor(colors['text_primary']))
+        painter.drawText(QPointF(bounds.left() + 14, bounds.top() + 10 + line_height), self.title)
+        painter.setFont(font)
+
+        plot = bounds.adjusted(60, 20 + line_height, -14, -(16 + line_height))
+        if plot.width() <= 0 or plot.height() <= 0:
+            painter.end()
+            return
+
+        # Grid with value labels
+        top = self._scale_maximum()
+        painter.setPen(QPen(QColor(colors['bg_tertiary']), 1))
+        for i in range(5):
+            y = plot.bottom() - plot.height() * i / 4
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+        painter.setPen(QColor(colors['text_muted']))
+        for i in (0, 2, 4):
+            y = plot.bottom() - plot.height() * i / 4
+            label_rect = QRectF(bounds.left() + 4, y - line_height / 2, plot.left() - bounds.left() - 10, line_height)
+            painter.drawText(label_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                             format_value(top * i / 4, self.unit))
+
+        if not any(points for _, _, points in self.series):
+            painter.drawText(plot, Qt.AlignmentFlag.AlignCenter, "No data yet")
+            painter.end()
+            return
+
+        # Lines, newest point at the right edge
+        pixels_per_second = plot.width() / self.seconds
+        width = max(1, int(plot.width()))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.setClipRect(plot)
+        for i, (label, step, points) in enumerate(self.series):
+            if not points:
+                continue
+            reduced = downsample(points, width)
+            step *= len(points) / len(reduced)
+            last = len(reduced) - 1
+            polygon = QPolygonF([
+                QPointF(plot.right() - (last - j) * step * pixels_per_second,
+                        plot.bottom() - min(value, top) / top * plot.height())
+                for j, value in enumerate(reduced)
+            ])
+            painter.setPen(QPen(QColor(SERIES_COLORS[i % len(SERIES_COLORS)]), 1.5))
+            painter.drawPolyline(polygon)
+        painter.setClipping(False)
+
+        # Legend along the bottom edge
+        x = plot.left()
+        y = bounds.bottom() - 8
+        for i, (label, _, points) in enumerate(self.series[:LEGEND_ENTRIES]):
+            painter.fillRect(QRectF(x, y - line_height / 2 - 4, 10, 4),
+                             QColor(SERIES_COLORS[i % len(SERIES_COLORS)]))
+            painter.setPen(QColor(colors['text_secondary']))
+            text = f"{label} {format_value(points[-1], self.unit)}" if points else label
+            painter.drawText(QPointF(x + 14, y - 2), text)
+            x += 14 + metrics.horizontalAdvance(text) + 16
+        if len(self.series) > LEGEND_ENTRIES:
+            painter.setPen(QColor(colors['text_muted']))
+            painter.drawText(QPointF(x, y - 2), f"+{len(self.series) - LEGEND_ENTRIES} more")
+        painter.end()
+
+
+class SystemMonitor(QDialog):
+    """Window charting host CPU, memory and disk next to per-VM metrics"""
+
+    def __init__(self, metrics: MetricsCollector, parent=None):
+        super().__init__(parent)
+        self.metrics = metrics
+        self._generation = -1
+        self.setWindowTitle("System Monitor")
+        self.setMinimumSize(900, 640)
+        self.setup_ui()
+        self.apply_style()
+
+        # Charts follow the collector's samples, repainting only when one arrived
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(1000)
+        self.refresh(force=True)
+
+    def setup_ui(self):
+        """Setup the monitor interface"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(24, 24, 24, 24)
+        layout.setSpacing(16)
+
+        # Title and controls
+        header = QHBoxLayout()
+        title = QLabel("📊 System Monitor")
+        title.setObjectName("monitor-title")
+        header.addWidget(title)
+        header.addStretch()
+
+        self.window_combo = QComboBox()
+        self.window_combo.setObjectName("monitor-combo")
+        for label, seconds in WINDOWS:
+            self.window_combo.addItem(label, seconds)
+        self.window_combo.currentIndexChanged.connect(lambda: self.refresh(force=True))
+        header.addWidget(self.window_combo)
+        layout.addLayout(header)
+
+        # Host usage
+        host_row = QHBoxLayout()
+        host_row.setSpacing(16)
+        self.host_charts = {
+            "cpu": TimeSeriesWidget("Host CPU", "%", maximum=100),
+            "memory": TimeSeriesWidget("Host Memory", "%", maximum=100),
+            "disk": TimeSeriesWidget("Host Disk", "%", maximum=100)
+        }
+        for chart in self.host_charts.values():
+            host_row.addWidget(chart)
+        layout.addLayout(host_row, 1)
+
+        # Per-VM series
+        vm_header = QHBoxLayout()
+        self.vm_summary = QLabel()
+        self.vm_summary.setObjectName("monitor-summary")
+        vm_header.addWidget(self.vm_summary)
+        vm_header.addStretch()
+
+        self.metric_combo = QComboBox()
+        self.metric_combo.setObjectName("monitor-combo")
+        for label, metric, unit in VM_METRICS:
+            self.metric_combo.addItem(label, (metric, unit))
+        self.metric_combo.currentIndexChanged.connect(lambda: self.refresh(force=True))
+        vm_header.addWidget(self.metric_combo)
+        layout.addLayout(vm_header)
+
+        self.vm_chart = TimeSeriesWidget("Virtual Machines", "%", maximum=100)
+        self.vm_chart.setMinimumHeight(240)
+        layout.addWidget(self.vm_chart, 2)
+
+    def apply_style(self):
+        """Apply neumorphic styling to the monitor"""
+        colors = NeumorphicStyle().colors
+        self.setStyleSheet(f"""
+        QDialog {{
+            background: {colors['bg_primary']};
+            color: {colors['text_primary']};
+            font-family: 'SF Pro Display', 'Ubuntu', 'Segoe UI', sans-serif;
+        }}
+
+        #monitor-title {{
+            font-size: 22px;
+            font-weight: bold;
+            color: {colors['accent']};
+        }}
+
+        #monitor-summary {{
+            font-size: 14px;
+            color: {colors['text_secondary']};
+        }}
+
+        #monitor-combo {{
+            background: {colors['bg_secondary']};
+            border: 1px solid {colors['border']};
+            border-radius: 8px;
+            padding: 6px 12px;
+            color: {colors['text_primary']};
+            min-width: 140px;
+        }}
+        """)
+
+    def refresh(self, force: bool = False):
+        """Redraw the charts from the collector's history"""
+        generation = self.metrics.generation
+        if not force and generation == self._generation:
+            return
+        self._generation = generation
+        seconds = self.window_combo.currentData()
+
+        for metric, chart in self.host_charts.items():
+            step, points = self.metrics.host_window(metric, seconds)
+            chart.set_series(seconds, [("Host", step, points)])
+
+        metric, unit = self.metric_combo.currentData()
+        self.vm_chart.unit = unit
+        self.vm_chart.maximum = 100 if unit == "%" else None
+        series = []
+        for vm_name in sorted(self.metrics.vm_names()):
+            step, points = self.metrics.window(vm_name, metric, seconds)
+            if points:
+                series.append((vm_name, step, points))
+        self.vm_chart.set_series(seconds, series)
+
+        running = len(self.metrics.latest())
+        self.vm_summary.setText(f"{running} running · {len(series)} with history")
+
+    def showEvent(self, event):
+        """Resume refreshing when shown again"""
+        super().showEvent(event)
+        if not self.refresh_timer.isActive():
+            self.refresh_timer.start(1000)
+            self.refresh(force=True)
+
+    def hideEvent(self, event):
+        """Stop refreshing while hidden (closing or minimizing)"""
+        self.refresh_timer.stop()
+        super().hideEvent(event)
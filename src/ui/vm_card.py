@@ -6,9 +6,10 @@ from PyQt6.QtWidgets import (
     QFrame, QVBoxLayout, QHBoxLayout, QLabel, 
     QPushButton, QProgressBar
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QRectF
+from PyQt6.QtGui import QFont, QPainter
 
+from ui.shadows import SHADOW_MARGIN, draw_neumorphic_shadows
 from utils.animation_manager import AnimationManager
 
 
@@ -24,8 +25,8 @@ class VMCard(QFrame):
         super().__init__()
         self.vm_data = vm_data
         self.animation_manager = AnimationManager()
+        # Styling comes from the window stylesheet (NeumorphicStyle.get_vm_card_style)
         self.setup_ui()
-        self.apply_style()
         
         # Add hover animations
         self.setup_animations()
@@ -33,7 +34,7 @@ class VMCard(QFrame):
     def setup_ui(self):
         """Setup the VM card interface"""
         self.setObjectName("vm-card")
-        self.setMinimumSize(300, 200)
+        self.setMinimumSize(300 + 2 * SHADOW_MARGIN, 200 + 2 * SHADOW_MARGIN)
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -43,59 +44,64 @@ class VMCard(QFrame):
         header = QHBoxLayout()
         
         # VM name
-        name_label = QLabel(self.vm_data["name"])
-        name_label.setObjectName("vm-name")
-        header.addWidget(name_label)
+        self.name_label = QLabel(self.vm_data["name"])
+        self.name_label.setObjectName("vm-name")
+        header.addWidget(self.name_label)
         
         header.addStretch()
         
-        # Status indicator
-        status_label = QLabel(self.vm_data["status"].title())
-        status_label.setObjectName(f"vm-status-{self.vm_data['status']}")
-        header.addWidget(status_label)
+        # Status indicator, colored by the shared stylesheet's status rules
+        self.status_label = QLabel(self.vm_data["status"].title())
+        self.status_label.setObjectName("vm-status")
+        self.status_label.setProperty("status", self.vm_data["status"])
+        header.addWidget(self.status_label)
         
         layout.addLayout(header)
         
         # OS info
-        os_label = QLabel(f"OS: {self.vm_data['os']}")
-        os_label.setObjectName("vm-os")
-        layout.addWidget(os_label)
+        self.os_label = QLabel(f"OS: {self.vm_data['os']}")
+        self.os_label.setObjectName("vm-os")
+        layout.addWidget(self.os_label)
         
         # Resource info
         resources_layout = QHBoxLayout()
         
         # Memory
-        memory_label = QLabel(f"Memory: {self.vm_data['memory']}")
-        memory_label.setObjectName("vm-resource")
-        resources_layout.addWidget(memory_label)
+        self.memory_label = QLabel(f"Memory: {self.vm_data['memory']}")
+        self.memory_label.setObjectName("vm-resource")
+        resources_layout.addWidget(self.memory_label)
         
         # Storage
-        storage_label = QLabel(f"Storage: {self.vm_data['storage']}")
-        storage_label.setObjectName("vm-resource")
-        resources_layout.addWidget(storage_label)
+        self.storage_label = QLabel(f"Storage: {self.vm_data['storage']}")
+        self.storage_label.setObjectName("vm-resource")
+        resources_layout.addWidget(self.storage_label)
         
         layout.addLayout(resources_layout)
         
-        # Progress bar for resource usage (placeholder)
-        progress = QProgressBar()
-        progress.setObjectName("vm-progress")
-        progress.setValue(65)  # Example value
-        progress.setFormat("CPU: 65%")
-        layout.addWidget(progress)
+        # Live CPU usage, fed by the metrics collector
+        self.cpu_bar = QProgressBar()
+        self.cpu_bar.setObjectName("vm-progress")
+        self.cpu_bar.setValue(0)
+        self.cpu_bar.setFormat("CPU: --")
+        layout.addWidget(self.cpu_bar)
         
         # Action buttons
         buttons_layout = QHBoxLayout()
         
-        if self.vm_data["status"] == "running":
-            stop_btn = QPushButton("⏹️ Stop")
-            stop_btn.setObjectName("vm-stop-button")
-            stop_btn.clicked.connect(lambda: self.stop_clicked.emit(self.vm_data["name"]))
-            buttons_layout.addWidget(stop_btn)
-        else:
-            start_btn = QPushButton("▶️ Start")
-            start_btn.setObjectName("vm-start-button")
-            start_btn.clicked.connect(lambda: self.start_clicked.emit(self.vm_data["name"]))
-            buttons_layout.addWidget(start_btn)
+        # Both exist so a status change only toggles which one is shown
+        self.stop_btn = QPushButton("⏹️ Stop")
+        self.stop_btn.setObjectName("vm-stop-button")
+        self.stop_btn.clicked.connect(lambda: self.stop_clicked.emit(self.vm_data["name"]))
+        buttons_layout.addWidget(self.stop_btn)
+        
+        self.start_btn = QPushButton("▶️ Start")
+        self.start_btn.setObjectName("vm-start-button")
+        self.start_btn.clicked.connect(lambda: self.start_clicked.emit(self.vm_data["name"]))
+        buttons_layout.addWidget(self.start_btn)
+        
+        running = self.vm_data["status"] == "running"
+        self.stop_btn.setVisible(running)
+        self.start_btn.setVisible(not running)
         
         settings_btn = QPushButton("⚙️ Settings")
         settings_btn.setObjectName("vm-settings-button")
@@ -104,102 +110,52 @@ class VMCard(QFrame):
         
         layout.addLayout(buttons_layout)
         
-    def apply_style(self):
-        """Apply neumorphic styling to the VM card"""
-        style = """
-        #vm-card {
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                stop:0 #2a2a2a, stop:1 #3a3a3a);
-            border: 1px solid #404040;
-            border-radius: 15px;
-            box-shadow: 3px 3px 10px #0a0a0a,
-                        -3px -3px 10px #4a4a4a;
-        }
-        
-        #vm-card:hover {
-            box-shadow: 5px 5px 15px #0a0a0a,
-                        -5px -5px 15px #4a4a4a;
-        }
-        
-        #vm-name {
-            font-size: 18px;
-            font-weight: bold;
-            color: #ffffff;
-        }
-        
-        #vm-os {
-            font-size: 14px;
-            color: #b0b0b0;
-        }
-        
-        #vm-resource {
-            font-size: 12px;
-            color: #808080;
-        }
-        
-        #vm-status-running {
-            color: #4ade80;
-            font-weight: bold;
-            font-size: 12px;
-        }
-        
-        #vm-status-stopped {
-            color: #f87171;
-            font-weight: bold;
-            font-size: 12px;
-        }
-        
-        #vm-status-paused {
-            color: #fbbf24;
-            font-weight: bold;
-            font-size: 12px;
-        }
-        
-        #vm-progress {
-            background: #1a1a1a;
-            border: 1px solid #404040;
-            border-radius: 8px;
-            text-align: center;
-            color: #ffffff;
-        }
-        
-        #vm-progress::chunk {
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                stop:0 #4a9eff, stop:1 #5aaeff);
-            border-radius: 7px;
-        }
-        
-        #vm-start-button, #vm-stop-button, #vm-settings-button {
-            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                stop:0 #3a3a3a, stop:1 #2a2a2a);
-            border: 1px solid #404040;
-            border-radius: 8px;
-            padding: 8px 12px;
-            color: #ffffff;
-            font-size: 12px;
-            font-weight: 500;
-        }
-        
-        #vm-start-button:hover {
-            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                stop:0 #4ade80, stop:1 #3ade70);
-            border-color: #4ade80;
-        }
-        
-        #vm-stop-button:hover {
-            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                stop:0 #f87171, stop:1 #e86161);
-            border-color: #f87171;
-        }
-        
-        #vm-settings-button:hover {
-            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                stop:0 #4a9eff, stop:1 #3a8eef);
-            border-color: #4a9eff;
-        }
-        """
-        self.setStyleSheet(style)
+    def paintEvent(self, event):
+        """Paint the cached neumorphic shadows around the card, then the card itself"""
+        painter = QPainter(self)
+        surface = QRectF(self.rect()).adjusted(SHADOW_MARGIN, SHADOW_MARGIN, -SHADOW_MARGIN, -SHADOW_MARGIN)
+        draw_neumorphic_shadows(painter, surface, 15, self.underMouse())
+        painter.end()
+        super().paintEvent(event)
+        
+    def update_vm(self, vm_data: dict):
+        """Show changed VM data, touching only the widgets whose values differ"""
+        old = self.vm_data
+        self.vm_data = vm_data
         
+        if vm_data["name"] != old["name"]:
+            self.name_label.setText(vm_data["name"])
+        if vm_data["os"] != old["os"]:
+            self.os_label.setText(f"OS: {vm_data['os']}")
+        if vm_data["memory"] != old["memory"]:
+            self.memory_label.setText(f"Memory: {vm_data['memory']}")
+        if vm_data["storage"] != old["storage"]:
+            self.storage_label.setText(f"Storage: {vm_data['storage']}")
+            
+        if vm_data["status"] != old["status"]:
+            self.status_label.setText(vm_data["status"].title())
+            self.status_label.setProperty("status", vm_data["status"])
+            # Re-match the already parsed rules against the new property
+            self.status_label.style().unpolish(self.status_label)
+            self.status_label.style().polish(self.status_label)
+            
+            running = vm_data["status"] == "running"
+            self.stop_btn.setVisible(running)
+            self.start_btn.setVisible(not running)
+            
+    def update_metrics(self, metrics: dict = None):
+        """Show the VM's latest metrics (None while it isn't running)"""
+        if metrics is None:
+            value, text = 0, "CPU: --"
+        else:
+            value = round(metrics["cpu"])
+            text = f"CPU: {value}%  ·  RAM: {metrics['memory'] / 1024:.1f}GB"
+            
+        # Only touch the widget when the numbers change, to avoid repaints
+        if value != self.cpu_bar.value() or text != self.cpu_bar.format():
+            self.cpu_bar.setValue(value)
+            self.cpu_bar.setFormat(text)
+            
     def setup_animations(self):
         """Setup hover and click animations"""
         # Add click handlers to buttons
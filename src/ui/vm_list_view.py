@@ -0,0 +1,317 @@
+"""
+Virtualized VM list for Multiverse
+Model/view grid that paints VM cards for visible rows only
+"""
+
+from typing import Dict, List, Optional
+
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PyQt6.QtCore import (
+    Qt, QAbstractListModel, QModelIndex, QSize, QRect, QRectF, QEvent, pyqtSignal
+)
+from PyQt6.QtGui import QPainter, QColor, QPen, QFont, QLinearGradient
+
+from ui.neumorphic_style import NeumorphicStyle, SHADOW_MARGIN
+from ui.shadows import draw_neumorphic_shadows
+
+# Item data roles
+VM_ROLE = Qt.ItemDataRole.UserRole + 1
+METRICS_ROLE = Qt.ItemDataRole.UserRole + 2
+
+# Card geometry, matching VMCard (the margin holds the card's shadows)
+CARD_MARGIN = SHADOW_MARGIN
+CARD_SIZE = QSize(304 + 2 * CARD_MARGIN, 194 + 2 * CARD_MARGIN)
+CARD_PADDING = 20
+
+# Status label colors (keys of NeumorphicStyle.colors)
+STATUS_COLORS = {
+    "running": "success",
+    "stopped": "error",
+    "paused": "warning",
+    "suspended": "warning",
+    "queued": "accent"
+}
+
+
+class VMListModel(QAbstractListModel):
+    """List model of VM display data, keyed by VM name"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._vms = []
+        self._rows = {}
+        self._metrics = {}
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._vms)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        vm = self._vms[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return vm["name"]
+        if role == VM_ROLE:
+            return vm
+        if role == METRICS_ROLE:
+            return self._metrics.get(vm["name"])
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{vm['name']} ({vm['status']})"
+        return None
+
+    def names(self) -> List[str]:
+        """Get the VM names shown, in row order"""
+        return [vm["name"] for vm in self._vms]
+
+    def row_of(self, vm_name: str) -> Optional[int]:
+        """Get the row showing a VM"""
+        return self._rows.get(vm_name)
+
+    def set_vms(self, vms: List[dict]):
+        """Replace every row"""
+        self.beginResetModel()
+        self._vms = list(vms)
+        self._rows = {vm["name"]: row for row, vm in enumerate(self._vms)}
+        self._metrics = {name: m for name, m in self._metrics.items() if name in self._rows}
+        self.endResetModel()
+
+    def upsert_vm(self, vm: dict):
+        """Add a VM's row, or update it in place if it is already shown"""
+        row = self._rows.get(vm["name"])
+        if row is None:
+            row = len(self._vms)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._vms.append(vm)
+            self._rows[vm["name"]] = row
+            self.endInsertRows()
+        else:
+            self._vms[row] = vm
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def remove_vm(self, vm_name: str):
+        """Remove a VM's row"""
+        row = self._rows.get(vm_name)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._vms[row]
+        self._metrics.pop(vm_name, None)
+        self._rows = {vm["name"]: i for i, vm in enumerate(self._vms)}
+        self.endRemoveRows()
+
+    def set_metrics(self, latest: Dict[str, dict]):
+        """Show the newest metrics, repainting only rows whose numbers changed"""
+        for vm_name in set(self._metrics) | set(latest):
+            if vm_name not in self._rows:
+                continue
+            before = self._metrics.get(vm_name)
+            after = latest.get(vm_name)
+            if _cpu_text(before) == _cpu_text(after):
+                continue
+            if after is None:
+                del self._metrics[vm_name]
+            else:
+                self._metrics[vm_name] = after
+            index = self.index(self._rows[vm_name])
+            self.dataChanged.emit(index, index, [METRICS_ROLE])
+
+
+def _cpu_text(metrics: Optional[dict]) -> str:
+    """Get the CPU bar label for a metrics sample, as shown on VMCard"""
+    if metrics is None:
+        return "CPU: --"
+    return f"CPU: {round(metrics['cpu'])}%  ·  RAM: {metrics['memory'] / 1024:.1f}GB"
+
+
+class VMCardDelegate(QStyledItemDelegate):
+    """Paints a VM card per row and turns clicks on its buttons into signals"""
+
+    start_clicked = pyqtSignal(str)  # VM name
+    stop_clicked = pyqtSignal(str)
+    settings_clicked = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.colors = NeumorphicStyle().colors
+        self._hovered = None  # (row, action) under the mouse
+
+        self.name_font = QFont()
+        self.name_font.setPixelSize(18)
+        self.name_font.setBold(True)
+        self.status_font = QFont()
+        self.status_font.setPixelSize(12)
+        self.status_font.setBold(True)
+        self.os_font = QFont()
+        self.os_font.setPixelSize(14)
+        self.small_font = QFont()
+        self.small_font.setPixelSize(12)
+
+    def sizeHint(self, option, index) -> QSize:
+        return CARD_SIZE
+
+    def _card_rect(self, rect: QRect) -> QRect:
+        """Get the card's area within its item rect"""
+        return rect.adjusted(CARD_MARGIN, CARD_MARGIN, -CARD_MARGIN, -CARD_MARGIN)
+
+    def _buttons(self, rect: QRect, vm: dict) -> List[tuple]:
+        """Get the card's buttons as (action, label, rect)"""
+        card = self._card_rect(rect)
+        width = (card.width() - 2 * CARD_PADDING - 10) // 2
+        top = card.bottom() - CARD_PADDING - 32
+        left = card.left() + CARD_PADDING
+        if vm["status"] == "running":
+            first = ("stop", "⏹️ Stop")
+        else:
+            first = ("start", "▶️ Start")
+        return [
+            (first[0], first[1], QRect(left, top, width, 32)),
+            ("settings", "⚙️ Settings", QRect(left + width + 10, top, width, 32))
+        ]
+
+    def paint(self, painter: QPainter, option, index: QModelIndex):
+        vm = index.data(VM_ROLE)
+        metrics = index.data(METRICS_ROLE)
+        colors = self.colors
+        card = self._card_rect(option.rect)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Card shadows and background
+        draw_neumorphic_shadows(painter, QRectF(card), 15, hovered, colors)
+        gradient = QLinearGradient(card.topLeft().toPointF(), card.bottomRight().toPointF())
+        gradient.setColorAt(0, QColor(colors['bg_secondary']))
+        gradient.setColorAt(1, QColor(colors['bg_tertiary']))
+        painter.setBrush(gradient)
+        painter.setPen(QPen(QColor(colors['accent'] if hovered else colors['border']), 1))
+        painter.drawRoundedRect(QRectF(card), 15, 15)
+
+        content = card.adjusted(CARD_PADDING, CARD_PADDING, -CARD_PADDING, -CARD_PADDING)
+
+        # Header with name and status
+        painter.setFont(self.status_font)
+        status_color = colors[STATUS_COLORS.get(vm["status"], 'text_secondary')]
+        painter.setPen(QColor(status_color))
+        status_text = vm["status"].title()
+        status_width = painter.fontMetrics().horizontalAdvance(status_text)
+        header = QRect(content.left(), content.top(), content.width(), 24)
+        painter.drawText(header, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, status_text)
+
+        painter.setFont(self.name_font)
+        painter.setPen(QColor(colors['text_primary']))
+        name_rect = header.adjusted(0, 0, -(status_width + 10), 0)
+        name = painter.fontMetrics().elidedText(vm["name"], Qt.TextElideMode.ElideRight, name_rect.width())
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, name)
+
+        # OS and resources
+        painter.setFont(self.os_font)
+        painter.setPen(QColor(colors['text_secondary']))
+        painter.drawText(QRect(content.left(), header.bottom() + 8, content.width(), 20),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, f"OS: {vm['os']}")
+
+        painter.setFont(self.small_font)
+        painter.setPen(QColor(colors['text_muted']))
+        resources = QRect(content.left(), header.bottom() + 34, content.width() // 2, 18)
+        painter.drawText(resources, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         f"Memory: {vm['memory']}")
+        painter.drawText(resources.translated(content.width() // 2, 0),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         f"Storage: {vm['storage']}")
+
+        # CPU bar
+        bar = QRectF(content.left(), resources.bottom() + 10, content.width(), 18)
+        painter.setBrush(QColor(colors['bg_primary']))
+        painter.setPen(QPen(QColor(colors['border']), 1))
+        painter.drawRoundedRect(bar, 8, 8)
+        if metrics is not None and metrics["cpu"] > 0:
+            chunk = bar.adjusted(1, 1, -1, -1)
+            chunk.setWidth(chunk.width() * min(100.0, metrics["cpu"]) / 100)
+            painter.setBrush(QColor(colors['accent']))
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.drawRoundedRect(chunk, 7, 7)
+        painter.setPen(QColor(colors['text_primary']))
+        painter.drawText(bar, Qt.AlignmentFlag.AlignCenter, _cpu_text(metrics))
+
+        # Buttons
+        hover_colors = {"start": 'success', "stop": 'error', "settings": 'accent'}
+        for action, label, rect in self._buttons(option.rect, vm):
+            active = self._hovered == (index.row(), action)
+            painter.setBrush(QColor(colors[hover_colors[action]] if active else colors['bg_tertiary']))
+            painter.setPen(QPen(QColor(colors[hover_colors[action]] if active else colors['border']), 1))
+            painter.drawRoundedRect(QRectF(rect), 8, 8)
+            painter.setPen(QColor(colors['text_primary']))
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, label)
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index: QModelIndex) -> bool:
+        """Track button hover and emit a signal when a button is clicked"""
+        if event.type() not in (QEvent.Type.MouseMove, QEvent.Type.MouseButtonRelease):
+            return False
+        vm = index.data(VM_ROLE)
+        position = event.position().toPoint()
+        action = next((action for action, _, rect in self._buttons(option.rect, vm)
+                       if rect.contains(position)), None)
+
+        hovered = (index.row(), action) if action else None
+        if hovered != self._hovered:
+            self._hovered = hovered
+            view = self.parent()
+            if view is not None:
+                view.viewport().update()
+
+        if event.type() == QEvent.Type.MouseButtonRelease and action is not None \
+                and event.button() == Qt.MouseButton.LeftButton:
+            getattr(self, f"{action}_clicked").emit(vm["name"])
+            return True
+        return False
+
+    def clear_hover(self):
+        """Forget the hovered button once the mouse leaves the view"""
+        self._hovered = None
+
+
+class VMListView(QListView):
+    """Wrapping grid of VM cards that only paints the rows on screen
+
+    Every card has the same size, so the view lays out thousands of VMs
+    without measuring them and scrolling or resizing costs a repaint of
+    the visible cards only - no widgets are created per VM.
+    """
+
+    start_clicked = pyqtSignal(str)  # VM name
+    stop_clicked = pyqtSignal(str)
+    settings_clicked = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("vm-list")
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMovement(QListView.Movement.Static)
+        self.setUniformItemSizes(True)
+        self.setGridSize(CARD_SIZE)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(24)
+        self.setMouseTracking(True)
+        self.setFrameShape(QListView.Shape.NoFrame)
+
+        self.vm_model = VMListModel(self)
+        self.setModel(self.vm_model)
+
+        delegate = VMCardDelegate(self)
+        delegate.start_clicked.connect(self.start_clicked)
+        delegate.stop_clicked.connect(self.stop_clicked)
+        delegate.settings_clicked.connect(self.settings_clicked)
+        self.setItemDelegate(delegate)
+
+    def leaveEvent(self, event):
+        """Drop button hover highlights when the mouse leaves"""
+        self.itemDelegate().clear_hover()
+        self.viewport().update()
+        super().leaveEvent(event)
@@ -3,230 +3,584 @@ Animation Manager for Multiverse
 Provides smooth, springy animations for UI components
 """
 
-from PyQt6.QtCore import QPropertyAnimation, QEasingCurve, QTimer, QParallelAnimationGroup, QSequentialAnimationGroup
-from PyQt6.QtWidgets import QWidget
-from PyQt6.QtGui import QPainter, QColor, QPen
-import math
+from PyQt6.QtCore import QObject, QEasingCurve, QTimer, QRectF, QPointF, Qt
+from PyQt6.QtWidgets import QWidget, QGraphicsEffect
+from PyQt6.QtGui import QPainter, QColor, QPen, QGuiApplication
+import itertools
+import time
+
+from utils.ring_buffer import RingBuffer
+from utils.theme_manager import ThemeManager
+
+# Frame rate used when the display doesn't report one
+DEFAULT_REFRESH_RATE = 60.0
+
+# Idle tweens kept for reuse
+TWEEN_POOL_SIZE = 256
+
+# Values at which an AnimationEffect channel paints the widget unchanged
+IDENTITY = {"scale": 1.0, "opacity": 1.0, "dx": 0.0, "dy": 0.0}
+
+# Motion levels, from full animation to none
+MOTION_FULL, MOTION_FEWER_FRAMES, MOTION_SHORT, MOTION_OFF = range(4)
+MOTION_LEVELS = ("full", "fewer frames", "short", "off")
+
+# Frames measured before the motion level is reconsidered
+FRAME_SAMPLES = 30
+
+# A frame is late when it takes this many timer intervals
+LATE_FRAME_FACTOR = 1.5
+
+# Share of late frames that lowers the motion level, and the share it takes to raise it again
+DEGRADE_LATE_SHARE = 0.25
+RECOVER_LATE_SHARE = 0.05
+
+# Duration factor from MOTION_SHORT on, and how long MOTION_OFF lasts before animating again (ms)
+SHORT_DURATION_FACTOR = 0.5
+OFF_COOLDOWN = 5000
+
+
+class AnimationEffect(QGraphicsEffect):
+    """Paints a widget scaled, shifted and faded without touching its geometry
+    
+    Changing these never resizes or moves the widget, so animating them
+    costs a repaint of the widget's area but no relayout of it, its
+    children or its siblings.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.scale = 1.0
+        self.opacity = 1.0
+        self.dx = 0.0
+        self.dy = 0.0
+    
+    def is_identity(self) -> bool:
+        """Check whether the widget paints exactly as it would without the effect"""
+        return self.scale == 1.0 and self.opacity == 1.0 and self.dx == 0.0 and self.dy == 0.0
+    
+    def boundingRectFor(self, rect: QRectF) -> QRectF:
+        center = rect.center()
+        width = rect.width() * max(1.0, self.scale)
+        height = rect.height() * max(1.0, self.scale)
+        bounds = QRectF(0, 0, width, height)
+        bounds.moveCenter(center + QPointF(self.dx, self.dy))
+        return bounds.united(rect)
+    
+    def draw(self, painter: QPainter):
+        if self.is_identity():
+            self.drawSource(painter)
+            return
+        
+        # Draw straight through the transformed painter - no offscreen copy
+        center = self.sourceBoundingRect(Qt.CoordinateSystem.LogicalCoordinates).center()
+        painter.save()
+        painter.setOpacity(painter.opacity() * self.opacity)
+        painter.translate(center + QPointF(self.dx, self.dy))
+        painter.scale(self.scale, self.scale)
+        painter.translate(-center)
+        self.drawSource(painter)
+        painter.restore()
+
+
+class Tween:
+    """One value animated over time (pooled and reused by the clock)"""
+    
+    __slots__ = ("animation_id", "owner", "widget", "setter", "effect", "start_value",
+                 "end_value", "begin", "duration", "easing", "on_finished")
+    
+    def reset(self):
+        """Drop references so a pooled tween keeps nothing alive"""
+        self.owner = self.widget = self.setter = self.effect = None
+        self.easing = self.on_finished = None
+
+
+class AnimationClock(QObject):
+    """The single timer that drives every animation in the application
+    
+    The timer ticks once per display frame, and only while something is
+    animating. Each tick advances every tween and applies the new values,
+    then asks each affected widget for one repaint, so dozens of cards
+    animating at once cost one timer and one repaint per card per frame.
+    
+    The clock also times its frames. When too many arrive late - a busy
+    UI thread or a slow remote display - it steps down through fewer
+    frames, shorter durations and finally no animation at all, and
+    steps back up once frames are on time again. Reduced motion (a
+    ThemeManager setting) turns animation off entirely.
+    """
+    
+    _instance = None
+    
+    @classmethod
+    def instance(cls) -> "AnimationClock":
+        """Get the shared clock"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+    
+    def __init__(self):
+        super().__init__()
+        screen = QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0
+        self.refresh_rate = refresh_rate if refresh_rate > 0 else DEFAULT_REFRESH_RATE
+        
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(max(1, round(1000 / self.refresh_rate)))
+        self.timer.timeout.connect(self.tick)
+        
+        # Frame instrumentation: time between ticks and time spent in each tick (ms)
+        self.frame_budget = 1000 / self.refresh_rate
+        self.frame_times = RingBuffer(FRAME_SAMPLES)
+        self.tick_costs = RingBuffer(FRAME_SAMPLES)
+        self.level = MOTION_FULL
+        self.reduced_motion = ThemeManager().is_reduced_motion()
+        self._last_tick = None
+        self._late_frames = 0
+        self._frames = 0
+        self._off_since = 0.0
+        
+        self._active = []
+        self._pool = []
+        self._ids = itertools.count(1)
+        self._curves = {}
+    
+    def curve(self, curve_type: QEasingCurve.Type, overshoot: float = None, period: float = None) -> QEasingCurve:
+        """Get a shared easing curve"""
+        key = (curve_type, overshoot, period)
+        curve = self._curves.get(key)
+        if curve is None:
+            curve = QEasingCurve(curve_type)
+            if overshoot is not None:
+                curve.setOvershoot(overshoot)
+            if period is not None:
+                curve.setPeriod(period)
+            self._curves[key] = curve
+        return curve
+    
+    def effect_for(self, widget: QWidget):
+        """Get the widget's animation effect, installing one if needed
+        
+        Qt can't paint a widget effect inside another, so a widget within
+        (or containing) one that is animating gets None and stays still.
+        """
+        effect = widget.graphicsEffect()
+        if isinstance(effect, AnimationEffect):
+            return effect
+        if effect is not None:
+            return None
+        parent = widget.parentWidget()
+        while parent is not None:
+            if parent.graphicsEffect() is not None:
+                return None
+            parent = parent.parentWidget()
+        for child in widget.findChildren(QWidget):
+            if child.graphicsEffect() is not None:
+                return None
+            
+        effect = AnimationEffect(widget)
+        widget.setGraphicsEffect(effect)
+        return effect
+    
+    def sequence(self, widget: QWidget, channel: str, steps, delay: int = 0, owner=None,
+                 on_finished=None) -> int:
+        """Animate one channel of a widget through steps played back to back
+        
+        channel is an AnimationEffect attribute ("scale", "opacity", "dx",
+        "dy") or "window_opacity" for top-level windows; each step is
+        (start, end, duration in ms, easing curve). Animations already
+        running on the same channel stop first. Returns an animation id.
+        """
+        # Nothing to play: just report the sequence done
+        if not steps:
+            if on_finished is not None:
+                QTimer.singleShot(0, on_finished)
+            return next(self._ids)
+            
+        if not self.motion_enabled():
+            self._stop_where(lambda running, tween: tween.widget is widget and running == channel)
+            return self._jump(widget, channel, steps[-1][1], on_finished)
+        
+        if channel == "window_opacity":
+            effect, setter = None, widget.setWindowOpacity
+        else:
+            effect = self.effect_for(widget)
+            if effect is None:
+                if on_finished is not None:
+                    QTimer.singleShot(0, on_finished)
+                return next(self._ids)
+            setter = lambda value, e=effect, name=channel: setattr(e, name, value)
+        self._stop_where(lambda running, tween: tween.widget is widget and running == channel)
+        
+        # Delayed animations hold their first value until they begin
+        setter(steps[0][0])
+            
+        animation_id = next(self._ids)
+        factor = self.duration_factor()
+        begin = time.monotonic() * 1000 + delay * factor
+        for i, (start, end, duration, easing) in enumerate(steps):
+            duration = max(1, round(duration * factor))
+            tween = self._pool.pop() if self._pool else Tween()
+            tween.animation_id = animation_id
+            tween.owner = owner
+            tween.widget = widget
+            tween.setter = setter
+            tween.effect = effect
+            tween.start_value = start
+            tween.end_value = end
+            tween.begin = begin
+            tween.duration = duration
+            tween.easing = easing
+            tween.on_finished = on_finished if i == len(steps) - 1 else None
+            self._active.append((channel, tween))
+            begin += duration
+        
+        self._start_timer()
+        return animation_id
+    
+    def _jump(self, widget: QWidget, channel: str, value, on_finished=None) -> int:
+        """Set a channel straight to its final value instead of animating it"""
+        if channel == "window_opacity":
+            widget.setWindowOpacity(value)
+        else:
+            effect = widget.graphicsEffect()
+            if not isinstance(effect, AnimationEffect):
+                effect = self.effect_for(widget) if value != IDENTITY[channel] else None
+            if effect is not None:
+                setattr(effect, channel, value)
+                if effect.is_identity() and not any(tween.widget is widget for _, tween in self._active):
+                    widget.setGraphicsEffect(None)
+                else:
+                    effect.update()
+        if on_finished is not None:
+            QTimer.singleShot(0, on_finished)
+        return next(self._ids)
+    
+    def animate(self, widget: QWidget, channel: str, start: float, end: float, duration: int,
+                easing: QEasingCurve = None, delay: int = 0, owner=None, on_finished=None) -> int:
+        """Animate one channel of a widget from start to end"""
+        easing = easing or self.curve(QEasingCurve.Type.Linear)
+        return self.sequence(widget, channel, [(start, end, duration, easing)], delay, owner, on_finished)
+    
+    def animate_value(self, setter, start: float, end: float, duration: int, easing: QEasingCurve = None,
+                      widget: QWidget = None, owner=None, on_finished=None) -> int:
+        """Animate a value passed to a callback each frame (for custom painted animations)"""
+        if not self.motion_enabled():
+            setter(end)
+            if on_finished is not None:
+                QTimer.singleShot(0, on_finished)
+            return next(self._ids)
+        
+        animation_id = next(self._ids)
+        tween = self._pool.pop() if self._pool else Tween()
+        tween.animation_id = animation_id
+        tween.owner = owner
+        tween.widget = widget
+        tween.setter = setter
+        tween.effect = None
+        tween.start_value = start
+        tween.end_value = end
+        tween.begin = time.monotonic() * 1000
+        tween.duration = max(1, round(duration * self.duration_factor()))
+        tween.easing = easing or self.curve(QEasingCurve.Type.Linear)
+        tween.on_finished = on_finished
+        self._active.append((None, tween))
+        self._start_timer()
+        return animation_id
+    
+    def is_running(self, animation_id: int) -> bool:
+        """Check whether an animation still has frames to play"""
+        return any(tween.animation_id == animation_id for _, tween in self._active)
+    
+    def stop(self, animation_id: int):
+        """Stop an animation where it is"""
+        self._stop_where(lambda channel, tween: tween.animation_id == animation_id)
+    
+    def stop_owner(self, owner):
+        """Stop every animation started by an owner"""
+        self._stop_where(lambda channel, tween: tween.owner is owner)
+    
+    def owned_by(self, owner) -> list:
+        """Get the ids of an owner's running animations"""
+        return sorted({tween.animation_id for _, tween in self._active if tween.owner is owner})
+    
+    def _stop_where(self, predicate):
+        """Stop the tweens matching predicate(channel, tween)"""
+        remaining = []
+        for channel, tween in self._active:
+            if predicate(channel, tween):
+                self._release(tween)
+            else:
+                remaining.append((channel, tween))
+        self._active = remaining
+    
+    def finish_all(self):
+        """Jump every running animation to its final value"""
+        for _, tween in self._active:
+            tween.begin = float("-inf")
+        self._advance(time.monotonic() * 1000)
+        if not self._active:
+            self.timer.stop()
+    
+    def _release(self, tween: Tween):
+        """Return a tween to the pool"""
+        tween.reset()
+        if len(self._pool) < TWEEN_POOL_SIZE:
+            self._pool.append(tween)
+    
+    def motion_enabled(self) -> bool:
+        """Check whether animations should play rather than jump to their end"""
+        if self.reduced_motion:
+            return False
+        if self.level == MOTION_OFF and time.monotonic() * 1000 - self._off_since >= OFF_COOLDOWN:
+            # Try animating again, from the cheapest level that still moves
+            self.set_level(MOTION_SHORT)
+        return self.level < MOTION_OFF
+    
+    def duration_factor(self) -> float:
+        """Get the factor applied to new animations' durations and delays"""
+        return SHORT_DURATION_FACTOR if self.level >= MOTION_SHORT else 1.0
+    
+    def set_level(self, level: int):
+        """Switch to a motion level"""
+        level = max(MOTION_FULL, min(MOTION_OFF, level))
+        if level == self.level:
+            return
+        print(f"🎞️ Animation level: {MOTION_LEVELS[self.level]} → {MOTION_LEVELS[level]}")
+        self.level = level
+        self._frames = self._late_frames = 0
+        # Fewer frames: tick every other display frame
+        frames_per_tick = 2 if level >= MOTION_FEWER_FRAMES else 1
+        self.timer.setInterval(max(1, round(self.frame_budget * frames_per_tick)))
+        if level == MOTION_OFF:
+            self._off_since = time.monotonic() * 1000
+            self.finish_all()
+    
+    def set_reduced_motion(self, enabled: bool):
+        """Turn every animation off (or back on), finishing running ones now"""
+        self.reduced_motion = bool(enabled)
+        if self.reduced_motion:
+            self.finish_all()
+    
+    def frame_stats(self) -> dict:
+        """Get recent frame timing (ms) and the motion level it led to"""
+        frame_times = self.frame_times.values()
+        tick_costs = self.tick_costs.values()
+        return {
+            "level": MOTION_LEVELS[self.level],
+            "reduced_motion": self.reduced_motion,
+            "budget": self.frame_budget,
+            "frame_time": sum(frame_times) / len(frame_times) if frame_times else 0.0,
+            "worst_frame_time": max(frame_times, default=0.0),
+            "tick_cost": sum(tick_costs) / len(tick_costs) if tick_costs else 0.0
+        }
+    
+    def _start_timer(self):
+        """Start ticking if the clock is idle"""
+        if not self.timer.isActive():
+            # Time spent idle isn't a late frame
+            self._last_tick = None
+            self.timer.start()
+    
+    def _measure(self, now: float, cost: float):
+        """Record a frame and adapt the motion level to how late frames are"""
+        self.tick_costs.append(cost)
+        if self._last_tick is not None:
+            frame_time = now - self._last_tick
+            self.frame_times.append(frame_time)
+            self._frames += 1
+            if frame_time > LATE_FRAME_FACTOR * self.timer.interval() or cost > self.frame_budget:
+                self._late_frames += 1
+        self._last_tick = now
+        
+        if self._frames < FRAME_SAMPLES:
+            return
+        late_share = self._late_frames / self._frames
+        self._frames = self._late_frames = 0
+        if late_share > DEGRADE_LATE_SHARE:
+            self.set_level(self.level + 1)
+        elif late_share < RECOVER_LATE_SHARE and self.level > MOTION_FULL:
+            self.set_level(self.level - 1)
+    
+    def tick(self):
+        """Advance every running tween by one frame, timing it"""
+        now = time.monotonic() * 1000
+        self._advance(now)
+        self._measure(now, time.monotonic() * 1000 - now)
+        if not self._active:
+            self.timer.stop()
+    
+    def _advance(self, now: float):
+        """Apply every tween's value at time now"""
+        dirty = set()
+        finished = []
+        remaining = []
+        
+        for channel, tween in self._active:
+            if now < tween.begin:
+                remaining.append((channel, tween))
+                continue
+            progress = min(1.0, (now - tween.begin) / tween.duration)
+            value = tween.start_value + (tween.end_value - tween.start_value) * tween.easing.valueForProgress(progress)
+            try:
+                tween.setter(value)
+            except RuntimeError:
+                # The widget was deleted mid-animation
+                self._release(tween)
+                continue
+            if tween.effect is not None:
+                dirty.add(tween.effect)
+            if progress >= 1.0:
+                finished.append(tween)
+            else:
+                remaining.append((channel, tween))
+        self._active = remaining
+        
+        # One repaint per affected widget, however many of its values moved
+        for effect in dirty:
+            try:
+                effect.update()
+            except RuntimeError:
+                pass
+        
+        animating = {tween.widget for _, tween in remaining}
+        for tween in finished:
+            callback, widget, effect = tween.on_finished, tween.widget, tween.effect
+            self._release(tween)
+            # A settled widget paints directly again
+            if effect is not None and widget not in animating:
+                try:
+                    if effect.is_identity() and widget.graphicsEffect() is effect:
+                        widget.setGraphicsEffect(None)
+                except RuntimeError:
+                    pass
+            if callback is not None:
+                callback()
 
 
 class AnimationManager:
-    """Manages smooth animations for UI components"""
+    """Manages smooth animations for UI components
+    
+    Every manager shares one AnimationClock, so creating one per widget
+    costs nothing until it animates. Animations change a widget's painted
+    scale, offset and opacity rather than its geometry, so they never
+    fight the layout or trigger relayouts.
+    """
     
     def __init__(self):
-        self.active_animations = []
-        
+        self.clock = AnimationClock.instance()
+    
+    @property
+    def active_animations(self) -> list:
+        """Ids of this manager's running animations"""
+        return self.clock.owned_by(self)
+    
+    def _current(self, widget: QWidget, channel: str, default: float) -> float:
+        """Get a widget's current animated value"""
+        effect = widget.graphicsEffect()
+        if isinstance(effect, AnimationEffect):
+            return getattr(effect, channel)
+        return default
+    
     def spring_scale(self, widget: QWidget, scale_factor: float = 1.05, duration: int = 300):
         """Apply springy scale animation to widget"""
-        animation = QPropertyAnimation(widget, b"geometry")
-        animation.setDuration(duration)
-        
         # Spring easing curve
-        curve = QEasingCurve(QEasingCurve.Type.OutBack)
-        curve.setOvershoot(0.7)  # Spring overshoot
-        animation.setEasingCurve(curve)
-        
-        # Calculate new geometry with scale
-        current_rect = widget.geometry()
-        center_x = current_rect.center().x()
-        center_y = current_rect.center().y()
-        
-        new_width = int(current_rect.width() * scale_factor)
-        new_height = int(current_rect.height() * scale_factor)
-        new_x = center_x - new_width // 2
-        new_y = center_y - new_height // 2
-        
-        animation.setStartValue(current_rect)
-        animation.setEndValue(widget.geometry().adjusted(
-            new_x - current_rect.x(),
-            new_y - current_rect.y(),
-            new_width - current_rect.width(),
-            new_height - current_rect.height()
-        ))
-        
-        animation.start()
-        self.active_animations.append(animation)
-        return animation
-        
-    def fade_in(self, widget: QWidget, duration: int = 400):
+        curve = self.clock.curve(QEasingCurve.Type.OutBack, overshoot=0.7)
+        return self.clock.animate(widget, "scale", self._current(widget, "scale", 1.0),
+                                  scale_factor, duration, curve, owner=self)
+    
+    def fade_in(self, widget: QWidget, duration: int = 400, delay: int = 0):
         """Fade in animation"""
-        animation = QPropertyAnimation(widget, b"windowOpacity")
-        animation.setDuration(duration)
-        animation.setStartValue(0.0)
-        animation.setEndValue(1.0)
-        
-        curve = QEasingCurve(QEasingCurve.Type.OutCubic)
-        animation.setEasingCurve(curve)
-        
-        animation.start()
-        self.active_animations.append(animation)
-        return animation
-        
-    def slide_in(self, widget: QWidget, direction: str = "left", duration: int = 500):
+        curve = self.clock.curve(QEasingCurve.Type.OutCubic)
+        channel = "window_opacity" if widget.isWindow() else "opacity"
+        return self.clock.animate(widget, channel, 0.0, 1.0, duration, curve, delay, owner=self)
+    
+    def slide_in(self, widget: QWidget, direction: str = "left", duration: int = 500, delay: int = 0):
         """Slide in animation from specified direction"""
-        animation = QPropertyAnimation(widget, b"geometry")
-        animation.setDuration(duration)
-        
-        current_rect = widget.geometry()
-        start_rect = current_rect
-        
-        if direction == "left":
-            start_rect.moveLeft(current_rect.x() - current_rect.width())
-        elif direction == "right":
-            start_rect.moveLeft(current_rect.x() + current_rect.width())
-        elif direction == "up":
-            start_rect.moveTop(current_rect.y() - current_rect.height())
-        elif direction == "down":
-            start_rect.moveTop(current_rect.y() + current_rect.height())
-            
-        animation.setStartValue(start_rect)
-        animation.setEndValue(current_rect)
-        
-        curve = QEasingCurve(QEasingCurve.Type.OutBack)
-        curve.setOvershoot(0.3)
-        animation.setEasingCurve(curve)
-        
-        animation.start()
-        self.active_animations.append(animation)
-        return animation
-        
-    def bounce(self, widget: QWidget, intensity: float = 0.1, duration: int = 600):
+        width = widget.width()
+        height = widget.height()
+        channel, start = {
+            "left": ("dx", -width),
+            "right": ("dx", width),
+            "up": ("dy", -height),
+            "down": ("dy", height)
+        }.get(direction, ("dx", -width))
+        
+        curve = self.clock.curve(QEasingCurve.Type.OutBack, overshoot=0.3)
+        return self.clock.animate(widget, channel, start, 0.0, duration, curve, delay, owner=self)
+    
+    def bounce(self, widget: QWidget, intensity: float = 0.1, duration: int = 600, delay: int = 0):
         """Bounce animation"""
-        group = QSequentialAnimationGroup()
-        
-        # Scale up
-        scale_up = QPropertyAnimation(widget, b"geometry")
-        scale_up.setDuration(duration // 3)
-        scale_up.setStartValue(widget.geometry())
-        
-        current_rect = widget.geometry()
-        center_x = current_rect.center().x()
-        center_y = current_rect.center().y()
-        
-        new_width = int(current_rect.width() * (1 + intensity))
-        new_height = int(current_rect.height() * (1 + intensity))
-        new_x = center_x - new_width // 2
-        new_y = center_y - new_height // 2
-        
-        scale_up.setEndValue(widget.geometry().adjusted(
-            new_x - current_rect.x(),
-            new_y - current_rect.y(),
-            new_width - current_rect.width(),
-            new_height - current_rect.height()
-        ))
-        
-        curve = QEasingCurve(QEasingCurve.Type.OutBack)
-        curve.setOvershoot(0.5)
-        scale_up.setEasingCurve(curve)
-        
-        # Scale down
-        scale_down = QPropertyAnimation(widget, b"geometry")
-        scale_down.setDuration(duration // 3)
-        scale_down.setStartValue(scale_up.endValue())
-        scale_down.setEndValue(widget.geometry())
-        
-        curve2 = QEasingCurve(QEasingCurve.Type.InOutQuad)
-        scale_down.setEasingCurve(curve2)
-        
-        # Final settle
-        settle = QPropertyAnimation(widget, b"geometry")
-        settle.setDuration(duration // 3)
-        settle.setStartValue(widget.geometry())
-        settle.setEndValue(widget.geometry())
-        
-        curve3 = QEasingCurve(QEasingCurve.Type.OutElastic)
-        curve3.setPeriod(0.3)
-        settle.setEasingCurve(curve3)
-        
-        group.addAnimation(scale_up)
-        group.addAnimation(scale_down)
-        group.addAnimation(settle)
-        
-        group.start()
-        self.active_animations.append(group)
-        return group
-        
+        step = duration // 3
+        scale = 1 + intensity
+        return self.clock.sequence(widget, "scale", [
+            # Scale up, back down, then settle
+            (1.0, scale, step, self.clock.curve(QEasingCurve.Type.OutBack, overshoot=0.5)),
+            (scale, 1.0, step, self.clock.curve(QEasingCurve.Type.InOutQuad)),
+            (1.0, 1.0, step, self.clock.curve(QEasingCurve.Type.OutElastic, period=0.3))
+        ], delay, owner=self)
+    
     def pulse(self, widget: QWidget, cycles: int = 3, duration: int = 1000):
         """Pulse animation with multiple cycles"""
-        group = QSequentialAnimationGroup()
-        
+        # Purely decorative: skipped without motion, a single beat when frames are late
+        if not self.clock.motion_enabled():
+            return None
+        if self.clock.level >= MOTION_SHORT:
+            duration = duration // cycles
+            cycles = 1
+        step = duration // (cycles * 2)
+        linear = self.clock.curve(QEasingCurve.Type.Linear)
+        steps = []
         for i in range(cycles):
-            # Scale up
-            scale_up = QPropertyAnimation(widget, b"geometry")
-            scale_up.setDuration(duration // (cycles * 2))
-            
-            current_rect = widget.geometry()
-            center_x = current_rect.center().x()
-            center_y = current_rect.center().y()
-            
             scale_factor = 1.0 + (0.05 * (1 - i / cycles))  # Decreasing intensity
-            new_width = int(current_rect.width() * scale_factor)
-            new_height = int(current_rect.height() * scale_factor)
-            new_x = center_x - new_width // 2
-            new_y = center_y - new_height // 2
-            
-            scale_up.setStartValue(current_rect)
-            scale_up.setEndValue(widget.geometry().adjusted(
-                new_x - current_rect.x(),
-                new_y - current_rect.y(),
-                new_width - current_rect.width(),
-                new_height - current_rect.height()
-            ))
-            
-            # Scale down
-            scale_down = QPropertyAnimation(widget, b"geometry")
-            scale_down.setDuration(duration // (cycles * 2))
-            scale_down.setStartValue(scale_up.endValue())
-            scale_down.setEndValue(current_rect)
-            
-            group.addAnimation(scale_up)
-            group.addAnimation(scale_down)
-            
-        group.start()
-        self.active_animations.append(group)
-        return group
-        
+            steps.append((1.0, scale_factor, step, linear))
+            steps.append((scale_factor, 1.0, step, linear))
+        return self.clock.sequence(widget, "scale", steps, owner=self)
+    
     def ripple_effect(self, widget: QWidget, center_point=None):
         """Create a ripple effect from a center point"""
+        if not self.clock.motion_enabled():
+            return
         if center_point is None:
             center_point = widget.rect().center()
-            
-        # Create a temporary overlay for the ripple
-        overlay = RippleOverlay(widget)
-        overlay.show_ripple(center_point)
-        
-        # Clean up after animation
-        QTimer.singleShot(1000, overlay.deleteLater)
         
+        # Create a temporary overlay for the ripple, removed when it finishes
+        overlay = RippleOverlay(widget)
+        overlay.show_ripple(center_point, self.clock, owner=self)
+    
     def stagger_children(self, parent_widget: QWidget, animation_type: str = "fade_in", delay: int = 100):
         """Animate child widgets with staggered timing"""
+        # Children are already in their final state; without motion there is nothing to stagger
+        if not self.clock.motion_enabled():
+            return []
         children = parent_widget.findChildren(QWidget)
         animations = []
         
+        # Delays run on the shared clock rather than a timer per child
         for i, child in enumerate(children):
             if child != parent_widget:
-                timer = QTimer()
-                timer.setSingleShot(True)
-                timer.timeout.connect(lambda c=child: self._animate_child(c, animation_type))
-                timer.start(i * delay)
-                animations.append(timer)
-                
-        return animations
+                animations.append(self._animate_child(child, animation_type, i * delay))
         
-    def _animate_child(self, child: QWidget, animation_type: str):
+        return animations
+    
+    def _animate_child(self, child: QWidget, animation_type: str, delay: int = 0):
         """Animate a single child widget"""
         if animation_type == "fade_in":
-            self.fade_in(child, 300)
+            return self.fade_in(child, 300, delay)
         elif animation_type == "slide_in":
-            self.slide_in(child, "up", 400)
+            return self.slide_in(child, "up", 400, delay)
         elif animation_type == "bounce":
-            self.bounce(child, 0.1, 500)
-            
+            return self.bounce(child, 0.1, 500, delay)
+    
+    def set_reduced_motion(self, enabled: bool):
+        """Turn animations off (or back on) for the whole application, remembering the choice"""
+        ThemeManager().set_reduced_motion(enabled)
+        self.clock.set_reduced_motion(enabled)
+    
     def cleanup(self):
         """Clean up all active animations"""
-        for animation in self.active_animations:
-            if animation.state() == QPropertyAnimation.State.Running:
-                animation.stop()
-        self.active_animations.clear()
+        self.clock.stop_owner(self)
 
 
 class RippleOverlay(QWidget):
@@ -234,30 +588,25 @@ class RippleOverlay(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setAttribute(QWidget.WidgetAttribute.WA_TransparentForMouseEvents)
-        self.setAttribute(QWidget.WidgetAttribute.WA_TranslucentBackground)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        if parent is not None:
+            self.resize(parent.size())
         self.ripple_center = None
-        self.ripple_radius = 0
-        self.ripple_alpha = 255
-        
-    def show_ripple(self, center_point):
+        self._ripple_radius = 0
+    
+    def show_ripple(self, center_point, clock: AnimationClock = None, owner=None):
         """Show ripple animation"""
         self.ripple_center = center_point
         self.ripple_radius = 0
-        self.ripple_alpha = 255
-        
-        # Animate ripple
-        self.ripple_animation = QPropertyAnimation(self, b"ripple_radius")
-        self.ripple_animation.setDuration(1000)
-        self.ripple_animation.setStartValue(0)
-        self.ripple_animation.setEndValue(100)
-        
-        curve = QEasingCurve(QEasingCurve.Type.OutCubic)
-        self.ripple_animation.setEasingCurve(curve)
-        
-        self.ripple_animation.valueChanged.connect(self.update)
-        self.ripple_animation.start()
+        self.show()
         
+        # Animate ripple on the shared clock
+        clock = clock or AnimationClock.instance()
+        curve = clock.curve(QEasingCurve.Type.OutCubic)
+        clock.animate_value(lambda value: setattr(self, "ripple_radius", value), 0, 100, 1000, curve,
+                            widget=self, owner=owner, on_finished=self.deleteLater)
+    
     def paintEvent(self, event):
         """Paint the ripple effect"""
         if self.ripple_center and self.ripple_radius > 0:
@@ -265,7 +614,7 @@ class RippleOverlay(QWidget):
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)
             
             # Calculate alpha based on radius
-            alpha = max(0, 255 - (self.ripple_radius * 2))
+            alpha = int(max(0, 255 - (self.ripple_radius * 2)))
             
             # Create ripple color
             ripple_color = QColor(74, 158, 255, alpha)  # Blue with transparency
@@ -273,13 +622,13 @@ class RippleOverlay(QWidget):
             # Draw ripple circle
             painter.setPen(QPen(ripple_color, 2))
             painter.setBrush(ripple_color)
-            painter.drawEllipse(self.ripple_center, self.ripple_radius, self.ripple_radius)
-            
+            painter.drawEllipse(QPointF(self.ripple_center), self.ripple_radius, self.ripple_radius)
+    
     @property
     def ripple_radius(self):
         return self._ripple_radius
-        
+    
     @ripple_radius.setter
     def ripple_radius(self, value):
         self._ripple_radius = value
-        self.update() 
\ No newline at end of file
+        self.update()
@@ -0,0 +1,128 @@
+"""
+Atomic file writes for Multiverse
+Crash-safe JSON persistence with checksums and a fallback generation
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+
+class CorruptFileError(ValueError):
+    """Raised when no intact generation of a file can be read"""
+
+
+def _checksum(data) -> str:
+    """Get the checksum of JSON data in its canonical form"""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def previous_generation(path: Path) -> Path:
+    """Get the path holding the last good generation of a file"""
+    path = Path(path)
+    return path.with_name(path.name + ".prev")
+
+
+def _fsync_dir(directory: Path):
+    """Flush a directory entry so renames inside it survive a crash"""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return  # Not supported on this platform (e.g. Windows)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _keep_previous(path: Path, suffix: str):
+    """Make the current file the previous generation without ever moving it away"""
+    link_path = path.with_name(f".{path.name}.prev-{suffix}")
+    try:
+        os.link(path, link_path)
+    except OSError:
+        # No hard links on this filesystem
+        shutil.copy2(path, link_path)
+    os.replace(link_path, previous_generation(path))
+    # rename() is a no-op when .prev already links the same file
+    try:
+        link_path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def atomic_write_json(path: Path, data, indent: int = 2, keep_previous: bool = True):
+    """Write JSON data so readers see either the old or the new file, never a torn one
+
+    The data is written to a temporary file with a checksum, fsynced and
+    renamed over the target, so the target always exists. The replaced
+    file is first linked as the previous generation for read_json to
+    fall back on.
+    """
+    path = Path(path)
+    # Unique per thread, so concurrent writers of one file never share a temp file
+    suffix = f"{os.getpid()}-{threading.get_ident()}"
+    tmp_path = path.with_name(f".{path.name}.tmp-{suffix}")
+    envelope = {"checksum": _checksum(data), "data": data}
+
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(envelope, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if keep_previous and path.exists():
+            _keep_previous(path, suffix)
+        os.replace(tmp_path, path)
+        _fsync_dir(path.parent)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _read_generation(path: Path):
+    """Read and verify a single generation of a file"""
+    with open(path, 'r') as f:
+        content = json.load(f)
+
+    # Files written before checksums were introduced are plain JSON
+    if not (isinstance(content, dict) and set(content) == {"checksum", "data"}):
+        return content
+
+    if _checksum(content["data"]) != content["checksum"]:
+        raise CorruptFileError(f"Checksum mismatch in {path}")
+    return content["data"]
+
+
+def read_json(path: Path, default=None):
+    """Read a file written by atomic_write_json, falling back to the previous generation
+
+    Returns default when neither generation exists and raises
+    CorruptFileError when no generation is intact.
+    """
+    path = Path(path)
+    found = False
+
+    for candidate in (path, previous_generation(path)):
+        if not candidate.exists():
+            continue
+        found = True
+        try:
+            data = _read_generation(candidate)
+        except (json.JSONDecodeError, UnicodeDecodeError, CorruptFileError) as e:
+            print(f"Warning: Ignoring damaged file {candidate}: {e}")
+            continue
+        if candidate != path:
+            print(f"♻️ Recovered {path.name} from previous generation")
+        return data
+
+    if found:
+        raise CorruptFileError(f"No intact generation of {path}")
+    return default
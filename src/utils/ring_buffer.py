@@ -0,0 +1,114 @@
+"""
+Ring Buffer
+Fixed-size numeric history backed by a flat array
+"""
+
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+# (samples averaged per point, points kept): 5 minutes, 1 hour and 1 day at 1 Hz
+DEFAULT_TIERS = ((1, 300), (10, 360), (60, 1440))
+
+
+class RingBuffer:
+    """Keeps the most recent `capacity` samples in a preallocated array
+
+    Appending never allocates, and each sample costs 8 bytes (4 with
+    typecode 'f'), so keeping minutes of history for hundreds of series
+    stays cheap.
+    """
+
+    def __init__(self, capacity: int, typecode: str = 'd'):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = array(typecode, [0.0]) * capacity
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float):
+        """Add a sample, overwriting the oldest one when full"""
+        end = (self._start + self._count) % self.capacity
+        self._data[end] = value
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def latest(self) -> Optional[float]:
+        """Get the most recent sample"""
+        if not self._count:
+            return None
+        return self._data[(self._start + self._count - 1) % self.capacity]
+
+    def values(self) -> List[float]:
+        """Get all samples, oldest first"""
+        end = self._start + self._count
+        if end <= self.capacity:
+            return self._data[self._start:end].tolist()
+        return (self._data[self._start:] + self._data[:end - self.capacity]).tolist()
+
+    def clear(self):
+        """Drop all samples"""
+        self._start = 0
+        self._count = 0
+
+
+class TieredHistory:
+    """Rolling history of one series at several resolutions
+
+    Every sample lands in the finest ring buffer; coarser tiers store the
+    mean of each run of `step` samples. Long time windows are therefore
+    read from a few hundred pre-averaged points instead of thousands of
+    raw ones, and memory stays fixed however long the series runs. Points
+    are single-precision floats, plenty for charting.
+    """
+
+    def __init__(self, tiers: Sequence[Tuple[int, int]] = DEFAULT_TIERS):
+        self.tiers = [(step, RingBuffer(capacity, 'f')) for step, capacity in tiers]
+        self._sums = array('d', bytes(8 * len(self.tiers)))
+        self._counts = [0] * len(self.tiers)
+
+    def __len__(self) -> int:
+        return len(self.tiers[0][1])
+
+    def append(self, value: float):
+        """Add a sample to every tier"""
+        for i, (step, buffer) in enumerate(self.tiers):
+            if step == 1:
+                buffer.append(value)
+                continue
+            self._sums[i] += value
+            self._counts[i] += 1
+            if self._counts[i] == step:
+                buffer.append(self._sums[i] / step)
+                self._sums[i] = 0.0
+                self._counts[i] = 0
+
+    def latest(self) -> Optional[float]:
+        """Get the most recent sample"""
+        return self.tiers[0][1].latest()
+
+    def window(self, span: int) -> Tuple[int, List[float]]:
+        """Get the last `span` samples from the finest tier that covers them
+
+        A tier that has not wrapped yet still holds the whole series, so it
+        covers any span. Returns the samples per point along with the
+        points, oldest first.
+        """
+        for step, buffer in self.tiers:
+            if step * buffer.capacity >= span or len(buffer) < buffer.capacity:
+                break
+        points = buffer.values()
+        wanted = -(-span // step)
+        return step, points[-wanted:] if wanted < len(points) else points
+
+    def clear(self):
+        """Drop all samples"""
+        for i, (step, buffer) in enumerate(self.tiers):
+            buffer.clear()
+            self._sums[i] = 0.0
+            self._counts[i] = 0
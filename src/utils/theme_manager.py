@@ -128,4 +128,12 @@ class ThemeManager:
         """Load the saved theme preference"""
         saved_theme = self.settings.value("theme", "dark_neumorphic")
         self.current_theme = saved_theme
-        return saved_theme 
\ No newline at end of file
+        return saved_theme 
+        
+    def is_reduced_motion(self) -> bool:
+        """Check whether the user asked for animations to be turned off"""
+        return self.settings.value("reduced_motion", False, type=bool)
+        
+    def set_reduced_motion(self, enabled: bool):
+        """Save the reduced motion preference"""
+        self.settings.setValue("reduced_motion", bool(enabled))
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""
+Artifact Store
+Content-addressed cache for template images with LRU eviction
+"""
+
+import errno
+import hashlib
+import os
+import stat
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from utils.atomic_file import atomic_write_json, read_json
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    """Hash a file's contents in chunks, skipping holes in sparse files
+
+    Each data extent is hashed together with its offset and length, and
+    the file size closes the stream, so two files only share a digest if
+    they hold the same bytes in the same places. Multi-GB sparse images
+    hash in the time it takes to read the data they actually contain.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        offset = 0
+        while offset < size:
+            if hasattr(os, "SEEK_DATA"):
+                try:
+                    start = os.lseek(f.fileno(), offset, os.SEEK_DATA)
+                    end = os.lseek(f.fileno(), start, os.SEEK_HOLE)
+                except OSError as e:
+                    if e.errno == errno.ENXIO:
+                        break  # only holes remain
+                    start, end = offset, size
+            else:
+                start, end = offset, size
+
+            f.seek(start)
+            digest.update(struct.pack("<QQ", start, end - start))
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+            offset = end
+
+        digest.update(struct.pack("<Q", size))
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """Content-addressed blob store under <data_dir>/blobs
+
+    Blobs live at blobs/sha256/<digest> and are read-only once stored.
+    The index (blobs/index.json) maps digests to their size, last use and
+    the VMs whose overlays read through to them, plus human-readable tags
+    (such as a template build) pointing at digests. When the store grows
+    past max_bytes, unreferenced blobs are evicted least recently used
+    first; referenced blobs are never evicted.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = None):
+        self.root = Path(root)
+        self.blobs_dir = self.root / "sha256"
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.root / "index.json"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        index = read_json(self.index_file, default={})
+        self.blobs = index.get("blobs", {})
+        self.tags = index.get("tags", {})
+
+    def _save_index(self):
+        """Persist the index atomically"""
+        atomic_write_json(self.index_file, {"blobs": self.blobs, "tags": self.tags})
+
+    def blob_path(self, digest: str) -> Path:
+        """Get where a blob is stored"""
+        return self.blobs_dir / digest
+
+    def put_file(self, path: Path, tag: str = None, owner: str = None) -> str:
+        """Move a finished file into the store, returning its digest
+
+        The file is hashed in place and then renamed into the store, so
+        even multi-GB images are never copied. A blob that is already
+        stored is kept and the new file is removed. Passing owner records
+        a reference before any eviction runs.
+        """
+        path = Path(path)
+        digest = file_digest(path)
+        target = self.blob_path(digest)
+
+        with self._lock:
+            if target.exists():
+                path.unlink()
+            else:
+                os.replace(path, target)
+                target.chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+            entry = self.blobs.setdefault(digest, {"refs": []})
+            entry["size"] = target.stat().st_blocks * 512
+            entry["last_used"] = time.time()
+            if tag is not None:
+                self.tags[tag] = digest
+            if owner is not None and owner not in entry["refs"]:
+                entry["refs"].append(owner)
+            self._evict()
+            self._save_index()
+        return digest
+
+    def resolve(self, tag: str) -> Optional[str]:
+        """Get the digest a tag points at, if its blob is still stored"""
+        digest = self.tags.get(tag)
+        if digest is None or not self.blob_path(digest).exists():
+            return None
+        return digest
+
+    def get(self, digest: str) -> Optional[Path]:
+        """Get a blob's path, marking it as recently used
+
+        The new access time is persisted with the next index write.
+        """
+        path = self.blob_path(digest)
+        if not path.exists():
+            return None
+        with self._lock:
+            if digest in self.blobs:
+                self.blobs[digest]["last_used"] = time.time()
+        return path
+
+    def verify(self, digest: str) -> bool:
+        """Check a blob's contents against its digest"""
+        path = self.blob_path(digest)
+        return path.exists() and file_digest(path) == digest
+
+    def add_ref(self, digest: str, owner: str) -> bool:
+        """Record that a VM's disk reads through to a blob
+
+        Returns False if the blob is not stored (for example because it
+        was evicted), in which case no reference is recorded.
+        """
+        with self._lock:
+            entry = self.blobs.get(digest)
+            if entry is None or not self.blob_path(digest).exists():
+                return False
+            entry["last_used"] = time.time()
+            if owner not in entry["refs"]:
+                entry["refs"].append(owner)
+            self._save_index()
+            return True
+
+    def release(self, owner: str):
+        """Drop every reference held by a VM and evict if over the size cap"""
+        with self._lock:
+            changed = False
+            for entry in self.blobs.values():
+                if owner in entry["refs"]:
+                    entry["refs"].remove(owner)
+                    changed = True
+            if changed:
+                self._evict()
+                self._save_index()
+
+    def rename_owner(self, old_owner: str, new_owner: str):
+        """Move a VM's references to its new name"""
+        with self._lock:
+            changed = False
+            for entry in self.blobs.values():
+                if old_owner in entry["refs"]:
+                    entry["refs"] = [new_owner if ref == old_owner else ref
+                                     for ref in entry["refs"]]
+                    changed = True
+            if changed:
+                self._save_index()
+
+    def total_size(self) -> int:
+        """Get the bytes used by all stored blobs"""
+        return sum(entry.get("size", 0) for entry in self.blobs.values())
+
+    def evict(self) -> int:
+        """Evict unreferenced blobs until under the size cap, returning bytes freed"""
+        with self._lock:
+            freed = self._evict()
+            if freed:
+                self._save_index()
+            return freed
+
+    def _evict(self) -> int:
+        """Evict least recently used unreferenced blobs (lock must be held)"""
+        if self.max_bytes is None:
+            return 0
+
+        total = self.total_size()
+        candidates = sorted(
+            (entry.get("last_used", 0), digest)
+            for digest, entry in self.blobs.items() if not entry["refs"]
+        )
+        freed = 0
+        for _, digest in candidates:
+            if total - freed <= self.max_bytes:
+                break
+            path = self.blob_path(digest)
+            if path.exists():
+                path.chmod(stat.S_IRUSR | stat.S_IWUSR)
+                path.unlink()
+            freed += self.blobs.pop(digest).get("size", 0)
+            self.tags = {tag: d for tag, d in self.tags.items() if d != digest}
+            print(f"🧹 Evicted cached image {digest[:12]}")
+        return freed
@@ -0,0 +1,132 @@
+"""
+Async Virtual Machine Manager
+Asyncio facade that keeps VMManager's blocking work off the event loop
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from vm.vm_manager import VMManager
+
+
+class AsyncVMManager:
+    """Awaitable VM lifecycle operations backed by a managed thread pool
+
+    Blocking VMManager calls run on a dedicated executor. A per-host
+    semaphore caps how many lifecycle operations run at once, and a per-VM
+    lock keeps two operations on the same VM from overlapping.
+
+    Cancelling an awaiting task (or hitting its timeout) releases the
+    caller right away. An operation that has not reached the executor yet
+    is dropped; one already running finishes in its worker thread and its
+    result is discarded.
+    """
+
+    def __init__(self, vm_manager: VMManager = None, max_workers: int = 8,
+                 max_concurrency: int = 4, **manager_kwargs):
+        # A manager created here is closed with this facade
+        self._owns_manager = vm_manager is None
+        self.manager = vm_manager if vm_manager is not None else VMManager(**manager_kwargs)
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="multiverse-vm")
+
+        # Created lazily so they bind to the loop that actually uses them
+        self._semaphore = None
+        self._vm_locks = {}
+        # Operations holding or waiting for each VM lock; a lock is dropped at zero
+        self._vm_lock_users = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the per-host concurrency limiter"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _get_vm_lock(self, vm_name: str) -> asyncio.Lock:
+        """Get the lock serializing operations on a single VM"""
+        lock = self._vm_locks.get(vm_name)
+        if lock is None:
+            lock = self._vm_locks[vm_name] = asyncio.Lock()
+        return lock
+
+    async def _offload(self, func, *args, timeout: float = None):
+        """Run a blocking call on the executor"""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, functools.partial(func, *args))
+        if timeout is None:
+            return await future
+        return await asyncio.wait_for(future, timeout)
+
+    async def _lifecycle(self, vm_name: str, func, *args, timeout: float = None):
+        """Run a lifecycle operation under the host and per-VM limits"""
+        lock = self._get_vm_lock(vm_name)
+        self._vm_lock_users[vm_name] = self._vm_lock_users.get(vm_name, 0) + 1
+        try:
+            async with lock:
+                async with self._get_semaphore():
+                    return await self._offload(func, *args, timeout=timeout)
+        finally:
+            self._vm_lock_users[vm_name] -= 1
+            if not self._vm_lock_users[vm_name]:
+                del self._vm_lock_users[vm_name]
+                self._vm_locks.pop(vm_name, None)
+
+    async def create_vm(self, vm_config: dict, timeout: float = None) -> bool:
+        """Create a new virtual machine"""
+        return await self._lifecycle(vm_config["name"], self.manager.create_vm,
+                                     vm_config, timeout=timeout)
+
+    async def start_vm(self, vm_name: str, timeout: float = None) -> bool:
+        """Start a virtual machine"""
+        return await self._lifecycle(vm_name, self.manager.start_vm, vm_name, timeout=timeout)
+
+    async def stop_vm(self, vm_name: str, timeout: float = None) -> bool:
+        """Stop a virtual machine"""
+        return await self._lifecycle(vm_name, self.manager.stop_vm, vm_name, timeout=timeout)
+
+    async def suspend_vm(self, vm_name: str, timeout: float = None) -> bool:
+        """Save a running VM's memory state so the next start resumes it"""
+        return await self._lifecycle(vm_name, self.manager.suspend_vm, vm_name, timeout=timeout)
+
+    async def delete_vm(self, vm_name: str, timeout: float = None) -> bool:
+        """Delete a virtual machine"""
+        return await self._lifecycle(vm_name, self.manager.delete_vm, vm_name, timeout=timeout)
+
+    async def start_many(self, vm_names: List[str]) -> Dict[str, bool]:
+        """Start several VMs concurrently, within the host concurrency limit"""
+        results = await asyncio.gather(*(self.start_vm(name) for name in vm_names))
+        return dict(zip(vm_names, results))
+
+    async def stop_many(self, vm_names: List[str]) -> Dict[str, bool]:
+        """Stop several VMs concurrently, within the host concurrency limit"""
+        results = await asyncio.gather(*(self.stop_vm(name) for name in vm_names))
+        return dict(zip(vm_names, results))
+
+    async def get_vm(self, vm_name: str) -> Optional[dict]:
+        """Get VM information"""
+        return self.manager.get_vm(vm_name)
+
+    async def list_vms(self, **filters) -> List[dict]:
+        """Get a page of VMs (see VMManager.list_vms for the filters)"""
+        return await self._offload(functools.partial(self.manager.list_vms, **filters))
+
+    async def flush(self):
+        """Write pending registry changes to storage"""
+        await self._offload(self.manager.flush)
+
+    async def close(self):
+        """Flush pending changes and shut down the executor (and a manager created here)"""
+        if self._owns_manager:
+            await self._offload(self.manager.close)
+        else:
+            await self.flush()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,313 @@
+"""
+Disk Provisioner
+Thin copy-on-write VM disks layered over one golden image per template
+"""
+
+import json
+import os
+import re
+import shutil
+import stat
+import subprocess
+import threading
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from utils.atomic_file import atomic_write_json, read_json
+
+GB = 1024 ** 3
+
+# Header used by the pure-Python stand-in when qemu-img is not installed
+SPARSE_MAGIC = b"MVSPARSE1\n"
+SPARSE_HEADER_SIZE = 4096
+
+SNAPSHOT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+
+class DiskProvisioner:
+    """Creates golden base images and thin per-VM overlays
+
+    With qemu-img available, disks are real qcow2 images and each overlay
+    references its template's base image as a backing file. Without it, a
+    sparse-file stand-in records the same backing relationship in a small
+    header, which keeps provisioning testable on any machine.
+    """
+
+    def __init__(self, images_dir: Path, qemu_img: str = None):
+        self.images_dir = Path(images_dir)
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+        self.qemu_img = qemu_img or shutil.which("qemu-img")
+
+        # Frozen layers and the VMs whose disks read through them
+        self.layers_dir = self.images_dir / "layers"
+        self.layer_refs_file = self.layers_dir / "refs.json"
+        self._layer_lock = threading.Lock()
+
+    @property
+    def uses_qemu_img(self) -> bool:
+        """Check if real qcow2 images are being created"""
+        return self.qemu_img is not None
+
+    def base_image_path(self, template_key: str) -> Path:
+        """Get the path of a template's golden base image"""
+        return self.images_dir / f"{template_key}-base.qcow2"
+
+    def ensure_base_image(self, template_key: str, size_gb: int, seed: Path = None) -> Path:
+        """Create a template's golden base image if it does not exist yet
+
+        seed is an archive written at the start of the image's data region
+        (the template's built layer tree).
+        """
+        base_path = self.base_image_path(template_key)
+        if not base_path.exists():
+            self.create_disk(base_path, size_gb, seed=seed)
+            print(f"💿 Created base image for {template_key}: {base_path.name}")
+        return base_path
+
+    def create_disk(self, path: Path, size_gb: int, backing_file: Path = None,
+                    seed: Path = None):
+        """Create a thin disk, optionally layered over a backing file
+
+        A seed file, if given, becomes the first bytes of the disk's data;
+        the rest of the disk is left unallocated.
+        """
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        if seed is not None and Path(seed).stat().st_size > int(size_gb) * GB:
+            raise ValueError(f"{seed} does not fit in a {size_gb}GB disk")
+
+        if self.qemu_img and seed is not None:
+            # qemu-img can't write into an image, so convert a sparse raw one
+            raw_path = path.with_name(path.name + ".raw")
+            try:
+                shutil.copyfile(seed, raw_path)
+                os.truncate(raw_path, int(size_gb) * GB)
+                subprocess.run(
+                    [self.qemu_img, "convert", "-q", "-f", "raw", "-O", "qcow2",
+                     str(raw_path), str(tmp_path)],
+                    check=True, capture_output=True
+                )
+            finally:
+                raw_path.unlink(missing_ok=True)
+        elif self.qemu_img:
+            command = [self.qemu_img, "create", "-q", "-f", "qcow2"]
+            if backing_file is not None:
+                command += ["-F", "qcow2", "-b", str(Path(backing_file).resolve())]
+            command += [str(tmp_path), f"{int(size_gb)}G"]
+            subprocess.run(command, check=True, capture_output=True)
+        else:
+            self._create_sparse(tmp_path, size_gb, backing_file, seed)
+
+        # Only a fully created disk ever appears under its final name
+        tmp_path.replace(path)
+
+    def create_overlay(self, base_path: Path, overlay_path: Path, size_gb: int = None):
+        """Create a copy-on-write overlay that reads through to base_path"""
+        if size_gb is None:
+            size_gb = self.virtual_size(base_path) // GB
+        self.create_disk(overlay_path, size_gb, backing_file=base_path)
+
+    def _create_sparse(self, path: Path, size_gb: int, backing_file: Path = None,
+                       seed: Path = None):
+        """Create a sparse stand-in disk with a small metadata header"""
+        header = {
+            "virtual_size": int(size_gb) * GB,
+            "backing_file": str(Path(backing_file).resolve()) if backing_file else None,
+            "seed_size": Path(seed).stat().st_size if seed is not None else 0
+        }
+        data = SPARSE_MAGIC + json.dumps(header).encode("utf-8")
+        if len(data) > SPARSE_HEADER_SIZE:
+            raise ValueError("Backing file path is too long for the disk header")
+
+        with open(path, 'wb') as f:
+            f.write(data)
+            if seed is not None:
+                f.seek(SPARSE_HEADER_SIZE)
+                with open(seed, 'rb') as seed_file:
+                    shutil.copyfileobj(seed_file, f)
+            f.truncate(SPARSE_HEADER_SIZE + header["virtual_size"])
+
+    def _info(self, path: Path) -> dict:
+        """Read a disk's virtual size and backing file"""
+        path = Path(path)
+        with open(path, 'rb') as f:
+            head = f.read(SPARSE_HEADER_SIZE)
+
+        if head.startswith(SPARSE_MAGIC):
+            header = json.loads(head[len(SPARSE_MAGIC):].rstrip(b"\0"))
+            return {
+                "virtual-size": header["virtual_size"],
+                "backing-filename": header["backing_file"]
+            }
+
+        if not self.qemu_img:
+            raise RuntimeError(f"qemu-img is needed to inspect {path}")
+        result = subprocess.run(
+            [self.qemu_img, "info", "--output=json", "-U", str(path)],
+            check=True, capture_output=True, text=True
+        )
+        return json.loads(result.stdout)
+
+    def virtual_size(self, path: Path) -> int:
+        """Get a disk's virtual size in bytes"""
+        return int(self._info(path)["virtual-size"])
+
+    def backing_file(self, path: Path) -> Optional[Path]:
+        """Get the image a disk reads through to, if any"""
+        backing = self._info(path).get("backing-filename")
+        return Path(backing) if backing else None
+
+    def freeze(self, disk_path: Path) -> Path:
+        """Turn a disk's current contents into an immutable shared layer
+
+        The disk is moved into images/layers and replaced in place by an
+        empty overlay on top of it, so the VM sees exactly the same data
+        while any number of clones can layer over the frozen copy too.
+        """
+        disk_path = Path(disk_path)
+        self.layers_dir.mkdir(exist_ok=True)
+        layer_path = self.layers_dir / f"{uuid.uuid4().hex}.qcow2"
+
+        size_gb = self.virtual_size(disk_path) // GB
+        os.replace(disk_path, layer_path)
+        try:
+            self.create_overlay(layer_path, disk_path, size_gb)
+        except Exception:
+            os.replace(layer_path, disk_path)
+            raise
+        layer_path.chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        return layer_path
+
+    def add_layer_ref(self, layer_path: Path, owner: str):
+        """Record that a VM's disk reads through a frozen layer"""
+        with self._layer_lock:
+            refs = read_json(self.layer_refs_file, default={})
+            owners = refs.setdefault(Path(layer_path).name, [])
+            if owner not in owners:
+                owners.append(owner)
+                atomic_write_json(self.layer_refs_file, refs)
+
+    def layers_of(self, owner: str) -> List[Path]:
+        """Get the frozen layers a VM's disk reads through"""
+        with self._layer_lock:
+            refs = read_json(self.layer_refs_file, default={})
+        return [self.layers_dir / name for name, owners in refs.items() if owner in owners]
+
+    def release_layers(self, owner: str) -> List[Path]:
+        """Drop a VM's layer references, deleting layers nothing reads through any more
+
+        A layer's owners include every VM further up its chain (clones
+        inherit their source's layers), so a layer is never deleted while
+        a layer stacked on it is still in use.
+        """
+        with self._layer_lock:
+            refs = read_json(self.layer_refs_file, default={})
+            changed = False
+            removed = []
+            for name, owners in list(refs.items()):
+                if owner not in owners:
+                    continue
+                owners.remove(owner)
+                changed = True
+                if not owners:
+                    del refs[name]
+                    (self.layers_dir / name).unlink(missing_ok=True)
+                    removed.append(self.layers_dir / name)
+            if changed:
+                atomic_write_json(self.layer_refs_file, refs)
+        for path in removed:
+            print(f"🧹 Removed unused disk layer {path.name}")
+        return removed
+
+    def rename_layer_owner(self, old_owner: str, new_owner: str):
+        """Move a VM's layer references to its new name"""
+        with self._layer_lock:
+            refs = read_json(self.layer_refs_file, default={})
+            changed = False
+            for owners in refs.values():
+                if old_owner in owners:
+                    owners[owners.index(old_owner)] = new_owner
+                    changed = True
+            if changed:
+                atomic_write_json(self.layer_refs_file, refs)
+
+    def copy_disk(self, source: Path, target: Path):
+        """Make an independent copy of a disk (sharing only its backing file)"""
+        target = Path(target)
+        if self.is_stand_in(source):
+            self._copy_stand_in(source, target)
+        else:
+            tmp_path = target.with_name(target.name + ".tmp")
+            shutil.copyfile(source, tmp_path)
+            tmp_path.replace(target)
+
+    @staticmethod
+    def is_stand_in(path: Path) -> bool:
+        """Check if a disk was created by the sparse-file stand-in"""
+        with open(path, 'rb') as f:
+            return f.read(len(SPARSE_MAGIC)) == SPARSE_MAGIC
+
+    @staticmethod
+    def _snapshot_copy(disk_path: Path, name: str) -> Path:
+        """Get where the stand-in keeps a named snapshot of a disk"""
+        disk_path = Path(disk_path)
+        return disk_path.with_name(disk_path.name + ".snapshots") / name
+
+    @staticmethod
+    def _copy_stand_in(source: Path, target: Path):
+        """Copy a stand-in disk without materializing its sparse region"""
+        with open(source, 'rb') as f:
+            header = f.read(SPARSE_HEADER_SIZE)
+            seed_size = json.loads(header[len(SPARSE_MAGIC):].rstrip(b"\0")).get("seed_size", 0)
+            seed = f.read(seed_size)
+        size = Path(source).stat().st_size
+        tmp_path = Path(target).with_name(Path(target).name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(seed)
+            f.truncate(size)
+        tmp_path.replace(target)
+
+    @staticmethod
+    def _check_snapshot_name(name: str):
+        """Reject snapshot names that are unsafe as file or tag names"""
+        if not SNAPSHOT_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid snapshot name: {name!r}")
+
+    def create_snapshot(self, disk_path: Path, name: str):
+        """Take a named snapshot of a disk (the VM must not be running)"""
+        self._check_snapshot_name(name)
+        if self.is_stand_in(disk_path):
+            snapshot = self._snapshot_copy(disk_path, name)
+            snapshot.parent.mkdir(exist_ok=True)
+            self._copy_stand_in(disk_path, snapshot)
+        else:
+            subprocess.run([self.qemu_img, "snapshot", "-c", name, str(disk_path)],
+                           check=True, capture_output=True)
+
+    def revert_snapshot(self, disk_path: Path, name: str):
+        """Roll a disk back to a named snapshot (the VM must not be running)"""
+        self._check_snapshot_name(name)
+        if self.is_stand_in(disk_path):
+            snapshot = self._snapshot_copy(disk_path, name)
+            if not snapshot.exists():
+                raise FileNotFoundError(f"Snapshot '{name}' not found")
+            self._copy_stand_in(snapshot, disk_path)
+        else:
+            subprocess.run([self.qemu_img, "snapshot", "-a", name, str(disk_path)],
+                           check=True, capture_output=True)
+
+    def delete_snapshot(self, disk_path: Path, name: str):
+        """Remove a named snapshot from a disk"""
+        self._check_snapshot_name(name)
+        if self.is_stand_in(disk_path):
+            self._snapshot_copy(disk_path, name).unlink(missing_ok=True)
+        else:
+            subprocess.run([self.qemu_img, "snapshot", "-d", name, str(disk_path)],
+                           check=True, capture_output=True)
+
+    @staticmethod
+    def allocated_size(path: Path) -> int:
+        """Get the bytes a disk actually occupies on the host"""
+        return Path(path).stat().st_blocks * 512
@@ -0,0 +1,136 @@
+"""
+VM Registry Journal
+Append-only change log with periodic snapshot compaction
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+from utils.atomic_file import CorruptFileError, atomic_write_json, read_json
+
+
+class VMJournal:
+    """Journaled storage for the VM registry
+
+    The registry lives in two files: a JSON snapshot holding the full
+    state at the last compaction, and a JSON-lines journal of every change
+    made since. Each change is one small appended record, so flipping a
+    VM's status no longer rewrites the whole registry.
+    """
+
+    def __init__(self, snapshot_file: Path, journal_file: Path = None,
+                 compact_threshold: int = 1000):
+        self.snapshot_file = Path(snapshot_file)
+        if journal_file is None:
+            journal_file = self.snapshot_file.with_suffix(".journal")
+        self.journal_file = Path(journal_file)
+        self.compact_threshold = compact_threshold
+
+        # Number of records appended since the last snapshot
+        self.entries_since_snapshot = 0
+        self._handle = None
+
+    def load(self) -> Dict[str, dict]:
+        """Rebuild the registry by replaying the journal over the snapshot"""
+        try:
+            vms = read_json(self.snapshot_file, default={})
+        except CorruptFileError:
+            print("Warning: Could not load VM configuration")
+            vms = {}
+
+        self.entries_since_snapshot = 0
+        if self.journal_file.exists():
+            intact_size = 0
+            with open(self.journal_file, 'rb') as f:
+                for raw_line in f:
+                    try:
+                        if not raw_line.endswith(b"\n"):
+                            raise ValueError("unterminated record")
+                        entry = json.loads(raw_line)
+                    except ValueError:
+                        # A torn record from an interrupted append
+                        print("Warning: Skipping damaged journal record")
+                        break
+                    self._apply(vms, entry)
+                    self.entries_since_snapshot += 1
+                    intact_size += len(raw_line)
+
+            # Drop the torn tail so new records don't get glued onto it
+            if intact_size < self.journal_file.stat().st_size:
+                os.truncate(self.journal_file, intact_size)
+
+        return vms
+
+    @staticmethod
+    def _apply(vms: Dict[str, dict], entry: dict):
+        """Apply a single journal record to the registry"""
+        op = entry.get("op")
+        name = entry.get("name")
+
+        if op == "put":
+            vms[name] = entry["record"]
+        elif op == "set":
+            if name in vms:
+                vms[name].update(entry["fields"])
+        elif op == "delete":
+            vms.pop(name, None)
+
+    def _append(self, *entries: dict):
+        """Append records to the journal in a single durable write"""
+        if self._handle is None:
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.journal_file, 'a')
+
+        self._handle.write("".join(
+            json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries
+        ))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self.entries_since_snapshot += len(entries)
+
+    def record_put(self, vm_name: str, record: dict):
+        """Record a full VM entry (creation or replacement)"""
+        self._append({"op": "put", "name": vm_name, "record": record})
+
+    def record_update(self, vm_name: str, fields: dict):
+        """Record a partial update to a VM entry"""
+        self._append({"op": "set", "name": vm_name, "fields": fields})
+
+    def record_delete(self, vm_name: str):
+        """Record the removal of a VM entry"""
+        self._append({"op": "delete", "name": vm_name})
+
+    def record_batch(self, changes: list):
+        """Record a list of (op, vm_name, payload) changes in one write"""
+        entries = []
+        for op, vm_name, payload in changes:
+            if op == "put":
+                entries.append({"op": "put", "name": vm_name, "record": payload})
+            elif op == "set":
+                entries.append({"op": "set", "name": vm_name, "fields": payload})
+            elif op == "delete":
+                entries.append({"op": "delete", "name": vm_name})
+        if entries:
+            self._append(*entries)
+
+    def needs_compaction(self) -> bool:
+        """Check if the journal has grown enough to fold into the snapshot"""
+        return self.entries_since_snapshot >= self.compact_threshold
+
+    def compact(self, vms: Dict[str, dict]):
+        """Write a fresh snapshot and start an empty journal"""
+        atomic_write_json(self.snapshot_file, vms)
+
+        # Replaying the old journal over the new snapshot is harmless, so a
+        # crash between these two steps cannot lose or corrupt state
+        self.close()
+        open(self.journal_file, 'w').close()
+        self.entries_since_snapshot = 0
+
+    def close(self):
+        """Close the journal file handle"""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
@@ -0,0 +1,390 @@
+"""
+Libvirt Lifecycle Engine
+Defines, starts and stops domains through pooled libvirt connections
+"""
+
+import queue
+import random
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict
+from xml.sax.saxutils import escape, quoteattr
+
+try:
+    import libvirt
+    LIBVIRT_AVAILABLE = True
+except ImportError:
+    libvirt = None
+    LIBVIRT_AVAILABLE = False
+
+
+DEFAULT_URI = "qemu:///system"
+
+_event_loop_lock = threading.Lock()
+_event_loop_started = False
+
+
+def _ensure_event_loop():
+    """Run libvirt's default event loop on a daemon thread (once per process)"""
+    global _event_loop_started
+    with _event_loop_lock:
+        if _event_loop_started:
+            return
+        libvirt.virEventRegisterDefaultImpl()
+
+        def run():
+            while True:
+                libvirt.virEventRunDefaultImpl()
+
+        threading.Thread(target=run, name="libvirt-events", daemon=True).start()
+        _event_loop_started = True
+
+
+def _event_status(event: int, detail: int = 0):
+    """Map a domain lifecycle event to a VM status (None if it changes nothing)"""
+    if event in (libvirt.VIR_DOMAIN_EVENT_STARTED, libvirt.VIR_DOMAIN_EVENT_RESUMED):
+        return "running"
+    if event in (libvirt.VIR_DOMAIN_EVENT_SUSPENDED, libvirt.VIR_DOMAIN_EVENT_PMSUSPENDED):
+        return "paused"
+    if event == libvirt.VIR_DOMAIN_EVENT_STOPPED and detail == libvirt.VIR_DOMAIN_EVENT_STOPPED_SAVED:
+        return "suspended"
+    if event in (libvirt.VIR_DOMAIN_EVENT_STOPPED, libvirt.VIR_DOMAIN_EVENT_CRASHED):
+        return "stopped"
+    return None
+
+
+def _state_status(domain) -> str:
+    """Get a domain's current VM status"""
+    state = domain.state()[0]
+    if state in (libvirt.VIR_DOMAIN_RUNNING, libvirt.VIR_DOMAIN_BLOCKED):
+        return "running"
+    if state in (libvirt.VIR_DOMAIN_PAUSED, libvirt.VIR_DOMAIN_PMSUSPENDED):
+        return "paused"
+    if domain.hasManagedSaveImage(0):
+        return "suspended"
+    return "stopped"
+
+
+def generate_mac() -> str:
+    """Generate a random MAC address in QEMU's locally administered range"""
+    return "52:54:00:%02x:%02x:%02x" % tuple(random.randint(0, 255) for _ in range(3))
+
+
+def build_domain_xml(vm_name: str, config: dict, domain_type: str = "kvm",
+                     mac_address: str = None, disk_path: str = None) -> str:
+    """Build libvirt domain XML from a template-style VM config
+
+    config uses the template default_config layout: memory in MB,
+    cpu_cores, and display / network sub-dicts.
+    """
+    memory = int(config.get("memory", 2048))
+    cpu_cores = int(config.get("cpu_cores", 2))
+    display = config.get("display", {})
+    network = config.get("network", {})
+
+    devices = []
+
+    if disk_path:
+        devices.append(f"""
+    <disk type='file' device='disk'>
+      <driver name='qemu' type='qcow2'/>
+      <source file={quoteattr(str(disk_path))}/>
+      <target dev='vda' bus='virtio'/>
+    </disk>""")
+
+    if network.get("enabled", True):
+        mac = f"\n      <mac address={quoteattr(mac_address)}/>" if mac_address else ""
+        if network.get("type", "nat") == "bridge":
+            source = f"<source bridge={quoteattr(network.get('bridge', 'br0'))}/>"
+            interface_type = "bridge"
+        else:
+            source = f"<source network={quoteattr(network.get('network', 'default'))}/>"
+            interface_type = "network"
+        devices.append(f"""
+    <interface type='{interface_type}'>{mac}
+      {source}
+      <model type='virtio'/>
+    </interface>""")
+
+    devices.append(f"""
+    <graphics type='spice' autoport='yes'/>
+    <video>
+      <model type='virtio' heads='1'>
+        <resolution x='{int(display.get("width", 1280))}' y='{int(display.get("height", 720))}'/>
+      </model>
+    </video>""")
+
+    return f"""<domain type='{domain_type}'>
+  <name>{escape(vm_name)}</name>
+  <memory unit='MiB'>{memory}</memory>
+  <currentMemory unit='MiB'>{memory}</currentMemory>
+  <vcpu>{cpu_cores}</vcpu>
+  <os>
+    <type arch='x86_64'>hvm</type>
+    <boot dev='hd'/>
+  </os>
+  <features>
+    <acpi/>
+  </features>
+  <devices>{"".join(devices)}
+  </devices>
+</domain>
+"""
+
+
+class LibvirtConnectionPool:
+    """Pool of reusable libvirt connections
+
+    Connections are opened lazily up to the pool size and handed out for
+    the duration of a with block. A connection that has died is replaced
+    transparently the next time it is checked out.
+    """
+
+    def __init__(self, uri: str = DEFAULT_URI, size: int = 4):
+        if not LIBVIRT_AVAILABLE:
+            raise RuntimeError("libvirt is not available")
+        self.uri = uri
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        """Open a new connection to the hypervisor"""
+        conn = libvirt.open(self.uri)
+        if conn is None:
+            raise RuntimeError(f"Could not connect to {self.uri}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the block"""
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+
+        try:
+            alive = conn.isAlive()
+        except libvirt.libvirtError:
+            alive = False
+        if not alive:
+            # Release the dead connection's handle before replacing it
+            try:
+                conn.close()
+            except libvirt.libvirtError:
+                pass
+            try:
+                conn = self._open()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.close()
+            except Exception:
+                pass
+            with self._lock:
+                self._opened -= 1
+
+
+class LibvirtEngine:
+    """Domain lifecycle on top of a libvirt connection pool
+
+    Works against any libvirt URI, including the built-in test:///default
+    driver, which needs no KVM and keeps all state in memory.
+    """
+
+    def __init__(self, uri: str = DEFAULT_URI, pool_size: int = 4):
+        self.uri = uri
+        self.pool = LibvirtConnectionPool(uri, pool_size)
+        self.domain_type = "test" if uri.startswith("test:") else "kvm"
+
+        # The event loop must be registered before connections are opened
+        _ensure_event_loop()
+
+        # Fail early if the hypervisor cannot be reached
+        with self.pool.connection():
+            pass
+
+    def _lookup(self, conn, vm_name: str):
+        """Look up a domain by name, returning None if it is not defined"""
+        try:
+            return conn.lookupByName(vm_name)
+        except libvirt.libvirtError as e:
+            if e.get_error_code() == libvirt.VIR_ERR_NO_DOMAIN:
+                return None
+            raise
+
+    def define(self, vm_name: str, config: dict, mac_address: str = None,
+               disk_path: str = None):
+        """Define (or redefine) a persistent domain for a VM"""
+        xml = build_domain_xml(vm_name, config, self.domain_type, mac_address, disk_path)
+        with self.pool.connection() as conn:
+            conn.defineXML(xml)
+
+    def start(self, vm_name: str, config: dict, mac_address: str = None,
+              disk_path: str = None) -> bool:
+        """Start a VM's domain, defining it from its config first
+
+        A domain with saved memory state is resumed from it instead of
+        being booted (its definition is left alone so the saved state stays
+        compatible). Returns True if the domain was resumed.
+        """
+        with self.pool.connection() as conn:
+            domain = self._lookup(conn, vm_name)
+            if domain is not None and domain.isActive():
+                return False
+            if domain is not None and domain.hasManagedSaveImage(0):
+                domain.create()
+                return True
+
+            xml = build_domain_xml(vm_name, config, self.domain_type,
+                                   mac_address, disk_path)
+            domain = conn.defineXML(xml)
+            domain.create()
+            return False
+
+    def stop(self, vm_name: str, force: bool = False):
+        """Stop a VM's domain (ACPI shutdown, or power off when forced)"""
+        with self.pool.connection() as conn:
+            domain = self._lookup(conn, vm_name)
+            if domain is None or not domain.isActive():
+                return
+            if force:
+                domain.destroy()
+            else:
+                domain.shutdown()
+
+    def undefine(self, vm_name: str):
+        """Power off and remove a VM's domain definition"""
+        with self.pool.connection() as conn:
+            domain = self._lookup(conn, vm_name)
+            if domain is None:
+                return
+            if domain.isActive():
+                domain.destroy()
+            domain.undefineFlags(libvirt.VIR_DOMAIN_UNDEFINE_MANAGED_SAVE |
+                                 libvirt.VIR_DOMAIN_UNDEFINE_SNAPSHOTS_METADATA)
+
+    def save(self, vm_name: str):
+        """Save a running domain's memory state to disk and stop it (managed save)"""
+        with self.pool.connection() as conn:
+            domain = self._lookup(conn, vm_name)
+            if domain is None or not domain.isActive():
+                raise RuntimeError(f"VM '{vm_name}' is not running")
+            domain.managedSave(0)
+
+    def has_saved_state(self, vm_name: str) -> bool:
+        """Check if a domain has saved memory state to resume from"""
+        with self.pool.connection() as conn:
+            domain = self._lookup(conn, vm_name)
+            return domain is not None and bool(domain.hasManagedSaveImage(0))
+
+    def discard_saved_state(self, vm_name: str):
+        """Throw away a domain's saved memory state"""
+        with self.pool.connection() as conn:
+            domain = self._lookup(conn, vm_name)
+            if domain is not None and domain.hasManagedSaveImage(0):
+                domain.managedSaveRemove(0)
+
+    def is_running(self, vm_name: str) -> bool:
+        """Check if a VM's domain is active"""
+        with self.pool.connection() as conn:
+            domain = self._lookup(conn, vm_name)
+            return domain is not None and bool(domain.isActive())
+
+    def list_states(self) -> Dict[str, str]:
+        """Get the current status of every defined domain in one call"""
+        with self.pool.connection() as conn:
+            return {
+                domain.name(): _state_status(domain)
+                for domain in conn.listAllDomains()
+            }
+
+    def collect_stats(self) -> Dict[str, dict]:
+        """Read raw CPU, memory, disk and network counters for every running domain
+
+        Uses a single getAllDomainStats call, however many domains run.
+        """
+        with self.pool.connection() as conn:
+            records = conn.getAllDomainStats(
+                libvirt.VIR_DOMAIN_STATS_CPU_TOTAL | libvirt.VIR_DOMAIN_STATS_BALLOON |
+                libvirt.VIR_DOMAIN_STATS_VCPU | libvirt.VIR_DOMAIN_STATS_INTERFACE |
+                libvirt.VIR_DOMAIN_STATS_BLOCK,
+                libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_ACTIVE
+            )
+
+        def total(values, prefix, field):
+            return sum(values.get(f"{prefix}.{i}.{field}", 0)
+                       for i in range(values.get(f"{prefix}.count", 0)))
+
+        return {
+            domain.name(): {
+                "cpu_time_ns": values.get("cpu.time", 0),
+                "vcpus": values.get("vcpu.current", 1),
+                "memory_kb": values.get("balloon.rss", values.get("balloon.current", 0)),
+                "disk_read_bytes": total(values, "block", "rd.bytes"),
+                "disk_write_bytes": total(values, "block", "wr.bytes"),
+                "net_rx_bytes": total(values, "net", "rx.bytes"),
+                "net_tx_bytes": total(values, "net", "tx.bytes")
+            }
+            for domain, values in records
+        }
+
+    def subscribe_events(self, callback: Callable[[str, str], None]) -> Callable[[], None]:
+        """Register for (vm_name, status) lifecycle events; returns an unsubscribe function
+
+        Events arrive on libvirt's event loop thread over a dedicated
+        connection, so tracking any number of domains costs no polling.
+        """
+        conn = libvirt.open(self.uri)
+        if conn is None:
+            raise RuntimeError(f"Could not connect to {self.uri}")
+
+        def on_lifecycle(conn, domain, event, detail, opaque):
+            status = _event_status(event, detail)
+            if status is not None:
+                callback(domain.name(), status)
+
+        callback_id = conn.domainEventRegisterAny(
+            None, libvirt.VIR_DOMAIN_EVENT_ID_LIFECYCLE, on_lifecycle, None
+        )
+
+        def unsubscribe():
+            try:
+                conn.domainEventDeregisterAny(callback_id)
+            finally:
+                conn.close()
+
+        return unsubscribe
+
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close_all()
@@ -0,0 +1,272 @@
+"""
+Metrics Collector
+Samples live per-VM CPU, memory, disk and network usage
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.ring_buffer import DEFAULT_TIERS, TieredHistory
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+# Series kept per VM: CPU in percent of its vCPUs, memory in MB, I/O in bytes/s
+METRICS = ("cpu", "memory", "disk_read", "disk_write", "net_rx", "net_tx")
+
+# Host series, all in percent of capacity
+HOST_METRICS = ("cpu", "memory", "disk")
+
+# Cumulative counters turned into per-second rates
+RATE_COUNTERS = {
+    "disk_read": "disk_read_bytes",
+    "disk_write": "disk_write_bytes",
+    "net_rx": "net_rx_bytes",
+    "net_tx": "net_tx_bytes"
+}
+
+
+def _qemu_domain_name(cmdline: List[str]) -> Optional[str]:
+    """Get the guest name from a QEMU command line (-name guest=NAME,...)"""
+    for i, arg in enumerate(cmdline[:-1]):
+        if arg == "-name":
+            value = cmdline[i + 1].split(",")[0]
+            return value[len("guest="):] if value.startswith("guest=") else value
+    return None
+
+
+def _qemu_vcpus(cmdline: List[str]) -> int:
+    """Get the vCPU count from a QEMU command line (-smp N,...)"""
+    for i, arg in enumerate(cmdline[:-1]):
+        if arg == "-smp":
+            first = cmdline[i + 1].split(",")[0]
+            return int(first) if first.isdigit() else 1
+    return 1
+
+
+def qemu_process_stats() -> Dict[str, dict]:
+    """Read raw counters for every QEMU process on the host in one process scan
+
+    Fallback for hypervisor connections that can't report domain stats.
+    QEMU processes expose no per-guest network counters, so those stay 0.
+    """
+    stats = {}
+    for process in psutil.process_iter(["name", "cmdline"]):
+        try:
+            if not (process.info["name"] or "").startswith("qemu"):
+                continue
+            cmdline = process.info["cmdline"] or []
+            domain_name = _qemu_domain_name(cmdline)
+            if domain_name is None:
+                continue
+            with process.oneshot():
+                cpu = process.cpu_times()
+                memory = process.memory_info()
+                try:
+                    io = process.io_counters()
+                except (AttributeError, psutil.AccessDenied):
+                    io = None
+            stats[domain_name] = {
+                "cpu_time_ns": int((cpu.user + cpu.system) * 1e9),
+                "vcpus": _qemu_vcpus(cmdline),
+                "memory_kb": memory.rss // 1024,
+                "disk_read_bytes": io.read_bytes if io else 0,
+                "disk_write_bytes": io.write_bytes if io else 0,
+                "net_rx_bytes": 0,
+                "net_tx_bytes": 0
+            }
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return stats
+
+
+def host_stats(path: str) -> Dict[str, float]:
+    """Read host CPU, memory and disk usage (disk of the filesystem holding path)"""
+    return {
+        "cpu": psutil.cpu_percent(interval=None),
+        "memory": psutil.virtual_memory().percent,
+        "disk": psutil.disk_usage(path).percent
+    }
+
+
+class MetricsCollector:
+    """Samples every running VM once per interval on a background thread
+
+    Each sample is a single batched read for the whole fleet: libvirt's
+    getAllDomainStats, a psutil scan of QEMU processes if that is not
+    supported, or the simulated engine's counters. Cumulative counters
+    become rates and land in per-VM tiered ring buffers (see
+    TieredHistory), next to host CPU, memory and disk usage when psutil
+    is available. Consumers either subscribe to every sample or, like the
+    UI, poll latest() on their own (throttled) timer and use generation
+    to skip work when nothing new arrived.
+    """
+
+    def __init__(self, vm_manager, interval: float = 1.0, tiers=DEFAULT_TIERS):
+        self.vm_manager = vm_manager
+        self.interval = interval
+        self.tiers = tiers
+        self.generation = 0
+        self._series = {}
+        self._latest = {}
+        self._host_series = {metric: TieredHistory(tiers) for metric in HOST_METRICS}
+        self._latest_host = {}
+        self._previous = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._use_processes = False
+
+    def start(self):
+        """Start sampling on a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self):
+        """Sample until stopped"""
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Error sampling VM metrics: {e}")
+            self._stop_event.wait(self.interval)
+
+    def _read_stats(self) -> Dict[str, dict]:
+        """Read raw counters for all running domains in one batched call"""
+        if not self._use_processes:
+            try:
+                return self.vm_manager.engine.collect_stats()
+            except Exception as e:
+                if not PSUTIL_AVAILABLE:
+                    raise
+                print(f"⚠️  Domain stats unavailable, reading QEMU processes instead: {e}")
+                self._use_processes = True
+        return qemu_process_stats()
+
+    def sample(self):
+        """Take one sample of every running VM"""
+        raw = self._read_stats()
+        host = host_stats(str(self.vm_manager.data_dir)) if PSUTIL_AVAILABLE else {}
+        now = time.monotonic()
+        manager = self.vm_manager
+
+        latest = {}
+        with self._lock:
+            for domain_name, counters in raw.items():
+                vm_name = manager.vm_for_domain(domain_name)
+                if vm_name is None:
+                    continue
+
+                previous = self._previous.get(vm_name)
+                self._previous[vm_name] = (now, counters)
+                if previous is None:
+                    continue
+
+                elapsed = now - previous[0]
+                if elapsed <= 0:
+                    continue
+                before = previous[1]
+                vcpus = max(1, counters.get("vcpus", 1))
+                cpu_ns = counters["cpu_time_ns"] - before["cpu_time_ns"]
+                values = {
+                    "cpu": min(100.0, max(0.0, cpu_ns / (elapsed * 1e9 * vcpus) * 100)),
+                    "memory": counters["memory_kb"] / 1024
+                }
+                for metric, counter in RATE_COUNTERS.items():
+                    values[metric] = max(0.0, (counters[counter] - before[counter]) / elapsed)
+
+                series = self._series.get(vm_name)
+                if series is None:
+                    series = {metric: TieredHistory(self.tiers) for metric in METRICS}
+                    self._series[vm_name] = series
+                for metric, value in values.items():
+                    series[metric].append(value)
+                latest[vm_name] = values
+
+            # Forget counters of stopped VMs and history of deleted ones
+            for vm_name in list(self._previous):
+                if manager.domain_name(vm_name) not in raw:
+                    del self._previous[vm_name]
+            for vm_name in list(self._series):
+                if manager.get_vm(vm_name) is None:
+                    del self._series[vm_name]
+
+            for metric, value in host.items():
+                self._host_series[metric].append(value)
+
+            self._latest = latest
+            self._latest_host = host
+            self.generation += 1
+
+        for callback in list(self._subscribers):
+            try:
+                callback(latest)
+            except Exception as e:
+                print(f"Error in metrics subscriber: {e}")
+
+    def latest(self, vm_name: str = None):
+        """Get the newest values of one running VM (or a dict of all of them)"""
+        with self._lock:
+            if vm_name is None:
+                return dict(self._latest)
+            return self._latest.get(vm_name)
+
+    def latest_host(self) -> Dict[str, float]:
+        """Get the newest host usage values"""
+        with self._lock:
+            return dict(self._latest_host)
+
+    def vm_names(self) -> List[str]:
+        """Get the VMs that have recorded history"""
+        with self._lock:
+            return list(self._series)
+
+    def history(self, vm_name: str, metric: str, seconds: float = None) -> List[float]:
+        """Get the recent samples of one VM metric, oldest first"""
+        if seconds is None:
+            seconds = self.tiers[0][1] * self.interval
+        return self.window(vm_name, metric, seconds)[1]
+
+    def window(self, vm_name: str, metric: str, seconds: float) -> Tuple[float, List[float]]:
+        """Get a VM metric over the last `seconds` as (seconds per point, points)"""
+        with self._lock:
+            series = self._series.get(vm_name)
+            return self._window(series[metric] if series else None, seconds)
+
+    def host_window(self, metric: str, seconds: float) -> Tuple[float, List[float]]:
+        """Get a host metric over the last `seconds` as (seconds per point, points)"""
+        with self._lock:
+            return self._window(self._host_series[metric], seconds)
+
+    def _window(self, series: Optional[TieredHistory], seconds: float) -> Tuple[float, List[float]]:
+        """Read a window from the finest resolution that covers it"""
+        if series is None:
+            return self.interval, []
+        step, points = series.window(max(1, round(seconds / self.interval)))
+        return step * self.interval, points
+
+    def subscribe(self, callback: Callable[[Dict[str, dict]], None]) -> Callable[[], None]:
+        """Call back with every sample (on the sampling thread); returns an unsubscribe function"""
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
@@ -0,0 +1,224 @@
+"""
+Resource Accountant
+Host admission control for VM creation and start-up
+"""
+
+import threading
+from typing import List, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+MB = 1024 ** 2
+GB = 1024 ** 3
+
+# Statuses whose VMs hold host memory and CPU
+ACTIVE_STATUSES = ("running", "paused")
+
+
+class AdmissionError(RuntimeError):
+    """Raised when the host cannot take on a VM"""
+
+
+def _gb(value, default: float = 0.0) -> float:
+    """Parse a registry size such as "20GB" into GB"""
+    try:
+        return float(str(value).upper().replace("GB", "").strip())
+    except ValueError:
+        return default
+
+
+def config_demand(vm_config: dict) -> dict:
+    """Get what a VM config asks of the host: memory (MB), CPU cores and disk (GB)"""
+    config = vm_config.get("config", {})
+    if "memory" in vm_config:
+        memory_mb = int(vm_config["memory"]) * 1024
+    else:
+        memory_mb = int(config.get("memory", 2048))
+    return {
+        "memory_mb": memory_mb,
+        "cpu_cores": int(vm_config.get("cpu_cores", config.get("cpu_cores", 2))),
+        "storage_gb": float(vm_config.get("storage", config.get("storage", 20)))
+    }
+
+
+class ResourceAccountant:
+    """Tracks committed versus available host memory, CPU and disk
+
+    Running and paused VMs (plus starts in flight) count as committed.
+    A start is admitted only if committed memory and vCPUs stay within
+    the host's totals times their overcommit ratios and the VM's memory
+    fits in what the host has available right now, less a reserve, so a
+    burst of starts cannot push the host into swap. Disk is committed by
+    every registered VM's virtual size.
+
+    A start that does not fit is rejected, or with queue_starts enabled
+    parked in a FIFO queue (status "queued") and retried whenever a VM
+    releases its resources. Simulated VMs use no host resources, so
+    VMManager only enables the checks when a hypervisor is connected.
+    """
+
+    def __init__(self, vm_manager, memory_overcommit: float = 1.0, cpu_overcommit: float = 4.0,
+                 disk_overcommit: float = 2.0, memory_reserve_mb: int = 1024,
+                 queue_starts: bool = False, enabled: bool = True):
+        self.vm_manager = vm_manager
+        self.enabled = enabled
+        self.memory_overcommit = memory_overcommit
+        self.cpu_overcommit = cpu_overcommit
+        self.disk_overcommit = disk_overcommit
+        self.memory_reserve_mb = memory_reserve_mb
+        self.queue_starts = queue_starts
+
+        self._lock = threading.RLock()
+        self._reserved = {}
+        self._demands = {}
+        self._queue = [name for name, vm in vm_manager.vms.items()
+                       if vm.get("status") == "queued"]
+        self._drain_lock = threading.Lock()
+
+        if enabled and not PSUTIL_AVAILABLE:
+            print("⚠️  psutil not available - host resource checks are disabled")
+
+    def host(self) -> Optional[dict]:
+        """Get the host's memory (MB), CPU and disk (GB) capacity (None when not checking)"""
+        if not self.enabled or not PSUTIL_AVAILABLE:
+            return None
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(str(self.vm_manager.data_dir))
+        return {
+            "memory_mb": memory.total // MB,
+            "available_memory_mb": memory.available // MB,
+            "cpu_cores": psutil.cpu_count() or 1,
+            "disk_gb": disk.total / GB
+        }
+
+    def demand(self, vm_name: str) -> dict:
+        """Get a registered VM's resource demand (cached per VM)"""
+        demand = self._demands.get(vm_name)
+        if demand is None:
+            config = self.vm_manager.get_domain_config(vm_name)
+            demand = {
+                "memory_mb": int(config.get("memory", 2048)),
+                "cpu_cores": int(config.get("cpu_cores", 2))
+            }
+            self._demands[vm_name] = demand
+        return demand
+
+    def forget(self, vm_name: str):
+        """Drop cached demand for a VM that was deleted or renamed"""
+        self._demands.pop(vm_name, None)
+        with self._lock:
+            if vm_name in self._queue:
+                self._queue.remove(vm_name)
+
+    def committed(self) -> dict:
+        """Get the memory (MB), vCPUs and disk (GB) committed to VMs"""
+        memory_mb = cpu_cores = 0
+        disk_gb = 0.0
+        with self._lock:
+            reserved = dict(self._reserved)
+        for name, vm in list(self.vm_manager.vms.items()):
+            disk_gb += _gb(vm.get("storage"), 20)
+            if vm.get("status") in ACTIVE_STATUSES and name not in reserved:
+                demand = self.demand(name)
+                memory_mb += demand["memory_mb"]
+                cpu_cores += demand["cpu_cores"]
+        for demand in reserved.values():
+            memory_mb += demand["memory_mb"]
+            cpu_cores += demand["cpu_cores"]
+        return {"memory_mb": memory_mb, "cpu_cores": cpu_cores, "disk_gb": disk_gb}
+
+    def _check(self, demand: dict, host: dict, committed: dict, starting: bool) -> Optional[str]:
+        """Get why a demand does not fit on the host, or None if it does"""
+        memory_limit = host["memory_mb"] * self.memory_overcommit - self.memory_reserve_mb
+        if committed["memory_mb"] + demand["memory_mb"] > memory_limit:
+            return (f"needs {demand['memory_mb']} MB of memory, "
+                    f"{max(0, int(memory_limit - committed['memory_mb']))} MB left to commit")
+
+        cpu_limit = host["cpu_cores"] * self.cpu_overcommit
+        if committed["cpu_cores"] + demand["cpu_cores"] > cpu_limit:
+            return (f"needs {demand['cpu_cores']} vCPUs, "
+                    f"{max(0, int(cpu_limit - committed['cpu_cores']))} left to commit")
+
+        if starting:
+            free_mb = host["available_memory_mb"] - self.memory_reserve_mb
+            if demand["memory_mb"] > free_mb:
+                return (f"needs {demand['memory_mb']} MB of memory, "
+                        f"only {max(0, free_mb)} MB free without swapping")
+        return None
+
+    def check_create(self, vm_configs: List[dict]) -> Optional[str]:
+        """Get why a set of new VMs can't be created, or None if they fit"""
+        host = self.host()
+        if host is None:
+            return None
+
+        # A VM that could never start on this host is rejected up front
+        empty = {"memory_mb": 0, "cpu_cores": 0, "disk_gb": 0.0}
+        new_disk_gb = 0.0
+        for vm_config in vm_configs:
+            demand = config_demand(vm_config)
+            reason = self._check(demand, host, empty, starting=False)
+            if reason:
+                return f"'{vm_config.get('name')}' {reason}"
+            new_disk_gb += demand["storage_gb"]
+
+        disk_limit = host["disk_gb"] * self.disk_overcommit
+        committed_disk = self.committed()["disk_gb"]
+        if committed_disk + new_disk_gb > disk_limit:
+            return (f"needs {new_disk_gb:.0f} GB of disk, "
+                    f"{max(0, int(disk_limit - committed_disk))} GB left to commit")
+        return None
+
+    def reserve(self, vm_name: str) -> Optional[str]:
+        """Admit a start and hold its resources until release(), or get why it does not fit"""
+        host = self.host()
+        if host is None:
+            return None
+        demand = self.demand(vm_name)
+        with self._lock:
+            reason = self._check(demand, host, self.committed(), starting=True)
+            if reason:
+                return reason
+            self._reserved[vm_name] = demand
+            if vm_name in self._queue:
+                self._queue.remove(vm_name)
+            return None
+
+    def release(self, vm_name: str):
+        """Stop holding a start's reservation (the VM's status now accounts for it, or it failed)"""
+        with self._lock:
+            self._reserved.pop(vm_name, None)
+
+    def enqueue(self, vm_name: str):
+        """Park a start until resources free up"""
+        with self._lock:
+            if vm_name not in self._queue:
+                self._queue.append(vm_name)
+
+    def queued(self) -> List[str]:
+        """Get the queued starts, oldest first"""
+        with self._lock:
+            return list(self._queue)
+
+    def resources_freed(self):
+        """Retry queued starts on a background thread"""
+        if self._queue:
+            threading.Thread(target=self.drain_queue, name="admission-queue",
+                             daemon=True).start()
+
+    def drain_queue(self):
+        """Start every queued VM that fits now, oldest first"""
+        manager = self.vm_manager
+        with self._drain_lock:
+            for vm_name in self.queued():
+                vm = manager.get_vm(vm_name)
+                if vm is None or vm.get("status") != "queued":
+                    self.forget(vm_name)
+                    continue
+                if self.reserve(vm_name) is None:
+                    manager.start_vm(vm_name, admitted=True)
@@ -0,0 +1,120 @@
+"""
+Simulated Hypervisor
+Stand-in lifecycle engine used when libvirt is not available
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+
+class SimulatedEngine:
+    """In-memory engine with the same interface as LibvirtEngine
+
+    Every lifecycle call emits a synthetic event to subscribers, just as
+    libvirt reports domain lifecycle events in real mode.
+    """
+
+    def __init__(self, running: Iterable[str] = (), saved: Iterable[str] = ()):
+        self.running = set(running)
+        self.saved = set(saved)
+        self._counters = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def _emit(self, vm_name: str, status: str):
+        """Deliver a synthetic lifecycle event"""
+        for listener in list(self._listeners):
+            listener(vm_name, status)
+
+    def start(self, vm_name: str, config: dict = None, mac_address: str = None,
+              disk_path: str = None) -> bool:
+        """Simulate starting a VM; returns True if it resumed from saved state"""
+        with self._lock:
+            if vm_name in self.running:
+                return False
+            self.running.add(vm_name)
+            resumed = vm_name in self.saved
+            self.saved.discard(vm_name)
+        self._emit(vm_name, "running")
+        return resumed
+
+    def stop(self, vm_name: str, force: bool = False):
+        """Simulate stopping a VM"""
+        with self._lock:
+            if vm_name not in self.running:
+                return
+            self.running.discard(vm_name)
+        self._emit(vm_name, "stopped")
+
+    def undefine(self, vm_name: str):
+        """Simulate removing a VM"""
+        self.stop(vm_name, force=True)
+        self.saved.discard(vm_name)
+
+    def save(self, vm_name: str):
+        """Simulate saving a VM's memory state and stopping it"""
+        with self._lock:
+            if vm_name not in self.running:
+                raise RuntimeError(f"VM '{vm_name}' is not running")
+            self.running.discard(vm_name)
+            self.saved.add(vm_name)
+        self._emit(vm_name, "suspended")
+
+    def has_saved_state(self, vm_name: str) -> bool:
+        """Check if a simulated VM has saved state"""
+        return vm_name in self.saved
+
+    def discard_saved_state(self, vm_name: str):
+        """Throw away a simulated VM's saved state"""
+        self.saved.discard(vm_name)
+
+    def is_running(self, vm_name: str) -> bool:
+        """Check if a simulated VM is running"""
+        return vm_name in self.running
+
+    def collect_stats(self) -> Dict[str, dict]:
+        """Make up plausible, steadily increasing counters for running VMs"""
+        now = time.monotonic()
+        stats = {}
+        with self._lock:
+            for vm_name in self.running:
+                counters = self._counters.setdefault(vm_name, {
+                    "time": now, "cpu_time_ns": 0, "vcpus": 2,
+                    "memory_kb": random.randint(1024, 1800) * 1024,
+                    "disk_read_bytes": 0, "disk_write_bytes": 0,
+                    "net_rx_bytes": 0, "net_tx_bytes": 0
+                })
+                elapsed = now - counters["time"]
+                counters["time"] = now
+                counters["cpu_time_ns"] += int(elapsed * 1e9 * counters["vcpus"] *
+                                               random.uniform(0.05, 0.6))
+                counters["memory_kb"] = max(512 * 1024, counters["memory_kb"] +
+                                            random.randint(-20, 20) * 1024)
+                for key, rate in (("disk_read_bytes", 2e6), ("disk_write_bytes", 1e6),
+                                  ("net_rx_bytes", 5e5), ("net_tx_bytes", 1e5)):
+                    counters[key] += int(elapsed * rate * random.random())
+                stats[vm_name] = {k: v for k, v in counters.items() if k != "time"}
+            for vm_name in list(self._counters):
+                if vm_name not in self.running:
+                    del self._counters[vm_name]
+        return stats
+
+    def list_states(self) -> Optional[Dict[str, str]]:
+        """Simulated state only exists in the registry, so there is nothing to reconcile"""
+        return None
+
+    def subscribe_events(self, callback: Callable[[str, str], None]) -> Callable[[], None]:
+        """Register for (vm_name, status) lifecycle events; returns an unsubscribe function"""
+        self._listeners.append(callback)
+
+        def unsubscribe():
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+        return unsubscribe
+
+    def close(self):
+        """Nothing to release"""
+        self._listeners.clear()
@@ -0,0 +1,94 @@
+"""
+VM State Tracker
+Keeps VMManager's status fields in sync with hypervisor lifecycle events
+"""
+
+from typing import Callable
+
+
+class VMStateTracker:
+    """Applies hypervisor lifecycle events to the VM registry
+
+    The tracker subscribes to the engine's event stream (libvirt domain
+    events in real mode, synthetic events in simulation mode). Each event
+    that changes a VM's status is written to the registry and passed on to
+    subscribers as (vm_name, old_status, new_status).
+    """
+
+    def __init__(self, vm_manager):
+        self.vm_manager = vm_manager
+        self.event_driven = False
+        self._subscribers = []
+        self._unsubscribe_engine = None
+
+    def start(self) -> bool:
+        """Subscribe to engine events and reconcile current state"""
+        engine = self.vm_manager.engine
+        try:
+            self._unsubscribe_engine = engine.subscribe_events(self.handle_event)
+            self.event_driven = True
+        except Exception as e:
+            print(f"⚠️  Lifecycle events unavailable, status will follow commands: {e}")
+            self.event_driven = False
+
+        self.reconcile()
+        return self.event_driven
+
+    def stop(self):
+        """Stop listening for engine events"""
+        if self._unsubscribe_engine is not None:
+            try:
+                self._unsubscribe_engine()
+            except Exception as e:
+                print(f"Error stopping state tracker: {e}")
+            self._unsubscribe_engine = None
+        self.event_driven = False
+
+    def reconcile(self):
+        """Bring every registry status in line with the hypervisor in one query"""
+        try:
+            states = self.vm_manager.engine.list_states()
+        except Exception as e:
+            print(f"Error reading hypervisor state: {e}")
+            return
+        if states is None:
+            return
+
+        manager = self.vm_manager
+        with manager.batch():
+            for vm_name in list(manager.vms):
+                domain_name = manager.domain_name(vm_name)
+                status = states.get(domain_name, "stopped")
+                # Queued starts have no domain running yet
+                if status == "stopped" and manager.vms[vm_name].get("status") == "queued":
+                    continue
+                self.handle_event(domain_name, status)
+
+    def handle_event(self, domain_name: str, status: str):
+        """Apply a lifecycle event, notifying subscribers if the status changed"""
+        manager = self.vm_manager
+        with manager._lock:
+            vm_name = manager.vm_for_domain(domain_name)
+            if vm_name is None:
+                return
+            vm = manager.vms[vm_name]
+            old_status = vm.get("status")
+            if old_status == status:
+                return
+            manager._set_status(vm_name, status)
+
+        for callback in list(self._subscribers):
+            try:
+                callback(vm_name, old_status, status)
+            except Exception as e:
+                print(f"Error in state subscriber: {e}")
+
+    def subscribe(self, callback: Callable[[str, str, str], None]) -> Callable[[], None]:
+        """Register for (vm_name, old_status, new_status) changes; returns an unsubscribe function"""
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
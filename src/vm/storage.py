@@ -0,0 +1,324 @@
+"""
+VM Registry Storage Backends
+Pluggable persistence for VMManager's registry
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+from vm.journal import VMJournal
+
+
+def memory_gb(record: dict) -> float:
+    """Get a registry record's memory size in GB ("2GB" -> 2.0)"""
+    match = re.match(r"\s*([\d.]+)", str(record.get("memory", "")))
+    return float(match.group(1)) if match else 0.0
+
+
+def matches_filters(record: dict, status: str = None, os: str = None,
+                    min_memory: float = None, max_memory: float = None,
+                    pooled: bool = None) -> bool:
+    """Check a single registry entry against the query filters"""
+    if pooled is not None and bool(record.get("pooled")) != pooled:
+        return False
+    if status is not None and record.get("status") != status:
+        return False
+    if os is not None and record.get("os") != os:
+        return False
+    if min_memory is not None and memory_gb(record) < min_memory:
+        return False
+    if max_memory is not None and memory_gb(record) > max_memory:
+        return False
+    return True
+
+
+def query_records(vms: Dict[str, dict], status: str = None, os: str = None,
+                  min_memory: float = None, max_memory: float = None,
+                  limit: int = None, offset: int = 0, pooled: bool = None) -> List[dict]:
+    """Get a page of in-memory registry entries matching the filters, oldest first"""
+    matches = [
+        record for record in vms.values()
+        if matches_filters(record, status, os, min_memory, max_memory, pooled)
+    ]
+    matches.sort(key=lambda record: record.get("created_at", ""))
+
+    if limit is None:
+        return matches[offset:]
+    return matches[offset:offset + limit]
+
+
+def count_records(vms: Dict[str, dict], status: str = None, os: str = None,
+                  min_memory: float = None, max_memory: float = None,
+                  pooled: bool = None) -> int:
+    """Count in-memory registry entries matching the filters"""
+    return sum(
+        1 for record in vms.values()
+        if matches_filters(record, status, os, min_memory, max_memory, pooled)
+    )
+
+
+class StorageBackend:
+    """Base class for VM registry storage backends"""
+
+    def load(self) -> Dict[str, dict]:
+        """Load every VM entry"""
+        raise NotImplementedError
+
+    def put(self, vm_name: str, record: dict):
+        """Store a full VM entry"""
+        raise NotImplementedError
+
+    def update(self, vm_name: str, fields: dict):
+        """Store a partial update to a VM entry"""
+        raise NotImplementedError
+
+    def delete(self, vm_name: str):
+        """Remove a VM entry"""
+        raise NotImplementedError
+
+    def save_all(self, vms: Dict[str, dict]):
+        """Persist the complete registry"""
+        raise NotImplementedError
+
+    def write_batch(self, changes: List[tuple]):
+        """Persist a list of (op, vm_name, payload) changes together
+
+        op is "put" (payload is the full entry), "set" (payload holds the
+        changed fields) or "delete" (payload is None).
+        """
+        for op, vm_name, payload in changes:
+            if op == "put":
+                self.put(vm_name, payload)
+            elif op == "set":
+                self.update(vm_name, payload)
+            elif op == "delete":
+                self.delete(vm_name)
+
+    def needs_compaction(self) -> bool:
+        """Check if the backend wants a full save_all"""
+        return False
+
+    def query(self, vms: Dict[str, dict], status: str = None, os: str = None,
+              min_memory: float = None, max_memory: float = None,
+              limit: int = None, offset: int = 0, pooled: bool = None) -> List[dict]:
+        """Get a page of VM entries matching the filters
+
+        pooled=False leaves out warm pool instances (True keeps only them).
+        The default implementation scans the in-memory registry; backends
+        with their own indexes override it.
+        """
+        return query_records(vms, status, os, min_memory, max_memory, limit, offset, pooled)
+
+    def count(self, vms: Dict[str, dict], status: str = None, os: str = None,
+              min_memory: float = None, max_memory: float = None,
+              pooled: bool = None) -> int:
+        """Count VM entries matching the filters"""
+        return count_records(vms, status, os, min_memory, max_memory, pooled)
+
+    def close(self):
+        """Release any open resources"""
+        pass
+
+
+class JournalStorage(StorageBackend):
+    """JSON snapshot plus append-only journal (the default backend)"""
+
+    def __init__(self, snapshot_file: Path, journal_file: Path = None,
+                 compact_threshold: int = 1000):
+        self.journal = VMJournal(snapshot_file, journal_file, compact_threshold)
+
+    def load(self) -> Dict[str, dict]:
+        return self.journal.load()
+
+    def put(self, vm_name: str, record: dict):
+        self.journal.record_put(vm_name, record)
+
+    def update(self, vm_name: str, fields: dict):
+        self.journal.record_update(vm_name, fields)
+
+    def delete(self, vm_name: str):
+        self.journal.record_delete(vm_name)
+
+    def save_all(self, vms: Dict[str, dict]):
+        self.journal.compact(vms)
+
+    def write_batch(self, changes: List[tuple]):
+        self.journal.record_batch(changes)
+
+    def needs_compaction(self) -> bool:
+        return self.journal.needs_compaction()
+
+    def close(self):
+        self.journal.close()
+
+
+class SQLiteStorage(StorageBackend):
+    """SQLite registry with indexed queries
+
+    Each VM is one row: the full record as JSON plus indexed columns for
+    the fields scripts and the dashboard filter on.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS vms (
+        name TEXT PRIMARY KEY,
+        status TEXT,
+        os TEXT,
+        memory_gb REAL,
+        created_at TEXT,
+        record TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_vms_status ON vms (status, created_at);
+    CREATE INDEX IF NOT EXISTS idx_vms_os ON vms (os, created_at);
+    CREATE INDEX IF NOT EXISTS idx_vms_memory ON vms (memory_gb);
+    CREATE INDEX IF NOT EXISTS idx_vms_created_at ON vms (created_at);
+    """
+
+    def __init__(self, db_file: Path, legacy_snapshot: Path = None):
+        self.db_file = Path(db_file)
+        self.legacy_snapshot = Path(legacy_snapshot) if legacy_snapshot else None
+        self._lock = threading.Lock()
+
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _row(vm_name: str, record: dict) -> tuple:
+        """Build the column values for a VM entry"""
+        return (
+            vm_name,
+            record.get("status"),
+            record.get("os"),
+            memory_gb(record),
+            record.get("created_at"),
+            json.dumps(record, separators=(",", ":"))
+        )
+
+    def load(self) -> Dict[str, dict]:
+        with self._lock:
+            rows = self.conn.execute("SELECT name, record FROM vms").fetchall()
+
+        # Import an existing JSON registry the first time the database is used
+        if not rows and self.legacy_snapshot and self.legacy_snapshot.exists():
+            legacy = JournalStorage(self.legacy_snapshot).load()
+            if legacy:
+                print(f"📦 Importing {len(legacy)} VMs into SQLite registry")
+                self.save_all(legacy)
+                return legacy
+
+        return {name: json.loads(record) for name, record in rows}
+
+    def put(self, vm_name: str, record: dict):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO vms VALUES (?, ?, ?, ?, ?, ?)",
+                self._row(vm_name, record)
+            )
+
+    def update(self, vm_name: str, fields: dict):
+        with self._lock, self.conn:
+            self._update(vm_name, fields)
+
+    def _update(self, vm_name: str, fields: dict):
+        """Merge fields into a stored entry (caller holds the transaction)"""
+        row = self.conn.execute(
+            "SELECT record FROM vms WHERE name = ?", (vm_name,)
+        ).fetchone()
+        if row is None:
+            return
+        record = json.loads(row[0])
+        record.update(fields)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO vms VALUES (?, ?, ?, ?, ?, ?)",
+            self._row(vm_name, record)
+        )
+
+    def delete(self, vm_name: str):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM vms WHERE name = ?", (vm_name,))
+
+    def write_batch(self, changes: List[tuple]):
+        # One transaction, so the whole batch costs a single commit
+        with self._lock, self.conn:
+            for op, vm_name, payload in changes:
+                if op == "put":
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO vms VALUES (?, ?, ?, ?, ?, ?)",
+                        self._row(vm_name, payload)
+                    )
+                elif op == "set":
+                    self._update(vm_name, payload)
+                elif op == "delete":
+                    self.conn.execute("DELETE FROM vms WHERE name = ?", (vm_name,))
+
+    def save_all(self, vms: Dict[str, dict]):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM vms")
+            self.conn.executemany(
+                "INSERT INTO vms VALUES (?, ?, ?, ?, ?, ?)",
+                [self._row(name, record) for name, record in vms.items()]
+            )
+
+    @staticmethod
+    def _where(status, os, min_memory, max_memory, pooled) -> tuple:
+        """Build the WHERE clause for the query filters"""
+        clauses = []
+        params = []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if os is not None:
+            clauses.append("os = ?")
+            params.append(os)
+        if min_memory is not None:
+            clauses.append("memory_gb >= ?")
+            params.append(min_memory)
+        if max_memory is not None:
+            clauses.append("memory_gb <= ?")
+            params.append(max_memory)
+        if pooled is not None:
+            # Only warm pool instances carry the flag, so it isn't worth a column
+            clauses.append("COALESCE(json_extract(record, '$.pooled'), 0) = ?")
+            params.append(int(pooled))
+
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def query(self, vms: Dict[str, dict], status: str = None, os: str = None,
+              min_memory: float = None, max_memory: float = None,
+              limit: int = None, offset: int = 0, pooled: bool = None) -> List[dict]:
+        where, params = self._where(status, os, min_memory, max_memory, pooled)
+        sql = f"SELECT record FROM vms{where} ORDER BY created_at LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(record) for (record,) in rows]
+
+    def count(self, vms: Dict[str, dict], status: str = None, os: str = None,
+              min_memory: float = None, max_memory: float = None,
+              pooled: bool = None) -> int:
+        where, params = self._where(status, os, min_memory, max_memory, pooled)
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM vms{where}", params).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def create_storage(kind: str, data_dir: Path) -> StorageBackend:
+    """Create a storage backend by name ("json" or "sqlite")"""
+    data_dir = Path(data_dir)
+    if kind == "json":
+        return JournalStorage(data_dir / "config.json", data_dir / "config.journal")
+    if kind == "sqlite":
+        return SQLiteStorage(data_dir / "registry.db", legacy_snapshot=data_dir / "config.json")
+    raise ValueError(f"Unknown storage backend: {kind}")
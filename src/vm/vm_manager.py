@@ -3,97 +3,416 @@ Virtual Machine Manager
 Handles VM operations and state management
 """
 
-import json
+import atexit
+import copy
 import os
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 
-# Try to import libvirt, but don't fail if it's not available
-try:
-    import libvirt
-    LIBVIRT_AVAILABLE = True
-except ImportError:
-    LIBVIRT_AVAILABLE = False
+from os_templates.image_builder import DirectoryImageStore, ImageBuilder
+from os_templates.registry import TemplateRegistry
+from os_templates.schema import ValidationError, check_vm_config, deep_merge
+from utils.atomic_file import atomic_write_json, read_json
+from vm.artifact_store import ArtifactStore
+from vm.disk_provisioner import DiskProvisioner
+from vm.libvirt_backend import LIBVIRT_AVAILABLE, DEFAULT_URI, LibvirtEngine, generate_mac
+from vm.resources import ACTIVE_STATUSES, AdmissionError, ResourceAccountant
+from vm.simulation import SimulatedEngine
+from vm.state_tracker import VMStateTracker
+from vm.storage import StorageBackend, count_records, create_storage, query_records
+
+# libvirt is optional; without it VMs are simulated
+if not LIBVIRT_AVAILABLE:
     print("⚠️  libvirt not available - using simulation mode")
 
-from os_templates.nectaros import NectarOSTemplate
+
+class _RegistryLock:
+    """Reentrant lock that calls on_release each time its outermost holder lets go"""
+    
+    def __init__(self, on_release: Callable[[], None]):
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._on_release = on_release
+        
+    def __enter__(self):
+        self._lock.acquire()
+        self._depth += 1
+        return self
+        
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        released = self._depth == 0
+        self._lock.release()
+        if released:
+            self._on_release()
+        return False
 
 
 class VMManager:
     """Manages virtual machines and their operations"""
     
-    def __init__(self, data_dir: str = None):
+    # Default thread pool size for start_many / stop_many / delete_many
+    bulk_workers = 8
+    
+    # Size cap for cached template images no VM is using
+    image_cache_bytes = 50 * 1024 ** 3
+    
+    def __init__(self, data_dir: str = None, storage="json", flush_interval: float = None,
+                 uri: str = None):
         if data_dir is None:
             self.data_dir = Path.home() / ".multiverse"
         else:
             self.data_dir = Path(data_dir)
             
         self.vms_dir = self.data_dir / "vms"
+        self.images_dir = self.data_dir / "images"
         self.config_file = self.data_dir / "config.json"
+        self.journal_file = self.data_dir / "config.journal"
         
         # Ensure directories exist
         self.vms_dir.mkdir(parents=True, exist_ok=True)
         
+        # Registry storage backend ("json", "sqlite" or a StorageBackend)
+        if isinstance(storage, StorageBackend):
+            self.storage = storage
+        else:
+            self.storage = create_storage(storage, self.data_dir)
+        
         # Load existing VMs
         self.vms = self.load_vms()
         
-        # Available templates
-        self.templates = {
-            "nectaros": NectarOSTemplate()
+        # Hypervisor domains that kept their name after their VM was renamed
+        self._domain_aliases = {
+            vm["domain"]: name for name, vm in self.vms.items() if "domain" in vm
         }
         
+        # Pending registry changes: VM name -> changed field names, or None
+        # when the whole entry (or its deletion) must be written
+        self._lock = _RegistryLock(self._deliver_changes)
+        self._pending = {}
+        self._batch_depth = 0
+        
+        # Change feed: VMs touched since the last diff went to subscribers
+        self._subscribers = []
+        self._unpublished = set()
+        self._published = set(self.vms)
+        self._outbox = deque()
+        self._delivery_lock = threading.Lock()
+        
+        # None writes every change through; otherwise the maximum number of
+        # seconds a change may wait before a background flush persists it
+        self.flush_interval = flush_interval
+        self._flush_timer = None
+        if flush_interval is not None:
+            atexit.register(self.flush)
+        
+        # Available templates, discovered lazily and imported on first use
+        self.templates = TemplateRegistry(
+            template_dirs=[self.data_dir / "templates"],
+            manifest_file=self.data_dir / "templates_manifest.json"
+        )
+        
+        # Thin per-VM disks layered over one base image per template
+        self.disk_provisioner = DiskProvisioner(self.images_dir)
+        
+        # Template images built as cached layers (rebuilt only on change)
+        self.image_builder = ImageBuilder(DirectoryImageStore(self.images_dir / "builds"))
+        
+        # Content-addressed base images shared by VM overlays
+        self.artifacts = ArtifactStore(self.data_dir / "blobs", self.image_cache_bytes)
+        self._image_lock = threading.Lock()
+        
+        # Hypervisor connection (test:///default works without KVM)
+        self.uri = uri or os.environ.get("MULTIVERSE_LIBVIRT_URI", DEFAULT_URI)
+        self.engine = None
+        
         # Check if we're in simulation mode
         self.simulation_mode = not LIBVIRT_AVAILABLE
+        if not self.simulation_mode:
+            try:
+                self.engine = LibvirtEngine(self.uri)
+            except Exception as e:
+                print(f"⚠️  Could not connect to {self.uri}: {e}")
+                self.simulation_mode = True
         if self.simulation_mode:
             print("🎮 Running in simulation mode - VMs will be simulated")
+            running = [self.domain_name(name) for name, vm in self.vms.items()
+                       if vm.get("status") == "running"]
+            saved = [self.domain_name(name) for name, vm in self.vms.items()
+                     if vm.get("status") == "suspended"]
+            self.engine = SimulatedEngine(running, saved)
+            
+        # Host admission control for creating and starting VMs
+        self.resources = ResourceAccountant(self, enabled=not self.simulation_mode)
+            
+        # VM status follows hypervisor lifecycle events rather than commands
+        self.state_tracker = VMStateTracker(self)
+        self.state_tracker.start()
         
     def load_vms(self) -> Dict[str, dict]:
         """Load existing VMs from storage"""
-        vms = {}
+        return self.storage.load()
         
-        if self.config_file.exists():
+    def save_vms(self):
+        """Save the complete VM registry to storage"""
+        with self._lock:
             try:
-                with open(self.config_file, 'r') as f:
-                    vms = json.load(f)
-            except json.JSONDecodeError:
-                print("Warning: Could not load VM configuration")
-                
-        return vms
+                self.storage.save_all(self.vms)
+                self._pending.clear()
+            except Exception as e:
+                print(f"Error saving VMs: {e}")
+            
+    @contextmanager
+    def batch(self):
+        """Collapse every registry change made inside the block into one write
         
-    def save_vms(self):
-        """Save VMs to storage"""
+        Usage:
+            with manager.batch():
+                for name in names:
+                    manager.start_vm(name)
+        """
+        with self._lock:
+            self._batch_depth += 1
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.vms, f, indent=2)
-        except Exception as e:
-            print(f"Error saving VMs: {e}")
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+                    self._publish_changes()
+                    
+    def subscribe(self, callback: Callable[[dict], None]) -> Callable[[], None]:
+        """Call back with a diff of the registry whenever VMs are added, changed or removed
+        
+        Each diff is {"added": {name: vm}, "changed": {name: vm}, "removed": [name]}
+        with copies of the affected registry entries; changes made inside
+        batch() arrive as one diff. Callbacks run on the thread that made
+        the change once it has released the registry lock, so they may
+        call back into the manager. Returns an unsubscribe function.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+            
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+                    
+        return unsubscribe
+        
+    def _publish_changes(self):
+        """Queue a diff of the VMs touched since the last one for subscribers"""
+        with self._lock:
+            if not self._unpublished:
+                return
+            diff = {"added": {}, "changed": {}, "removed": []}
+            for vm_name in self._unpublished:
+                if vm_name in self.vms:
+                    kind = "changed" if vm_name in self._published else "added"
+                    diff[kind][vm_name] = dict(self.vms[vm_name])
+                    self._published.add(vm_name)
+                elif vm_name in self._published:
+                    diff["removed"].append(vm_name)
+                    self._published.discard(vm_name)
+            self._unpublished.clear()
+            
+            # Sent once the registry lock is released (see _deliver_changes)
+            if any(diff.values()):
+                self._outbox.append(diff)
+                
+    def _deliver_changes(self):
+        """Send queued diffs to subscribers, in order, outside the registry lock"""
+        while self._outbox:
+            # Whoever is already delivering also sends the diffs queued meanwhile
+            if not self._delivery_lock.acquire(blocking=False):
+                return
+            try:
+                while self._outbox:
+                    diff = self._outbox.popleft()
+                    for callback in list(self._subscribers):
+                        try:
+                            callback(diff)
+                        except Exception as e:
+                            print(f"Error in VM change subscriber: {e}")
+            finally:
+                self._delivery_lock.release()
+                    
+    def flush(self):
+        """Write all pending registry changes to storage in one durable write"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+                
+            if not self._pending:
+                return
+                
+            changes = []
+            for vm_name, fields in self._pending.items():
+                if vm_name not in self.vms:
+                    changes.append(("delete", vm_name, None))
+                elif fields is None:
+                    changes.append(("put", vm_name, dict(self.vms[vm_name])))
+                else:
+                    record = self.vms[vm_name]
+                    changes.append(("set", vm_name, {f: record.get(f) for f in fields}))
+            self._pending.clear()
+            
+            try:
+                self.storage.write_batch(changes)
+                if self.storage.needs_compaction():
+                    self.storage.save_all(self.vms)
+            except Exception as e:
+                print(f"Error saving VMs: {e}")
+                
+    def _record_change(self, vm_name: str, fields: dict = None):
+        """Queue a change to a single VM entry and persist it per the flush policy"""
+        with self._lock:
+            self._unpublished.add(vm_name)
+            if fields is None or vm_name not in self.vms:
+                self._pending[vm_name] = None
+            elif vm_name not in self._pending:
+                self._pending[vm_name] = set(fields)
+            elif self._pending[vm_name] is not None:
+                self._pending[vm_name].update(fields)
+                
+            if self._batch_depth > 0:
+                return
+            if self.flush_interval is None:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+            self._publish_changes()
+            
+    def _set_status(self, vm_name: str, status: str):
+        """Update a VM's status and record just the changed fields"""
+        fields = {
+            "status": status,
+            "last_modified": datetime.now().isoformat()
+        }
+        with self._lock:
+            old_status = self.vms[vm_name].get("status")
+            self.vms[vm_name].update(fields)
+            self._record_change(vm_name, fields)
+            
+        # The status now accounts for any start reservation
+        self.resources.release(vm_name)
+        
+        # A VM going down may make room for queued starts
+        if old_status in ACTIVE_STATUSES and status not in ACTIVE_STATUSES:
+            self.resources.resources_freed()
             
     def create_vm(self, vm_config: dict) -> bool:
         """Create a new virtual machine"""
         try:
-            vm_name = vm_config["name"]
+            self.validate_vm_config(vm_config)
+        except ValidationError as e:
+            print(f"Invalid VM configuration: {e}")
+            return False
             
-            # Check if VM already exists
-            if vm_name in self.vms:
-                print(f"VM '{vm_name}' already exists")
-                return False
-                
-            # Create VM directory
-            vm_dir = self.vms_dir / vm_name
-            vm_dir.mkdir(exist_ok=True)
+        reason = self.resources.check_create([vm_config])
+        if reason:
+            print(f"🚫 Not enough host resources to create {vm_config['name']}: {reason}")
+            return False
             
-            # Add metadata
-            vm_config["created_at"] = datetime.now().isoformat()
-            vm_config["status"] = "stopped"
-            vm_config["last_modified"] = datetime.now().isoformat()
+        try:
+            self._create_vm(vm_config)
+            print(f"✅ Created VM: {vm_config['name']}")
+            return True
+            
+        except Exception as e:
+            print(f"Error creating VM: {e}")
+            return False
+            
+    def create_many(self, vm_configs: List[dict], max_workers: int = None) -> Dict[str, dict]:
+        """Create several VMs, validating every config before creating any
+        
+        If any config is invalid nothing is created and each entry of the
+        result says why. Otherwise the VMs are created concurrently and
+        registered in one registry write, like the other bulk operations.
+        """
+        errors = {}
+        keys = []
+        names = set()
+        for i, vm_config in enumerate(vm_configs):
+            name = vm_config.get("name") if isinstance(vm_config, dict) else None
+            key = name if isinstance(name, str) and name not in names else f"#{i}"
+            keys.append(key)
+            try:
+                self.validate_vm_config(vm_config)
+            except ValidationError as e:
+                errors[key] = str(e)
+                continue
+            if name in names:
+                errors[key] = f"config.name: '{name}' appears more than once"
+            names.add(name)
+            
+        if errors:
+            print(f"📋 Bulk create: rejected, {len(errors)} invalid configs")
+            return {
+                key: {"success": False,
+                      "error": errors.get(key, "Not created: other configs in the batch are invalid")}
+                for key in keys
+            }
+            
+        reason = self.resources.check_create(vm_configs)
+        if reason:
+            print(f"📋 Bulk create: rejected, not enough host resources: {reason}")
+            return {key: {"success": False, "error": f"Not enough host resources: {reason}"}
+                    for key in keys}
+            
+        configs = {vm_config["name"]: vm_config for vm_config in vm_configs}
+        return self._run_many("create", lambda name: self._create_vm(configs[name]),
+                              list(configs), max_workers)
+        
+    def validate_vm_config(self, vm_config: dict):
+        """Raise ValidationError if a VM config can't be created as given"""
+        errors = check_vm_config(vm_config)
+        if not errors and vm_config["name"] in self.vms:
+            errors.append(f"config.name: VM '{vm_config['name']}' already exists")
+        if errors:
+            raise ValidationError(errors)
+            
+    def _create_vm(self, vm_config: dict):
+        """Create a new virtual machine from a validated config, raising on failure"""
+        vm_name = vm_config["name"]
+        if vm_name in self.vms:
+            raise ValueError(f"VM '{vm_name}' already exists")
+            
+        # Create VM directory
+        vm_dir = self.vms_dir / vm_name
+        vm_dir.mkdir(exist_ok=True)
+        
+        # Add metadata
+        vm_config.setdefault("mac_address", generate_mac())
+        vm_config["created_at"] = datetime.now().isoformat()
+        vm_config["status"] = "stopped"
+        vm_config["last_modified"] = datetime.now().isoformat()
+        
+        try:
+            # Provision a copy-on-write disk
+            vm_config["disk_path"] = str(self._provision_disk(vm_config, vm_dir))
             
             # Save VM configuration
             vm_config_file = vm_dir / "config.json"
-            with open(vm_config_file, 'w') as f:
-                json.dump(vm_config, f, indent=2)
-                
-            # Add to VM list
+            atomic_write_json(vm_config_file, vm_config)
+        except Exception:
+            # Leave no half-created VM directory or base image reference behind
+            shutil.rmtree(vm_dir, ignore_errors=True)
+            self.artifacts.release(vm_name)
+            raise
+            
+        # Add to VM list
+        with self._lock:
             self.vms[vm_name] = {
                 "name": vm_name,
                 "os": vm_config.get("os_template", "Unknown"),
@@ -103,42 +422,146 @@ class VMManager:
                 "created_at": vm_config["created_at"],
                 "path": str(vm_dir)
             }
+            if vm_config.get("pooled"):
+                self.vms[vm_name]["pooled"] = True
+            self._record_change(vm_name)
             
-            self.save_vms()
-            print(f"✅ Created VM: {vm_name}")
-            return True
+    def _provision_disk(self, vm_config: dict, vm_dir: Path) -> Path:
+        """Create a VM's disk as a thin overlay on its template's base image"""
+        disk_path = vm_dir / "disk.qcow2"
+        size_gb = int(vm_config.get("storage", 20))
+        
+        template_key = vm_config.get("os_template", "").lower()
+        template = self.get_template(template_key)
+        if template is None:
+            self.disk_provisioner.create_disk(disk_path, size_gb)
+            return disk_path
             
-        except Exception as e:
-            print(f"Error creating VM: {e}")
-            return False
+        # Each distinct template build gets its own base image
+        image_key = template_key
+        build_key = None
+        if hasattr(template, "get_build_layers"):
+            build_key = self.image_builder.build(template)
+        if build_key:
+            vm_config["image_build"] = build_key
+            image_key = f"{template_key}-{build_key[:12]}"
+            
+        # Reuse the cached base image, building it only on a cache miss
+        vm_name = vm_config["name"]
+        with self._image_lock:
+            digest = self.artifacts.resolve(image_key)
+            if digest is None or not self.artifacts.add_ref(digest, vm_name):
+                # The built layer tree is written into the new base image
+                seed = None
+                if build_key:
+                    seed = self.image_builder.store.export(
+                        build_key, self.disk_provisioner.images_dir / f"{image_key}.tar"
+                    )
+                try:
+                    built_path = self.disk_provisioner.ensure_base_image(
+                        image_key, template.default_config.get("storage", size_gb), seed=seed
+                    )
+                finally:
+                    if seed is not None:
+                        seed.unlink(missing_ok=True)
+                digest = self.artifacts.put_file(built_path, tag=image_key, owner=vm_name)
+            base_path = self.artifacts.get(digest)
             
-    def start_vm(self, vm_name: str) -> bool:
-        """Start a virtual machine"""
+        vm_config["base_image"] = str(base_path)
+        vm_config["base_blob"] = digest
+        self.disk_provisioner.create_overlay(base_path, disk_path, size_gb)
+        return disk_path
+        
+    def start_vm(self, vm_name: str, admitted: bool = False) -> bool:
+        """Start a virtual machine
+        
+        admitted=True means the caller already holds a reservation for it
+        from resources.reserve(), which the start takes over.
+        """
         if vm_name not in self.vms:
             print(f"VM '{vm_name}' not found")
+            if admitted:
+                self.resources.release(vm_name)
             return False
             
         try:
             if self.simulation_mode:
-                # In simulation mode, just update status
                 print(f"🎮 Simulating VM start: {vm_name}")
-                self.vms[vm_name]["status"] = "running"
-                self.vms[vm_name]["last_modified"] = datetime.now().isoformat()
-                self.save_vms()
-                print(f"🚀 Started VM (simulation): {vm_name}")
-                return True
+            resumed = self._start_vm(vm_name, admitted)
+            
+            if self.vms[vm_name].get("status") == "queued":
+                print(f"⏳ Queued VM start until host resources free up: {vm_name}")
             else:
-                # Real VM start logic would go here
-                self.vms[vm_name]["status"] = "running"
-                self.vms[vm_name]["last_modified"] = datetime.now().isoformat()
-                self.save_vms()
-                print(f"🚀 Started VM: {vm_name}")
-                return True
+                action = "Resumed" if resumed else "Started"
+                suffix = " (simulation)" if self.simulation_mode else ""
+                print(f"🚀 {action} VM{suffix}: {vm_name}")
+            return True
             
         except Exception as e:
             print(f"Error starting VM: {e}")
             return False
             
+    def _start_vm(self, vm_name: str, admitted: bool = False) -> bool:
+        """Start a virtual machine, raising on failure
+        
+        Returns True if the VM resumed from saved memory state rather than
+        booting. A start the host can't take raises AdmissionError, or with
+        queue_starts enabled leaves the VM "queued" and returns False.
+        """
+        if vm_name not in self.vms:
+            if admitted:
+                self.resources.release(vm_name)
+            raise KeyError(f"VM '{vm_name}' not found")
+            
+        status = self.vms[vm_name].get("status")
+        was_suspended = status == "suspended"
+        
+        # Already holding host resources (it started in the meantime)
+        if status in ACTIVE_STATUSES and admitted:
+            self.resources.release(vm_name)
+            
+        # Admission control: reject, or queue until resources free up
+        if status not in ACTIVE_STATUSES and not admitted:
+            reason = self.resources.reserve(vm_name)
+            if reason:
+                if not self.resources.queue_starts:
+                    raise AdmissionError(f"Not enough host resources to start '{vm_name}': {reason}")
+                self.resources.enqueue(vm_name)
+                if status != "queued":
+                    self._set_status(vm_name, "queued")
+                return False
+                
+        # The reservation is held until the VM's next status change, which
+        # may be a lifecycle event arriving after this returns
+        try:
+            return self._boot_vm(vm_name, was_suspended)
+        except Exception:
+            self.resources.release(vm_name)
+            raise
+            
+    def _boot_vm(self, vm_name: str, was_suspended: bool) -> bool:
+        """Start or resume a VM's domain once it has been admitted"""
+        with self._lock:
+            if self.vms[vm_name].pop("layer_frozen", None):
+                self._record_change(vm_name)
+        domain_name = self.domain_name(vm_name)
+        if self.simulation_mode:
+            resumed = self.engine.start(domain_name)
+        else:
+            vm_config = self.get_vm_config(vm_name)
+            resumed = self.engine.start(domain_name, self.get_domain_config(vm_name),
+                                        mac_address=vm_config.get("mac_address"),
+                                        disk_path=vm_config.get("disk_path"))
+            
+        # Saved state is consumed by the resume
+        if was_suspended:
+            self._clear_saved_state(vm_name)
+            
+        # Without lifecycle events, trust the command
+        if not self.state_tracker.event_driven:
+            self._set_status(vm_name, "running")
+        return resumed
+            
     def stop_vm(self, vm_name: str) -> bool:
         """Stop a virtual machine"""
         if vm_name not in self.vms:
@@ -149,10 +572,7 @@ class VMManager:
             if self.simulation_mode:
                 print(f"🎮 Simulating VM stop: {vm_name}")
                 
-            # Update status
-            self.vms[vm_name]["status"] = "stopped"
-            self.vms[vm_name]["last_modified"] = datetime.now().isoformat()
-            self.save_vms()
+            self._stop_vm(vm_name)
             
             print(f"⏹️ Stopped VM: {vm_name}")
             return True
@@ -161,6 +581,177 @@ class VMManager:
             print(f"Error stopping VM: {e}")
             return False
             
+    def _stop_vm(self, vm_name: str):
+        """Stop a virtual machine, raising on failure"""
+        if vm_name not in self.vms:
+            raise KeyError(f"VM '{vm_name}' not found")
+            
+        # Stopping a queued VM just cancels its pending start
+        if self.vms[vm_name].get("status") == "queued":
+            self.resources.forget(vm_name)
+            self._set_status(vm_name, "stopped")
+            return
+            
+        # Stopping a suspended VM throws its saved memory state away
+        if self.vms[vm_name].get("status") == "suspended":
+            self._discard_saved_state(vm_name)
+            return
+            
+        self.engine.stop(self.domain_name(vm_name))
+        
+        # Without lifecycle events, trust the command
+        if not self.state_tracker.event_driven:
+            self._set_status(vm_name, "stopped")
+            
+    def suspend_vm(self, vm_name: str) -> bool:
+        """Save a running VM's memory state to disk so the next start resumes it"""
+        if vm_name not in self.vms:
+            print(f"VM '{vm_name}' not found")
+            return False
+            
+        try:
+            self.engine.save(self.domain_name(vm_name))
+            
+            vm_config = self.get_vm_config(vm_name)
+            vm_config["saved_state"] = {"saved_at": datetime.now().isoformat()}
+            self._write_vm_config(vm_name, vm_config)
+            
+            # Without lifecycle events, trust the command
+            if not self.state_tracker.event_driven:
+                self._set_status(vm_name, "suspended")
+                
+            print(f"💾 Suspended VM: {vm_name}")
+            return True
+            
+        except Exception as e:
+            print(f"Error suspending VM: {e}")
+            return False
+            
+    def discard_saved_state(self, vm_name: str) -> bool:
+        """Throw away a suspended VM's memory state so it cold boots next time"""
+        if vm_name not in self.vms:
+            print(f"VM '{vm_name}' not found")
+            return False
+            
+        try:
+            self._discard_saved_state(vm_name)
+            print(f"🧹 Discarded saved state: {vm_name}")
+            return True
+            
+        except Exception as e:
+            print(f"Error discarding saved state: {e}")
+            return False
+            
+    def _discard_saved_state(self, vm_name: str):
+        """Drop a VM's saved memory state, raising on failure"""
+        self.engine.discard_saved_state(self.domain_name(vm_name))
+        self._clear_saved_state(vm_name)
+        
+        # Discarding state emits no lifecycle event
+        if self.vms[vm_name].get("status") == "suspended":
+            self._set_status(vm_name, "stopped")
+            
+    def _clear_saved_state(self, vm_name: str):
+        """Remove the saved-state marker from a VM's config.json"""
+        vm_config = self.get_vm_config(vm_name)
+        if vm_config.pop("saved_state", None) is not None:
+            self._write_vm_config(vm_name, vm_config)
+            
+    def _write_vm_config(self, vm_name: str, vm_config: dict):
+        """Atomically replace a VM's config.json"""
+        atomic_write_json(Path(self.vms[vm_name]["path"]) / "config.json", vm_config)
+        
+    def create_snapshot(self, vm_name: str, snapshot_name: str, description: str = "") -> bool:
+        """Take a named snapshot of a stopped or suspended VM's disk"""
+        if vm_name not in self.vms:
+            print(f"VM '{vm_name}' not found")
+            return False
+            
+        try:
+            self._require_offline(vm_name, "taking a snapshot")
+            vm_config = self.get_vm_config(vm_name)
+            snapshots = vm_config.setdefault("snapshots", [])
+            if any(snapshot["name"] == snapshot_name for snapshot in snapshots):
+                print(f"Snapshot '{snapshot_name}' already exists for {vm_name}")
+                return False
+                
+            self.disk_provisioner.create_snapshot(vm_config["disk_path"], snapshot_name)
+            snapshots.append({
+                "name": snapshot_name,
+                "created_at": datetime.now().isoformat(),
+                "description": description
+            })
+            self._write_vm_config(vm_name, vm_config)
+            
+            print(f"📸 Created snapshot '{snapshot_name}' of {vm_name}")
+            return True
+            
+        except Exception as e:
+            print(f"Error creating snapshot: {e}")
+            return False
+            
+    def list_snapshots(self, vm_name: str) -> List[dict]:
+        """Get a VM's disk snapshots, oldest first"""
+        return self.get_vm_config(vm_name).get("snapshots", [])
+        
+    def revert_snapshot(self, vm_name: str, snapshot_name: str) -> bool:
+        """Roll a stopped or suspended VM's disk back to a named snapshot
+        
+        Saved memory state no longer matches the reverted disk, so it is
+        discarded and the VM cold boots on its next start.
+        """
+        if vm_name not in self.vms:
+            print(f"VM '{vm_name}' not found")
+            return False
+            
+        try:
+            self._require_offline(vm_name, "reverting a snapshot")
+            vm_config = self.get_vm_config(vm_name)
+            if not any(s["name"] == snapshot_name for s in vm_config.get("snapshots", [])):
+                print(f"Snapshot '{snapshot_name}' not found for {vm_name}")
+                return False
+                
+            if self.vms[vm_name].get("status") == "suspended":
+                self._discard_saved_state(vm_name)
+            self.disk_provisioner.revert_snapshot(vm_config["disk_path"], snapshot_name)
+            
+            print(f"⏪ Reverted {vm_name} to snapshot '{snapshot_name}'")
+            return True
+            
+        except Exception as e:
+            print(f"Error reverting snapshot: {e}")
+            return False
+            
+    def delete_snapshot(self, vm_name: str, snapshot_name: str) -> bool:
+        """Remove a named snapshot from a VM's disk"""
+        if vm_name not in self.vms:
+            print(f"VM '{vm_name}' not found")
+            return False
+            
+        try:
+            vm_config = self.get_vm_config(vm_name)
+            snapshots = vm_config.get("snapshots", [])
+            remaining = [s for s in snapshots if s["name"] != snapshot_name]
+            if len(remaining) == len(snapshots):
+                print(f"Snapshot '{snapshot_name}' not found for {vm_name}")
+                return False
+                
+            self.disk_provisioner.delete_snapshot(vm_config["disk_path"], snapshot_name)
+            vm_config["snapshots"] = remaining
+            self._write_vm_config(vm_name, vm_config)
+            
+            print(f"🗑️ Deleted snapshot '{snapshot_name}' of {vm_name}")
+            return True
+            
+        except Exception as e:
+            print(f"Error deleting snapshot: {e}")
+            return False
+            
+    def _require_offline(self, vm_name: str, action: str):
+        """Raise if a VM's disk is in use by a running domain"""
+        if self.vms[vm_name].get("status") in ("running", "paused"):
+            raise RuntimeError(f"Stop or suspend '{vm_name}' before {action}")
+            
     def delete_vm(self, vm_name: str) -> bool:
         """Delete a virtual machine"""
         if vm_name not in self.vms:
@@ -168,15 +759,7 @@ class VMManager:
             return False
             
         try:
-            # Remove VM directory
-            vm_dir = Path(self.vms[vm_name]["path"])
-            if vm_dir.exists():
-                import shutil
-                shutil.rmtree(vm_dir)
-                
-            # Remove from VM list
-            del self.vms[vm_name]
-            self.save_vms()
+            self._delete_vm(vm_name)
             
             print(f"🗑️ Deleted VM: {vm_name}")
             return True
@@ -185,13 +768,316 @@ class VMManager:
             print(f"Error deleting VM: {e}")
             return False
             
+    def _delete_vm(self, vm_name: str):
+        """Delete a virtual machine, raising on failure"""
+        if vm_name not in self.vms:
+            raise KeyError(f"VM '{vm_name}' not found")
+            
+        domain_name = self.domain_name(vm_name)
+        self.engine.undefine(domain_name)
+            
+        # Remove VM directory
+        vm_dir = Path(self.vms[vm_name]["path"])
+        if vm_dir.exists():
+            shutil.rmtree(vm_dir)
+            
+        # Unreferenced base images become eligible for eviction, and
+        # frozen layers no other disk reads through are removed
+        self.artifacts.release(vm_name)
+        self.disk_provisioner.release_layers(vm_name)
+            
+        # A deleted VM no longer holds host resources
+        self.resources.forget(vm_name)
+        self.resources.resources_freed()
+        
+        # Remove from VM list
+        with self._lock:
+            self.vms.pop(vm_name, None)
+            self._domain_aliases.pop(domain_name, None)
+            self._record_change(vm_name)
+            
+    def rename_vm(self, old_name: str, new_name: str) -> bool:
+        """Rename a virtual machine, moving its directory
+        
+        A running VM keeps its hypervisor domain under the old name until it
+        is next stopped and undefined; domain_name() tracks the mapping.
+        """
+        try:
+            with self._lock:
+                if old_name not in self.vms:
+                    print(f"VM '{old_name}' not found")
+                    return False
+                if new_name in self.vms:
+                    print(f"VM '{new_name}' already exists")
+                    return False
+                    
+                vm = self.vms[old_name]
+                domain_name = self.domain_name(old_name)
+                new_dir = self.vms_dir / new_name
+                os.rename(vm["path"], new_dir)
+                
+                vm_config = read_json(new_dir / "config.json", default={})
+                vm_config["name"] = new_name
+                if vm_config.get("disk_path"):
+                    vm_config["disk_path"] = str(new_dir / Path(vm_config["disk_path"]).name)
+                atomic_write_json(new_dir / "config.json", vm_config)
+                
+                del self.vms[old_name]
+                vm["name"] = new_name
+                vm["path"] = str(new_dir)
+                
+                # Running domains can't be renamed, so remember the old name
+                self._domain_aliases.pop(domain_name, None)
+                vm.pop("domain", None)
+                if domain_name != new_name:
+                    if self.engine.is_running(domain_name):
+                        vm["domain"] = domain_name
+                        self._domain_aliases[domain_name] = new_name
+                    else:
+                        self.engine.undefine(domain_name)
+                        
+                self.vms[new_name] = vm
+                self.artifacts.rename_owner(old_name, new_name)
+                self.disk_provisioner.rename_layer_owner(old_name, new_name)
+                self.resources.forget(old_name)
+                if vm.get("status") == "queued":
+                    self.resources.enqueue(new_name)
+                with self.batch():
+                    self._record_change(old_name)
+                    self._record_change(new_name)
+                
+            print(f"✏️ Renamed VM: {old_name} -> {new_name}")
+            return True
+            
+        except Exception as e:
+            print(f"Error renaming VM: {e}")
+            return False
+            
+    def clone_vm(self, source_name: str, new_name: str, linked: bool = True) -> bool:
+        """Create a new VM from a stopped VM's disk and configuration
+        
+        A linked clone gets an empty copy-on-write overlay on a frozen copy
+        of the source's disk, so it costs almost no space or time. The frozen
+        layer is reused for further clones until the source is started again.
+        A full clone copies the disk instead.
+        """
+        vm_dir = None
+        try:
+            with self._lock:
+                if source_name not in self.vms:
+                    print(f"VM '{source_name}' not found")
+                    return False
+                if new_name in self.vms:
+                    print(f"VM '{new_name}' already exists")
+                    return False
+                source = self.vms[source_name]
+                if source.get("status") != "stopped":
+                    print(f"Stop '{source_name}' before cloning it")
+                    return False
+                    
+            source_config = self.get_vm_config(source_name)
+            source_disk = source_config["disk_path"]
+            
+            vm_dir = self.vms_dir / new_name
+            vm_dir.mkdir()
+            disk_path = vm_dir / Path(source_disk).name
+            
+            vm_config = copy.deepcopy(source_config)
+            for key in ("snapshots", "saved_state", "frozen_layer", "pooled"):
+                vm_config.pop(key, None)
+            vm_config["name"] = new_name
+            vm_config["mac_address"] = generate_mac()
+            vm_config["created_at"] = datetime.now().isoformat()
+            vm_config["status"] = "stopped"
+            vm_config["last_modified"] = vm_config["created_at"]
+            vm_config["disk_path"] = str(disk_path)
+            vm_config["cloned_from"] = source_name
+            
+            # The source's frozen-layer flag and the clone land in one write
+            with self.batch():
+                if linked:
+                    layer = self._frozen_layer(source_name)
+                    self.disk_provisioner.create_overlay(layer, disk_path)
+                    vm_config["base_image"] = str(layer)
+                else:
+                    self.disk_provisioner.copy_disk(source_disk, disk_path)
+                    
+                # The clone's disk reads through to the source's base image
+                # and every frozen layer under the source's disk
+                if vm_config.get("base_blob"):
+                    self.artifacts.add_ref(vm_config["base_blob"], new_name)
+                for source_layer in self.disk_provisioner.layers_of(source_name):
+                    self.disk_provisioner.add_layer_ref(source_layer, new_name)
+                    
+                atomic_write_json(vm_dir / "config.json", vm_config)
+                
+                with self._lock:
+                    record = dict(source)
+                    for key in ("domain", "pooled", "layer_frozen"):
+                        record.pop(key, None)
+                    record.update({
+                        "name": new_name,
+                        "status": "stopped",
+                        "created_at": vm_config["created_at"],
+                        "path": str(vm_dir)
+                    })
+                    self.vms[new_name] = record
+                    self._record_change(new_name)
+                    
+            kind = "linked" if linked else "full"
+            print(f"🧬 Cloned VM ({kind}): {source_name} -> {new_name}")
+            return True
+            
+        except Exception as e:
+            if vm_dir is not None and new_name not in self.vms:
+                shutil.rmtree(vm_dir, ignore_errors=True)
+                self.artifacts.release(new_name)
+                self.disk_provisioner.release_layers(new_name)
+            print(f"Error cloning VM: {e}")
+            return False
+            
+    def _frozen_layer(self, source_name: str) -> Path:
+        """Get an immutable layer holding the source VM's current disk contents"""
+        with self._lock:
+            source_config = self.get_vm_config(source_name)
+            layer = source_config.get("frozen_layer")
+            if layer and self.vms[source_name].get("layer_frozen") and Path(layer).exists():
+                return Path(layer)
+                
+            # Internal snapshots would move into the frozen layer with the data
+            if source_config.get("snapshots"):
+                raise RuntimeError(f"Delete the snapshots of '{source_name}' or make a full clone")
+                
+            layer = self.disk_provisioner.freeze(source_config["disk_path"])
+            self.disk_provisioner.add_layer_ref(layer, source_name)
+            source_config["frozen_layer"] = str(layer)
+            self._write_vm_config(source_name, source_config)
+            
+            # Starting the source writes to its overlay and retires the layer
+            self.vms[source_name]["layer_frozen"] = True
+            self._record_change(source_name, {"layer_frozen": True})
+            return layer
+            
+    def domain_name(self, vm_name: str) -> str:
+        """Get the hypervisor domain name backing a VM"""
+        vm = self.vms.get(vm_name)
+        return vm.get("domain", vm_name) if vm else vm_name
+        
+    def vm_for_domain(self, domain_name: str) -> Optional[str]:
+        """Get the VM backed by a hypervisor domain"""
+        vm_name = self._domain_aliases.get(domain_name, domain_name)
+        if vm_name in self.vms and self.domain_name(vm_name) == domain_name:
+            return vm_name
+        return None
+            
+    def start_many(self, targets, max_workers: int = None) -> Dict[str, dict]:
+        """Start several VMs (a list of names or a predicate over VM records)"""
+        return self._run_many("start", self._start_vm, targets, max_workers)
+        
+    def stop_many(self, targets, max_workers: int = None) -> Dict[str, dict]:
+        """Stop several VMs (a list of names or a predicate over VM records)"""
+        return self._run_many("stop", self._stop_vm, targets, max_workers)
+        
+    def delete_many(self, targets, max_workers: int = None) -> Dict[str, dict]:
+        """Delete several VMs, removing their directories concurrently"""
+        return self._run_many("delete", self._delete_vm, targets, max_workers)
+        
+    def _resolve_targets(self, targets) -> List[str]:
+        """Turn a list of names or a predicate into a list of VM names"""
+        if callable(targets):
+            with self._lock:
+                return [name for name, vm in list(self.vms.items()) if targets(vm)]
+        return list(targets)
+        
+    def _run_many(self, action: str, operation, targets, max_workers: int = None) -> Dict[str, dict]:
+        """Run a lifecycle operation over many VMs on a bounded thread pool
+        
+        Returns a dict mapping each VM name to {"success": bool, "error": str or None}.
+        All registry changes are flushed together once every VM is done.
+        """
+        names = self._resolve_targets(targets)
+        results = {}
+        
+        def run(vm_name):
+            try:
+                operation(vm_name)
+                return {"success": True, "error": None}
+            except KeyError:
+                return {"success": False, "error": f"VM '{vm_name}' not found"}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+                
+        with self.batch():
+            with ThreadPoolExecutor(max_workers=max_workers or self.bulk_workers) as pool:
+                for vm_name, result in zip(names, pool.map(run, names)):
+                    results[vm_name] = result
+                    
+        failed = sum(1 for result in results.values() if not result["success"])
+        print(f"📋 Bulk {action}: {len(results) - failed} succeeded, {failed} failed")
+        return results
+        
     def get_vm(self, vm_name: str) -> Optional[dict]:
         """Get VM information"""
         return self.vms.get(vm_name)
         
+    def get_vm_config(self, vm_name: str) -> dict:
+        """Get the full per-VM configuration stored in the VM's directory"""
+        vm = self.vms.get(vm_name)
+        if vm is None:
+            return {}
+        return read_json(Path(vm["path"]) / "config.json", default={})
+        
+    def get_domain_config(self, vm_name: str) -> dict:
+        """Get the hypervisor config for a VM: template defaults plus VM overrides
+        
+        The result uses the template default_config layout (memory in MB,
+        cpu_cores, display and network).
+        """
+        vm_config = self.get_vm_config(vm_name)
+        template = self.get_template(vm_config.get("os_template", "").lower())
+        
+        # Template-built configs carry a full "config" section
+        config = deep_merge(template.default_config if template else {},
+                            vm_config.get("config", {}))
+        
+        # Dialog-built configs give memory in GB at the top level
+        if "memory" in vm_config:
+            config["memory"] = int(vm_config["memory"]) * 1024
+        if "cpu_cores" in vm_config:
+            config["cpu_cores"] = int(vm_config["cpu_cores"])
+            
+        return config
+        
     def get_all_vms(self) -> List[dict]:
-        """Get all VMs"""
-        return list(self.vms.values())
+        """Get all VMs (excluding idle warm pool instances)"""
+        return [vm for vm in self.vms.values() if not vm.get("pooled")]
+        
+    def list_vms(self, status: str = None, os: str = None,
+                 min_memory: float = None, max_memory: float = None,
+                 limit: int = None, offset: int = 0) -> List[dict]:
+        """Get a page of VMs filtered by status, OS template or memory (GB)
+        
+        Idle warm pool instances are left out, as in get_all_vms.
+        """
+        with self._lock:
+            # Storage lags the registry while changes are pending (inside
+            # batch() or before a debounced flush), so scan the registry then
+            if self._pending:
+                return query_records(self.vms, status, os, min_memory, max_memory,
+                                     limit, offset, pooled=False)
+            return self.storage.query(self.vms, status=status, os=os,
+                                      min_memory=min_memory, max_memory=max_memory,
+                                      limit=limit, offset=offset, pooled=False)
+        
+    def count_vms(self, status: str = None, os: str = None,
+                  min_memory: float = None, max_memory: float = None) -> int:
+        """Count VMs matching the given filters (excluding idle warm pool instances)"""
+        with self._lock:
+            if self._pending:
+                return count_records(self.vms, status, os, min_memory, max_memory, pooled=False)
+            return self.storage.count(self.vms, status=status, os=os,
+                                      min_memory=min_memory, max_memory=max_memory,
+                                      pooled=False)
         
     def get_template(self, template_name: str):
         """Get OS template"""
@@ -199,15 +1085,22 @@ class VMManager:
         
     def get_available_templates(self) -> List[str]:
         """Get list of available templates"""
-        return list(self.templates.keys())
+        return self.templates.keys()
         
     def update_vm_status(self, vm_name: str, status: str):
         """Update VM status"""
         if vm_name in self.vms:
-            self.vms[vm_name]["status"] = status
-            self.vms[vm_name]["last_modified"] = datetime.now().isoformat()
-            self.save_vms()
+            self._set_status(vm_name, status)
             
     def is_simulation_mode(self) -> bool:
         """Check if running in simulation mode"""
-        return self.simulation_mode 
\ No newline at end of file
+        return self.simulation_mode
+        
+    def close(self):
+        """Flush pending changes and release storage and hypervisor connections"""
+        self.state_tracker.stop()
+        self.flush()
+        if self.flush_interval is not None:
+            atexit.unregister(self.flush)
+        self.engine.close()
+        self.storage.close() 
\ No newline at end of file
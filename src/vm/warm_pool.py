@@ -0,0 +1,112 @@
+"""
+Warm VM Pool
+Pre-provisioned template instances handed out on demand
+"""
+
+import threading
+import uuid
+from typing import List, Optional
+
+
+class WarmPool:
+    """Keeps a number of ready-made VMs of one template on standby
+
+    Pool instances are ordinary registry entries flagged "pooled", so they
+    survive restarts and are hidden from get_all_vms. acquire() renames one
+    to the requested name and tops the pool back up on a background thread.
+    With preboot enabled the instances are started ahead of time too, which
+    turns a launch into a simple handoff.
+    """
+
+    POOL_PREFIX = "__pool"
+
+    def __init__(self, vm_manager, template_key: str = "nectaros", size: int = 2,
+                 preboot: bool = False):
+        self.vm_manager = vm_manager
+        self.template_key = template_key
+        self.size = size
+        self.preboot = preboot
+        self._lock = threading.Lock()
+        self._refill_thread = None
+
+    def instances(self) -> List[str]:
+        """Get the names of idle pool instances, oldest first"""
+        prefix = f"{self.POOL_PREFIX}-{self.template_key}-"
+        pooled = [
+            vm for name, vm in list(self.vm_manager.vms.items())
+            if vm.get("pooled") and name.startswith(prefix)
+        ]
+        pooled.sort(key=lambda vm: vm.get("created_at", ""))
+        return [vm["name"] for vm in pooled]
+
+    def available(self) -> int:
+        """Get the number of instances ready to hand out"""
+        return len(self.instances())
+
+    def acquire(self, vm_name: str) -> Optional[dict]:
+        """Hand out a pool instance under a new name
+
+        Returns the VM's registry entry, or None if the pool is empty (in
+        which case the caller should fall back to a normal create_vm).
+        """
+        manager = self.vm_manager
+        with self._lock:
+            instances = self.instances()
+            if not instances:
+                self.refill_async()
+                return None
+            pool_name = instances[0]
+
+            with manager.batch():
+                if not manager.rename_vm(pool_name, vm_name):
+                    return None
+                with manager._lock:
+                    manager.vms[vm_name].pop("pooled", None)
+                    manager._record_change(vm_name)
+
+                # The per-VM config must stop calling it pooled too
+                vm_config = manager.get_vm_config(vm_name)
+                if vm_config.pop("pooled", None) is not None:
+                    manager._write_vm_config(vm_name, vm_config)
+
+        print(f"⚡ Handed out warm {self.template_key} instance as '{vm_name}'")
+        self.refill_async()
+        return manager.get_vm(vm_name)
+
+    def refill(self):
+        """Create (and optionally boot) instances until the pool is full"""
+        manager = self.vm_manager
+        template = manager.get_template(self.template_key)
+        if template is None:
+            print(f"Warm pool: template '{self.template_key}' not found")
+            return
+
+        while self.available() < self.size:
+            pool_name = f"{self.POOL_PREFIX}-{self.template_key}-{uuid.uuid4().hex[:8]}"
+            config = template.default_config
+            created = manager.create_vm({
+                "name": pool_name,
+                "os_template": template.name,
+                "memory": config.get("memory", 2048) // 1024,
+                "storage": config.get("storage", 20),
+                "cpu_cores": config.get("cpu_cores", 2),
+                "pooled": True
+            })
+            if not created:
+                break
+            if self.preboot:
+                manager.start_vm(pool_name)
+
+    def refill_async(self):
+        """Refill the pool on a background thread (one refill at a time)"""
+        if self._refill_thread is not None and self._refill_thread.is_alive():
+            return
+        self._refill_thread = threading.Thread(
+            target=self.refill, name=f"warm-pool-{self.template_key}", daemon=True
+        )
+        self._refill_thread.start()
+
+    def drain(self):
+        """Delete every idle pool instance"""
+        self.size = 0
+        self.vm_manager.delete_many(self.instances())
@@ -110,6 +110,601 @@ def test_basic_functionality():
         print(f"❌ Basic functionality test failed: {e}")
         return False
 
+def test_registry_journal():
+    """Test that registry changes are journaled and replayed"""
+    print("\n📒 Testing registry journal...")
+    
+    import tempfile
+    from vm.vm_manager import VMManager
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        vm_manager = VMManager(data_dir)
+        vm_manager.create_vm({"name": "Journal VM", "memory": 2, "storage": 20})
+        vm_manager.start_vm("Journal VM")
+        
+        # A fresh manager must rebuild state from snapshot plus journal
+        reloaded = VMManager(data_dir)
+        vm = reloaded.get_vm("Journal VM")
+        assert vm and vm["status"] == "running", "Journal replay did not restore VM state"
+        print("✅ Journal replay restored VM state")
+        
+        # Compaction folds the journal into the snapshot
+        reloaded.save_vms()
+        assert reloaded.journal_file.stat().st_size == 0, "Journal was not truncated after compaction"
+        assert VMManager(data_dir).get_vm("Journal VM")["status"] == "running", \
+            "Compacted snapshot lost VM state"
+        print("✅ Journal compacted into snapshot")
+
+def test_atomic_write_recovery():
+    """Test checksummed writes and recovery from the previous generation"""
+    print("\n💾 Testing atomic writes...")
+    
+    import tempfile
+    import threading
+    from utils.atomic_file import CorruptFileError, atomic_write_json, previous_generation, read_json
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = Path(data_dir) / "state.json"
+        atomic_write_json(path, {"generation": 1})
+        atomic_write_json(path, {"generation": 2})
+        assert read_json(path) == {"generation": 2}, "Latest generation not read back"
+        assert read_json(previous_generation(path)) == {"generation": 1}, "Previous generation not kept"
+        
+        # A damaged current file falls back to the previous generation
+        path.write_text(path.read_text().replace('"generation": 2', '"generation": 3'))
+        assert read_json(path) == {"generation": 1}, "Checksum mismatch not recovered"
+        path.write_text("{ torn")
+        assert read_json(path) == {"generation": 1}, "Torn file not recovered"
+        
+        previous_generation(path).write_text("{ torn")
+        try:
+            read_json(path)
+            assert False, "Damaged generations were accepted"
+        except CorruptFileError:
+            pass
+        print("✅ Damaged files recover from the previous generation")
+        
+        # Threads writing the same file never trip over each other's temp files
+        errors = []
+        def write(n):
+            try:
+                for i in range(20):
+                    atomic_write_json(path, {"writer": n, "i": i})
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, f"Concurrent writes failed: {errors}"
+        assert read_json(path)["i"] == 19, "Concurrent writes left a bad file"
+        assert not list(Path(data_dir).glob(".state.json.*")), "Temporary files were left behind"
+        print("✅ Concurrent writers each get their own temp file")
+
+def test_template_definitions():
+    """Test that declarative templates load and a malformed one is skipped"""
+    print("\n📄 Testing template definitions...")
+    
+    import tempfile
+    from vm.vm_manager import VMManager
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        templates_dir = Path(data_dir) / "templates"
+        templates_dir.mkdir()
+        (templates_dir / "bad.yaml").write_text("name: [unclosed\n")
+        (templates_dir / "alpine.yaml").write_text(
+            "name: Alpine\n"
+            "default_config: {memory: 512, storage: 4, cpu_cores: 1}\n"
+            "build_layers:\n"
+            "  - name: base-packages\n"
+            "    script: apk add xfce4\n"
+        )
+        (templates_dir / "escape.yaml").write_text(
+            "name: Escape\n"
+            "default_config: {memory: 512, storage: 4, cpu_cores: 1}\n"
+            "build_layers:\n"
+            "  - name: ../../escape\n"
+            "    files: {'../../../outside': x, '/etc/outside': x, settings: 3}\n"
+        )
+        
+        vm_manager = VMManager(data_dir)
+        keys = list(vm_manager.get_available_templates())
+        assert "escape" not in keys, "Template with unsafe layer paths was accepted"
+        assert "alpine" in keys and "nectaros" in keys, f"Templates missing: {keys}"
+        assert vm_manager.create_vm({"name": "Nectar", "os_template": "NectarOS", "memory": 2, "storage": 20}), \
+            "A malformed template broke the built-in ones"
+        assert vm_manager.create_vm({"name": "Alpine", "os_template": "Alpine", "memory": 1, "storage": 4}), \
+            "Declarative template VM was not created"
+        vm_manager.close()
+    print("✅ Malformed template files are skipped")
+
+def test_registry_queries():
+    """Test that VM queries see changes storage hasn't flushed yet"""
+    print("\n🔎 Testing registry queries...")
+    
+    import tempfile
+    from vm.vm_manager import VMManager
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        vm_manager = VMManager(data_dir, storage="sqlite", flush_interval=2.0)
+        vm_manager.create_vm({"name": "Query VM", "memory": 2, "storage": 20})
+        assert [vm["name"] for vm in vm_manager.list_vms()] == ["Query VM"], \
+            "list_vms missed an unflushed VM"
+        assert vm_manager.count_vms(status="stopped") == 1, "count_vms missed an unflushed VM"
+        
+        with vm_manager.batch():
+            vm_manager.create_vm({"name": "Batch VM", "memory": 4, "storage": 20})
+            assert vm_manager.count_vms(min_memory=4) == 1, "count_vms missed a VM created in batch()"
+            
+        # Once flushed, the indexed SQLite query gives the same answer
+        vm_manager.flush()
+        assert [vm["name"] for vm in vm_manager.list_vms()] == ["Query VM", "Batch VM"], \
+            "list_vms lost VMs after a flush"
+        assert vm_manager.count_vms() == 2, "count_vms lost VMs after a flush"
+        vm_manager.close()
+        print("✅ Queries match the registry before and after flushing")
+
+def test_warm_pool():
+    """Test that warm pool instances stay hidden until handed out"""
+    print("\n⚡ Testing warm pool...")
+    
+    import tempfile
+    from vm.vm_manager import VMManager
+    from vm.warm_pool import WarmPool
+    
+    for storage in ("json", "sqlite"):
+        with tempfile.TemporaryDirectory() as data_dir:
+            vm_manager = VMManager(data_dir, storage=storage)
+            pool = WarmPool(vm_manager, "nectaros", size=2)
+            pool.refill()
+            assert pool.available() == 2, "Pool was not filled"
+            assert not vm_manager.get_all_vms() and not vm_manager.list_vms() \
+                and vm_manager.count_vms() == 0, f"Idle pool instances were listed ({storage})"
+                
+            vm = pool.acquire("Mine")
+            pool._refill_thread.join()
+            assert vm and vm["name"] == "Mine" and "pooled" not in vm, "Acquired VM is still pooled"
+            assert "pooled" not in vm_manager.get_vm_config("Mine"), "Acquired VM's config is still pooled"
+            assert [vm["name"] for vm in vm_manager.list_vms()] == ["Mine"] \
+                and vm_manager.count_vms() == 1, f"Acquired VM was not listed ({storage})"
+            assert pool.available() == 2, "Pool was not topped back up"
+            vm_manager.close()
+    print("✅ Pool instances stay hidden and hand over cleanly")
+
+def test_clones_and_snapshots():
+    """Test disk snapshots, linked clones and reclaiming their frozen layers"""
+    print("\n🧬 Testing clones and snapshots...")
+    
+    import tempfile
+    from vm.vm_manager import VMManager
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        vm_manager = VMManager(data_dir)
+        vm_manager.create_vm({"name": "Base", "os_template": "NectarOS", "memory": 2, "storage": 20})
+        
+        assert vm_manager.create_snapshot("Base", "clean"), "Snapshot was not created"
+        assert [s["name"] for s in vm_manager.list_snapshots("Base")] == ["clean"], "Snapshot not listed"
+        assert vm_manager.revert_snapshot("Base", "clean"), "Snapshot was not reverted"
+        assert vm_manager.delete_snapshot("Base", "clean") and not vm_manager.list_snapshots("Base"), \
+            "Snapshot was not deleted"
+        print("✅ Snapshots are created, reverted and deleted")
+        
+        # Two linked clones share one frozen layer; a clone of a clone adds another
+        assert vm_manager.clone_vm("Base", "Clone A") and vm_manager.clone_vm("Base", "Clone B"), \
+            "Linked clones failed"
+        assert vm_manager.clone_vm("Clone A", "Clone C"), "Clone of a clone failed"
+        assert vm_manager.clone_vm("Base", "Full", linked=False), "Full clone failed"
+        provisioner = vm_manager.disk_provisioner
+        layers = sorted(provisioner.layers_dir.glob("*.qcow2"))
+        assert len(layers) == 2, f"Expected 2 frozen layers, found {len(layers)}"
+        clone_disk = vm_manager.get_vm_config("Clone B")["disk_path"]
+        assert provisioner.backing_file(clone_disk) in layers, "Linked clone doesn't read through a layer"
+        print("✅ Linked clones layer over shared frozen disks")
+        
+        # Layers stay while any disk reads through them, and go with the last one
+        vm_manager.delete_many(["Base", "Clone B", "Full"])
+        assert sorted(provisioner.layers_dir.glob("*.qcow2")) == layers, "A layer in use was removed"
+        vm_manager.delete_many(["Clone A", "Clone C"])
+        assert not list(provisioner.layers_dir.glob("*.qcow2")), "Unused layers were left on disk"
+        print("✅ Frozen layers are removed with their last dependent")
+
+def test_image_layer_cache():
+    """Test that image layers are reused until their inputs change"""
+    print("\n🔨 Testing image layer cache...")
+    
+    import tarfile
+    import tempfile
+    import threading
+    from pathlib import Path
+    from os_templates.image_builder import ImageBuilder, DirectoryImageStore, apply_layer_files
+    from vm.vm_manager import VMManager
+    from vm.disk_provisioner import SPARSE_HEADER_SIZE
+    
+    class Template:
+        name = "Layered"
+        
+        def __init__(self, layers):
+            self.layers = layers
+            
+        def get_build_layers(self):
+            return self.layers
+            
+    built = []
+    def runner(layer, rootfs):
+        built.append(layer["name"])
+        apply_layer_files(layer, rootfs)
+        
+    with tempfile.TemporaryDirectory() as data_dir:
+        store = DirectoryImageStore(Path(data_dir) / "builds")
+        builder = ImageBuilder(store, runner)
+        layers = [
+            {"name": "base", "files": {"motd": "hello"}},
+            {"name": "theme", "files": {"theme.conf": "dark"}},
+            {"name": "apps", "files": {"apps.list": "editor"}}
+        ]
+        first = builder.build(Template(layers))
+        assert built == ["base", "theme", "apps"], f"Unexpected first build: {built}"
+        
+        built.clear()
+        assert builder.build(Template(layers)) == first and not built, \
+            f"Unchanged layers were rebuilt: {built}"
+        print("✅ Unchanged layers come from the cache")
+        
+        changed = [dict(layers[0]), dict(layers[1], files={"theme.conf": "light"}), dict(layers[2])]
+        second = builder.build(Template(changed))
+        assert second != first and built == ["theme", "apps"], \
+            f"Expected theme and apps to rebuild, got {built}"
+        print("✅ A changed layer rebuilds it and the layers above it")
+        
+        # Layer paths can't write outside the layer's tree
+        for bad in ({"name": "escape", "files": {"../../outside": "x"}},
+                    {"name": "../../outside"},
+                    {"name": "absolute", "files": {str(Path(data_dir) / "outside"): "x"}}):
+            try:
+                builder.build(Template([bad]))
+                assert False, f"Unsafe layer was built: {bad}"
+            except ValueError:
+                pass
+        assert not list(Path(data_dir).glob("outside*")) \
+            and not list(store.root.glob("outside*")), "A layer wrote outside its tree"
+        
+        export = store.export(second, Path(data_dir) / "second.tar")
+        with tarfile.open(export) as archive:
+            assert archive.extractfile("home/theme.conf").read() == b"light", \
+                "Export doesn't hold the changed layer's files"
+            assert archive.extractfile("home/motd").read() == b"hello", \
+                "Export is missing the cached layer's files"
+        assert export.read_bytes() == store.export(second, Path(data_dir) / "again.tar").read_bytes(), \
+            "Exports of the same build differ"
+        
+    # The build ends up inside the base image the VMs share
+    with tempfile.TemporaryDirectory() as data_dir:
+        vm_manager = VMManager(data_dir)
+        for name in ("One", "Two"):
+            vm_manager.create_vm({"name": name, "os_template": "NectarOS", "memory": 2, "storage": 20})
+        configs = [vm_manager.get_vm_config(name) for name in ("One", "Two")]
+        assert configs[0]["base_blob"] == configs[1]["base_blob"], "Same build made two base images"
+        
+        build_key = configs[0]["image_build"]
+        export = vm_manager.image_builder.store.export(build_key, Path(data_dir) / "build.tar")
+        with open(configs[0]["base_image"], 'rb') as f:
+            f.seek(SPARSE_HEADER_SIZE)
+            assert f.read(export.stat().st_size) == export.read_bytes(), \
+                "Base image doesn't hold the built layers"
+        
+        # A create that fails after taking a base image reference undoes it
+        (vm_manager.vms_dir / "Broken" / "disk.qcow2.tmp").mkdir(parents=True)
+        assert not vm_manager.create_vm({"name": "Broken", "os_template": "NectarOS",
+                                         "memory": 2, "storage": 20}), "Broken create succeeded"
+        assert not (vm_manager.vms_dir / "Broken").exists(), "Failed create left its directory"
+        assert all("Broken" not in entry["refs"] for entry in vm_manager.artifacts.blobs.values()), \
+            "Failed create kept its base image reference"
+        vm_manager.close()
+    print("✅ Base images carry their build")
+    
+    # Two builds of one layer in flight at once each keep their own scratch tree
+    with tempfile.TemporaryDirectory() as data_dir:
+        store = DirectoryImageStore(Path(data_dir) / "builds")
+        barrier = threading.Barrier(2)
+        errors = []
+        def build(rootfs):
+            marker = rootfs / threading.current_thread().name
+            marker.write_text("built")
+            barrier.wait(5)
+            assert marker.exists(), "Another build removed this build's files"
+        def commit():
+            try:
+                store.commit("same", {"name": "same"}, None, build)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=commit, name=f"builder-{i}") for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, f"Concurrent layer builds failed: {errors}"
+        assert store.has("same") and not list(store.root.glob(".*.tmp")), \
+            "Layer was not published cleanly"
+        
+    # Concurrent creates on an empty store build the same layers side by side
+    configs = [{"name": f"Parallel {i}", "os_template": "NectarOS", "memory": 2, "storage": 20}
+               for i in range(8)]
+    for _ in range(3):
+        with tempfile.TemporaryDirectory() as data_dir:
+            vm_manager = VMManager(data_dir)
+            results = vm_manager.create_many([dict(c) for c in configs], max_workers=8)
+            failed = {name: result["error"] for name, result in results.items() if not result["success"]}
+            assert not failed, f"Concurrent creates failed: {failed}"
+            assert len({vm_manager.get_vm_config(c["name"])["base_blob"] for c in configs}) == 1, \
+                "Concurrent creates made more than one base image"
+            builds = vm_manager.image_builder.store.root
+            assert not list(builds.glob(".*.tmp")), "Scratch build directories were left behind"
+            vm_manager.close()
+    print("✅ Concurrent creates share one build")
+
+def test_admission_control():
+    """Test that starts are admitted, queued and drained against host capacity"""
+    print("\n🚦 Testing admission control...")
+    
+    import tempfile
+    import threading
+    from vm.vm_manager import VMManager
+    from vm.resources import ResourceAccountant
+    
+    class FakeHost(ResourceAccountant):
+        """Room for three 2GB VMs: 8GB less the 1GB reserve"""
+        def host(self):
+            return {"memory_mb": 8192, "available_memory_mb": 8192, "cpu_cores": 8, "disk_gb": 1000.0}
+            
+    with tempfile.TemporaryDirectory() as data_dir:
+        vm_manager = VMManager(data_dir)
+        names = ["A", "B", "C", "D"]
+        for name in names:
+            vm_manager.create_vm({"name": name, "os_template": "NectarOS", "memory": 2, "storage": 20})
+        resources = vm_manager.resources = FakeHost(vm_manager, queue_starts=True)
+        
+        # Lifecycle events arrive after start_vm returns, as with libvirt
+        tracker = vm_manager.state_tracker
+        tracker.stop()
+        tracker.event_driven = True
+        def event(name, status):
+            tracker.handle_event(vm_manager.domain_name(name), status)
+            
+        for name in names[:3]:
+            assert vm_manager.start_vm(name), f"{name} was not admitted"
+        assert resources.committed()["memory_mb"] == 6144, "Starts in flight aren't committed"
+        assert vm_manager.start_vm("D") and vm_manager.get_vm("D")["status"] == "queued" \
+            and resources.queued() == ["D"], "Start beyond capacity was not queued"
+        for name in names[:3]:
+            event(name, "running")
+        assert resources.committed()["memory_mb"] == 6144, "Running VMs were counted twice"
+        print("✅ Starts are held until running and queued beyond capacity")
+        
+        event("A", "stopped")
+        for thread in threading.enumerate():
+            if thread.name == "admission-queue":
+                thread.join(5)
+        assert not resources.queued() and resources.committed()["memory_mb"] == 6144, \
+            "Queued start didn't take the freed resources"
+        event("D", "running")
+        assert vm_manager.get_vm("D")["status"] == "running", "Queued VM did not start"
+        assert resources.committed()["memory_mb"] == 6144, "Drained start was reserved twice"
+        vm_manager.close()
+    print("✅ Queued starts drain when resources free up")
+
+def test_storage_backends():
+    """Test that both registry backends persist and reload the same state"""
+    print("\n🗄️ Testing storage backends...")
+    
+    import tempfile
+    from vm.vm_manager import VMManager
+    
+    for storage in ("json", "sqlite"):
+        with tempfile.TemporaryDirectory() as data_dir:
+            vm_manager = VMManager(data_dir, storage=storage)
+            for name in ("Kept", "Renamed", "Deleted"):
+                vm_manager.create_vm({"name": name, "memory": 2, "storage": 20})
+            vm_manager.start_vm("Kept")
+            vm_manager.rename_vm("Renamed", "New Name")
+            vm_manager.delete_vm("Deleted")
+            vm_manager.close()
+            
+            reloaded = VMManager(data_dir, storage=storage)
+            assert sorted(reloaded.vms) == ["Kept", "New Name"], f"Wrong VMs reloaded ({storage})"
+            assert reloaded.get_vm("Kept")["status"] == "running", f"Status not reloaded ({storage})"
+            reloaded.close()
+    print("✅ JSON and SQLite registries reload the same state")
+    
+    # An existing JSON registry is imported the first time SQLite is used
+    with tempfile.TemporaryDirectory() as data_dir:
+        vm_manager = VMManager(data_dir)
+        vm_manager.create_vm({"name": "Legacy", "memory": 2, "storage": 20})
+        vm_manager.save_vms()
+        vm_manager.close()
+        migrated = VMManager(data_dir, storage="sqlite")
+        assert list(migrated.vms) == ["Legacy"] and migrated.count_vms() == 1, \
+            "JSON registry was not imported into SQLite"
+        migrated.close()
+    print("✅ JSON registry imported into SQLite")
+
+def test_artifact_eviction():
+    """Test that cached images are evicted least recently used first, never while referenced"""
+    print("\n🧹 Testing artifact eviction...")
+    
+    import tempfile
+    import time
+    from vm.artifact_store import ArtifactStore
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        store = ArtifactStore(Path(data_dir) / "blobs")
+        digests = {}
+        for name in ("old", "touched", "referenced"):
+            path = Path(data_dir) / name
+            path.write_bytes(name.encode("utf-8") * 1000)
+            digests[name] = store.put_file(path, tag=name,
+                                           owner="VM" if name == "referenced" else None)
+            time.sleep(0.01)
+        store.get(digests["touched"])
+        
+        # Just over the cap: only the least recently used blob goes
+        store.max_bytes = store.total_size() - 1
+        store.evict()
+        assert store.resolve("old") is None, "Least recently used blob was kept"
+        assert store.resolve("touched") == digests["touched"], "Recently used blob was evicted"
+        
+        # No room at all: referenced blobs still stay until released
+        store.max_bytes = 0
+        store.evict()
+        assert store.resolve("touched") is None, "Unreferenced blob survived eviction"
+        assert store.get(digests["referenced"]) is not None, "Referenced blob was evicted"
+        store.release("VM")
+        assert store.get(digests["referenced"]) is None, "Released blob was not evicted"
+        assert not list(store.blobs_dir.iterdir()), "Evicted blobs left files behind"
+    print("✅ Unreferenced blobs are evicted least recently used first")
+
+def test_bulk_operations():
+    """Test batched bulk lifecycle operations"""
+    print("\n📋 Testing bulk operations...")
+    
+    import tempfile
+    from vm.vm_manager import VMManager
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        vm_manager = VMManager(data_dir)
+        names = [f"Bulk VM {i}" for i in range(10)]
+        with vm_manager.batch():
+            for name in names:
+                vm_manager.create_vm({"name": name, "memory": 2, "storage": 20})
+                
+        results = vm_manager.start_many(names + ["Missing VM"])
+        assert not results["Missing VM"]["success"] and all(results[n]["success"] for n in names), \
+            "start_many reported wrong per-VM results"
+        print("✅ start_many reported per-VM results")
+        
+        vm_manager.delete_many(lambda vm: vm["status"] == "running")
+        assert not VMManager(data_dir).get_all_vms(), "delete_many left VMs in the registry"
+        print("✅ delete_many removed every matching VM")
+
+def test_async_vm_lock():
+    """Test that async operations on one VM never overlap, even across a delete"""
+    print("\n⏱️ Testing async VM locks...")
+    
+    import asyncio
+    import tempfile
+    import time
+    from vm.async_manager import AsyncVMManager
+    
+    def tracked(func, active, peaks):
+        def run(*args):
+            active[0] += 1
+            peaks.append(active[0])
+            time.sleep(0.05)
+            try:
+                return func(*args)
+            finally:
+                active[0] -= 1
+        return run
+        
+    async def scenario(data_dir):
+        config = {"name": "Async VM", "memory": 2, "storage": 20}
+        async with AsyncVMManager(data_dir=data_dir) as manager:
+            await manager.create_vm(dict(config))
+            active, peaks = [0], []
+            for name in ("create_vm", "start_vm", "delete_vm"):
+                setattr(manager.manager, name, tracked(getattr(manager.manager, name), active, peaks))
+                
+            # Recreating right after the delete must still wait for the queued start
+            delete = asyncio.ensure_future(manager.delete_vm("Async VM"))
+            start = asyncio.ensure_future(manager.start_vm("Async VM"))
+            await delete
+            created = await manager.create_vm(dict(config))
+            started = await start
+            return delete.result(), started, created, max(peaks), manager._vm_locks
+            
+    with tempfile.TemporaryDirectory() as data_dir:
+        deleted, started, created, peak, locks = asyncio.run(scenario(data_dir))
+        assert deleted and not started and created, "Operations on one VM ran out of order"
+        assert peak == 1, "Operations on one VM overlapped"
+        assert not locks, "Idle VM locks were kept"
+        print("✅ Operations on one VM stay serialized across a delete")
+
+def test_change_feed():
+    """Test keyed registry diffs from the VM change feed"""
+    print("\n📡 Testing VM change feed...")
+    
+    import tempfile
+    from vm.vm_manager import VMManager
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        vm_manager = VMManager(data_dir)
+        diffs = []
+        vm_manager.subscribe(diffs.append)
+        
+        with vm_manager.batch():
+            vm_manager.create_vm({"name": "Feed VM", "memory": 2, "storage": 20})
+            vm_manager.create_vm({"name": "Temp VM", "memory": 2, "storage": 20})
+            vm_manager.delete_vm("Temp VM")
+        vm_manager.rename_vm("Feed VM", "Renamed VM")
+        
+        assert [sorted(d["added"]) for d in diffs] == [["Feed VM"], ["Renamed VM"]], \
+            "Change feed sent wrong diffs"
+        assert diffs[1]["removed"] == ["Feed VM"], "Change feed sent wrong diffs"
+        print("✅ Change feed coalesced batches into keyed diffs")
+        
+        # Subscribers run outside the registry lock, so other threads can use the manager
+        import threading
+        counts = []
+        def count_from_thread(diff):
+            thread = threading.Thread(target=lambda: counts.append(vm_manager.count_vms()))
+            thread.start()
+            thread.join(timeout=5)
+        vm_manager.subscribe(count_from_thread)
+        vm_manager.create_vm({"name": "Locked VM", "memory": 2, "storage": 20})
+        assert counts == [2], "Subscriber ran while holding the registry lock"
+        print("✅ Subscribers run after the registry lock is released")
+
+def test_animation_budget():
+    """Test that late frames degrade animations and reduced motion skips them"""
+    print("\n🎞️ Testing animation budget...")
+    
+    from PyQt6.QtWidgets import QApplication, QWidget
+    from utils.animation_manager import AnimationClock, FRAME_SAMPLES, MOTION_FULL, MOTION_FEWER_FRAMES
+    
+    app = QApplication.instance() or QApplication([])
+    clock = AnimationClock()
+    clock.reduced_motion = False
+    
+    # A window of frames five budgets apart, then one on time
+    for i in range(FRAME_SAMPLES + 1):
+        clock._measure(i * clock.frame_budget * 5, 0.1)
+    assert clock.level == MOTION_FEWER_FRAMES, "Late frames did not lower the animation level"
+    start = FRAME_SAMPLES * clock.frame_budget * 5
+    for i in range(FRAME_SAMPLES):
+        clock._measure(start + (i + 1) * clock.timer.interval(), 0.1)
+    assert clock.level == MOTION_FULL, "On-time frames did not restore the animation level"
+    print("✅ Animation level follows measured frame times")
+    
+    widget = QWidget()
+    clock.set_reduced_motion(True)
+    animation_id = clock.animate(widget, "opacity", 0.0, 1.0, 300)
+    assert not clock.is_running(animation_id) and widget.graphicsEffect() is None, \
+        "Reduced motion still animated"
+    finished = []
+    clock.sequence(widget, "opacity", [], on_finished=lambda: finished.append(True))
+    app.processEvents()
+    assert finished, "An empty sequence never finished"
+    print("✅ Reduced motion jumps straight to the end")
+
+def run_test(test, name: str) -> bool:
+    """Run an assert-based test, reporting its failure"""
+    try:
+        test()
+        return True
+    except Exception as e:
+        print(f"❌ {name} test failed: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("🚀 Multiverse Application Test")
@@ -130,6 +725,28 @@ def main():
         print("\n❌ Basic functionality tests failed")
         return False
         
+    # Tests that assert rather than return a result
+    tests = [
+        (test_registry_journal, "Registry journal"),
+        (test_atomic_write_recovery, "Atomic write"),
+        (test_storage_backends, "Storage backends"),
+        (test_artifact_eviction, "Artifact eviction"),
+        (test_registry_queries, "Registry queries"),
+        (test_template_definitions, "Template definitions"),
+        (test_bulk_operations, "Bulk operations"),
+        (test_admission_control, "Admission control"),
+        (test_clones_and_snapshots, "Clone and snapshot"),
+        (test_image_layer_cache, "Image layer cache"),
+        (test_warm_pool, "Warm pool"),
+        (test_change_feed, "Change feed"),
+        (test_async_vm_lock, "Async VM lock"),
+        (test_animation_budget, "Animation budget")
+    ]
+    for test, name in tests:
+        if not run_test(test, name):
+            print(f"\n❌ {name} tests failed")
+            return False
+            
     print("\n🎉 All tests passed!")
     print("✅ The application should work correctly")
     print("\nTo run the full application:")
@@ -139,4 +756,4 @@ def main():
 
 if __name__ == "__main__":
     success = main()
-    sys.exit(0 if success else 1) 
\ No newline at end of file
+    sys.exit(0 if success else 1)